@@ -1,19 +1,46 @@
-import openai
-import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
+from ai_engine.clients import get_openai_client
+from ai_engine.deadlines import deadline_datetime
+from ai_engine.pipeline import analyze_content
+from ai_engine.provider_pool import get_provider_pool, strip_code_fence
 
 load_dotenv()
 
 class OpportunityAnalyzer:
-    def __init__(self):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+    def __init__(self, use_pool: bool = True):
+        self.api_base = os.getenv("OPENAI_API_BASE")
+        self.use_pool = use_pool
         
     async def analyze_opportunity(self, content: str) -> Dict:
         """Analyze opportunity content and extract structured data"""
         
+        try:
+            if self.use_pool:
+                analysis = await get_provider_pool().analyze_async(content)
+                if not analysis:
+                    return self._fallback_analysis(content)
+            else:
+                analysis = self.request_analysis(content)
+            
+            # Shared pipeline fills whatever the LLM left empty
+            analysis = analyze_content(content, known=analysis).complete()
+            
+            # Post-process deadline
+            if analysis.get("deadline"):
+                analysis["deadline"] = self._parse_deadline(analysis["deadline"])
+                
+            return analysis
+            
+        except Exception as e:
+            # Fallback analysis
+            return self._fallback_analysis(content)
+    
+    def request_analysis(self, content: str) -> Dict:
+        """Call OpenAI and return the raw parsed JSON, raising on any failure"""
+        
         prompt = f"""
         Analyze this opportunity text and extract the following information in JSON format:
         
@@ -32,84 +59,36 @@ class OpportunityAnalyzer:
         Return only valid JSON format.
         """
         
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            
-            result = response.choices[0].message.content
-            # Parse JSON response
-            import json
-            analysis = json.loads(result)
-            
-            # Post-process deadline
-            if analysis.get("deadline"):
-                analysis["deadline"] = self._parse_deadline(analysis["deadline"])
-                
-            return analysis
-            
-        except Exception as e:
-            # Fallback analysis
-            return self._fallback_analysis(content)
+        response = self._chat_completion(
+            model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3
+        )
+        
+        result = response.choices[0].message.content
+        # Parse JSON response
+        import json
+        return json.loads(strip_code_fence(result))
+    
+    def _chat_completion(self, **kwargs):
+        """Chat completion on openai>=1.0 (pinned) or the legacy module API"""
+        client = get_openai_client(self.api_base)
+        if client is not None:
+            return client.chat.completions.create(**kwargs)
+        
+        import openai
+        openai.api_key = os.getenv("OPENAI_API_KEY")
+        if self.api_base:
+            openai.api_base = self.api_base
+        return openai.ChatCompletion.create(**kwargs)
     
     def _parse_deadline(self, deadline_str: str) -> Optional[datetime]:
-        """Parse deadline string to datetime object"""
-        try:
-            # Try different date formats
-            formats = [
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%d",
-                "%d/%m/%Y",
-                "%m/%d/%Y"
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(deadline_str, fmt)
-                except ValueError:
-                    continue
-                    
-        except Exception:
-            pass
-        return None
+        """Parse deadline string to datetime object (ai_engine/dates.py)"""
+        return deadline_datetime(deadline_str)
     
     def _fallback_analysis(self, content: str) -> Dict:
         """Fallback analysis without AI"""
-        
-        # Simple keyword-based analysis
-        categories = {
-            "job": ["job", "position", "role", "hiring", "employment"],
-            "freelance": ["freelance", "contract", "gig", "project"],
-            "business": ["business", "partnership", "investment", "startup"],
-            "grant": ["grant", "funding", "scholarship", "award"]
-        }
-        
-        category = "other"
-        for cat, keywords in categories.items():
-            if any(keyword in content.lower() for keyword in keywords):
-                category = cat
-                break
-        
-        # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, content)
-        
-        # Extract phone
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        phones = re.findall(phone_pattern, content)
-        
-        return {
-            "title": content[:50] + "..." if len(content) > 50 else content,
-            "category": category,
-            "deadline": None,
-            "requirements": [],
-            "contact_info": {
-                "emails": emails,
-                "phones": phones
-            },
-            "priority_score": 5.0,
-            "location": None,
-            "compensation": None
-        }
\ No newline at end of file
+        analysis = analyze_content(content).complete()
+        if analysis.get("deadline"):
+            analysis["deadline"] = self._parse_deadline(analysis["deadline"])
+        return analysis
@@ -0,0 +1,84 @@
+"""
+Lazily constructed LLM SDK clients
+
+google.generativeai and openai take most of a second each to import, so
+nothing imports them at module load: the SDK is imported and the client built
+on first use, once per process. has_library() answers "is it installed?"
+without importing it.
+"""
+import importlib.util
+import os
+import threading
+from typing import Optional
+
+# What final_bot used before the apps shared one model; the faster one. GEMINI_MODEL overrides it.
+GEMINI_DEFAULT_MODEL = "gemini-1.5-flash"
+
+_lock = threading.Lock()
+_gemini_model = None
+_gemini_failed = False
+
+
+def has_library(name: str) -> bool:
+    """Installed-or-not check that doesn't pay for the import"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def gemini_configured() -> bool:
+    api_key = os.getenv("GEMINI_API_KEY")
+    return bool(api_key) and api_key != "your-gemini-key-here"
+
+
+def get_gemini_model():
+    """Shared GenerativeModel, or None when Gemini isn't configured or failed to initialize"""
+    global _gemini_model, _gemini_failed
+    if _gemini_model is not None or _gemini_failed or not gemini_configured():
+        return _gemini_model
+    with _lock:
+        if _gemini_model is None and not _gemini_failed:
+            try:
+                import google.generativeai as genai
+                api_key = os.getenv("GEMINI_API_KEY")
+                api_base = os.getenv("GEMINI_API_BASE")
+                if api_base:
+                    # e.g. the local fake server in benchmarks/fake_llm.py
+                    genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": api_base})
+                else:
+                    genai.configure(api_key=api_key)
+                _gemini_model = genai.GenerativeModel(os.getenv("GEMINI_MODEL", GEMINI_DEFAULT_MODEL))
+                print("✅ Gemini AI initialized!")
+            except Exception as e:
+                print(f"⚠️ Gemini initialization failed: {e}")
+                _gemini_failed = True
+    return _gemini_model
+
+
+def gemini_available() -> bool:
+    """Whether Gemini can be used, without initializing it"""
+    return gemini_configured() and not _gemini_failed and has_library("google.generativeai")
+
+
+_openai_client = None
+
+
+def get_openai_client(api_base: Optional[str] = None):
+    """Shared openai>=1.0 client; None on the legacy module API"""
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                import openai
+                if not hasattr(openai, "OpenAI"):
+                    return None
+                # The provider pool fails over on its own, so no client-side retries;
+                # OPENAI_API_BASE can point at the local fake server in benchmarks/fake_llm.py
+                _openai_client = openai.OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=api_base or os.getenv("OPENAI_API_BASE") or None,
+                    timeout=float(os.getenv("LLM_POOL_TIMEOUT", "20")),
+                    max_retries=0
+                )
+    return _openai_client
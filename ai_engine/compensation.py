@@ -0,0 +1,239 @@
+"""
+Numeric compensation
+
+extract_compensation() and the LLMs return free text ("$140k-200k + equity",
+"₦350,000 monthly", "Budget: $500"). parse_compensation() turns it into
+
+    comp_min, comp_max   amounts in the posting's currency and period
+    currency             ISO code, None when not stated
+    period               hour, day, week, month, year or project; None when not stated
+    equity               stock, options or equity mentioned
+
+plus comp_annual, comp_max scaled to a year (an unstated period counts as a
+year, the usual way salaries are quoted; None for project fees), which is
+what salary filters and sorting compare. Short compensation strings repeat
+a lot, so parses are memoized.
+
+The sqlite apps keep the parse in comp_* columns next to the raw text,
+indexed on comp_annual and (comp_currency, comp_annual). Writers call
+index() in the same transaction as their INSERT; backfill() parses rows
+written before the columns existed (or whose compensation changed since)
+and runs at startup:
+
+    python -m ai_engine.compensation final_opportunities.db
+"""
+import argparse
+import re
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+from monitoring.metrics import count, observe
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "₦": "NGN", "₹": "INR", "¥": "JPY", "₵": "GHS"}
+CURRENCY_WORDS = {
+    "usd": "USD", "dollars": "USD", "eur": "EUR", "euros": "EUR", "gbp": "GBP", "pounds": "GBP",
+    "ngn": "NGN", "naira": "NGN", "inr": "INR", "rupees": "INR", "cad": "CAD", "aud": "AUD",
+    "kes": "KES", "ghs": "GHS", "cedis": "GHS", "zar": "ZAR", "jpy": "JPY",
+}
+MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6}
+ANNUAL_FACTOR = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+# Annual pay that earns the "well paid" priority bonus, per currency; no bonus when the currency isn't stated
+HIGH_PAY_ANNUAL = {"USD": 100000, "CAD": 130000, "AUD": 150000, "EUR": 90000, "GBP": 80000,
+                   "NGN": 30000000, "INR": 3000000}
+
+_CURRENCY = (r"(?:[$€£₦₹¥₵]|\b(?:" + "|".join(sorted(CURRENCY_WORDS, key=len, reverse=True)) + r")\b)")
+# 1,200,000 | 12,00,000 (Indian lakh grouping) | 1.200.000 | 1200000.50
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d{1,2}(?:,\d{2})+,\d{3}(?:\.\d+)?|\d{1,3}(?:\.\d{3})+(?!\d)|\d+(?:\.\d+)?"
+_MULTIPLIER = r"(?:k|thousand|mn|m|million)\b"
+_RANGE = r"\s*(?:-|–|—|to|and)\s*"
+
+
+def _amount(name: str) -> str:
+    return (rf"(?P<{name}cur>{_CURRENCY})?\s*(?P<{name}num>{_NUMBER})\s*(?P<{name}mult>{_MULTIPLIER})?"
+            rf"(?:\s*(?P<{name}cur2>{_CURRENCY}))?")
+
+
+# One grammar: an amount, optionally "- / to / and" another one
+AMOUNT_RANGE = re.compile(_amount("a") + "(?:" + _RANGE + _amount("b") + ")?", re.IGNORECASE)
+PERIODS = (
+    ("hour", re.compile(r"(?:/|\bper\s+|\ban?\s+)(?:hour|hr)\b|\bhourly\b|\bp/?h\b", re.IGNORECASE)),
+    ("day", re.compile(r"(?:/|\bper\s+|\ba\s+)day\b|\bdaily\b|\bp/?d\b", re.IGNORECASE)),
+    ("week", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:week|wk)\b|\bweekly\b", re.IGNORECASE)),
+    ("month", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:month|mo|mth)\b|\bmonthly\b|\bp/?m\b", re.IGNORECASE)),
+    ("year", re.compile(r"(?:/|\bper\s+|\ba\s+)(?:year|yr|annum)\b|\bannual(?:ly)?\b|\byearly\b|\bp\.?a\b|\bsalary\b",
+                        re.IGNORECASE)),
+    ("project", re.compile(r"\bbudget\b|\bfixed[\s-](?:price|fee)\b|\bflat\s+fee\b|\bper\s+project\b|\bone-off\b",
+                           re.IGNORECASE)),
+)
+EQUITY = re.compile(r"\bequity\b|\b(?:stock|share)\s+options?\b|\brsus?\b|\besop\b", re.IGNORECASE)
+
+EMPTY = {"comp_min": None, "comp_max": None, "currency": None, "period": None, "equity": False, "comp_annual": None}
+
+
+def _currency(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    return CURRENCY_SYMBOLS.get(token) or CURRENCY_WORDS.get(token.lower())
+
+
+def currency_code(value: str) -> Optional[str]:
+    """ISO code for a currency filter ("$" -> USD, "naira" -> NGN, "eur" -> EUR); None if unrecognized"""
+    value = value.strip()
+    code = _currency(value)
+    if code is None and re.fullmatch(r"[A-Za-z]{3}", value):
+        code = value.upper()
+    return code
+
+
+def _number(text: str) -> float:
+    if "," in text:
+        return float(text.replace(",", ""))
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+", text):
+        # 15.000 - thousands separated European style
+        return float(text.replace(".", ""))
+    return float(text)
+
+
+def annualize(amount: Optional[float], period: Optional[str]) -> Optional[float]:
+    """Amount scaled to a year; an unstated period counts as a year, a project fee has none"""
+    if amount is None or period == "project":
+        return None
+    return amount * ANNUAL_FACTOR.get(period or "year", 1)
+
+
+def parse_compensation(text: Optional[str]) -> Dict:
+    """comp_min, comp_max, currency, period, equity and comp_annual for a compensation string"""
+    if not text or not str(text).strip():
+        return dict(EMPTY)
+    return dict(zip(EMPTY, _parse(str(text).strip())))
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str) -> tuple:
+    equity = bool(EQUITY.search(text))
+    period = next((name for name, pattern in PERIODS if pattern.search(text)), None)
+
+    # The first amount marked as money (currency, k/m or a range); a bare number ("2 positions")
+    # only when there is none and the text reads as pay ("120000 per year", "85000")
+    matches = list(AMOUNT_RANGE.finditer(text))
+    match = next((m for m in matches if m.group("acur") or m.group("amult") or m.group("acur2") or m.group("bnum")),
+                 None)
+    if match is None and matches and (period or re.fullmatch(r"[\d.,\s]+", text)):
+        match = matches[0]
+    if not match:
+        return (None, None, None, period, equity, None)
+
+    low = _number(match.group("anum"))
+    low_mult = MULTIPLIERS.get((match.group("amult") or "").lower())
+    high = _number(match.group("bnum")) if match.group("bnum") else None
+    high_mult = MULTIPLIERS.get((match.group("bmult") or "").lower())
+    if high is not None and low_mult is None and high_mult is not None:
+        # "$140-200k": the multiplier belongs to both ends
+        low_mult = high_mult
+    low *= low_mult or 1
+    if high is not None:
+        high *= high_mult or low_mult or 1
+    if high is None or high < low:
+        high = max(low, high or low)
+
+    currency = _currency(match.group("acur") or match.group("acur2") or match.group("bcur") or match.group("bcur2"))
+    return (low, high, currency, period, equity, annualize(high, period))
+
+
+def is_high_pay(pay: Dict) -> bool:
+    """Whether parsed compensation clears HIGH_PAY_ANNUAL for its currency; False when the currency is unknown"""
+    threshold = HIGH_PAY_ANNUAL.get(pay.get("currency"))
+    return threshold is not None and pay.get("comp_annual") is not None and pay["comp_annual"] >= threshold
+
+
+COLUMNS = (("comp_min", "REAL"), ("comp_max", "REAL"), ("comp_currency", "TEXT"), ("comp_period", "TEXT"),
+           ("comp_equity", "INTEGER"), ("comp_annual", "REAL"))
+
+
+def column_values(text: Optional[str]) -> tuple:
+    """Values for COLUMNS, in order"""
+    pay = parse_compensation(text)
+    return (pay["comp_min"], pay["comp_max"], pay["currency"], pay["period"], int(pay["equity"]), pay["comp_annual"])
+
+
+class CompensationIndex:
+    """Parsed compensation columns on one opportunities table"""
+
+    def __init__(self, db_path: str, table: str = "opportunities", batch_size: int = 5000):
+        self.db_path = db_path
+        self.table = table
+        self.batch_size = batch_size
+
+    def init_schema(self, conn: sqlite3.Connection) -> bool:
+        """Add the comp_* columns, their indexes and the re-parse trigger; False without a compensation column"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        if "compensation" not in columns:
+            return False
+        # Appended at the end, so SELECT * row indexes in the apps don't move
+        for name, kind in COLUMNS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {kind}")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_salary ON {self.table}(comp_annual)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_currency_salary "
+                     f"ON {self.table}(comp_currency, comp_annual)")
+        # comp_equity is 0/1 once parsed, so NULL marks rows backfill() still owes; a partial index keeps finding them cheap
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_comp_unparsed ON {self.table}(id) "
+                     f"WHERE comp_equity IS NULL AND compensation IS NOT NULL")
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table}_comp_update AFTER UPDATE OF compensation ON {self.table}
+            BEGIN
+                UPDATE {self.table} SET comp_equity = NULL WHERE id = NEW.id;
+            END
+        ''')
+        conn.commit()
+        return True
+
+    def index(self, conn: sqlite3.Connection, opportunity_id: int, compensation: Optional[str]):
+        """Store one row's parse; call inside the writer's transaction, after its INSERT"""
+        self._write(conn, [(opportunity_id, compensation)])
+
+    def _write(self, conn: sqlite3.Connection, rows):
+        assignments = ", ".join(f"{name} = ?" for name, _ in COLUMNS)
+        conn.executemany(f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+                         [column_values(text) + (opportunity_id,) for opportunity_id, text in rows])
+        count("compensation_parsed_total", len(rows))
+
+    def backfill(self) -> int:
+        """Parse every row with compensation text but no comp_* values, in batches; returns how many"""
+        start = time.perf_counter()
+        done = 0
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.init_schema(conn):
+                return 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT id, compensation FROM {self.table} "
+                    f"WHERE comp_equity IS NULL AND compensation IS NOT NULL LIMIT ?", (self.batch_size,)
+                ).fetchall()
+                if not rows:
+                    break
+                with conn:
+                    self._write(conn, rows)
+                done += len(rows)
+        finally:
+            conn.close()
+        observe("compensation_backfill", time.perf_counter() - start)
+        return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-fill parsed compensation columns")
+    parser.add_argument("db_path", help="SQLite database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done = CompensationIndex(args.db_path, args.table).backfill()
+    print(f"✅ Parsed compensation for {done} opportunities in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
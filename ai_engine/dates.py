@@ -0,0 +1,241 @@
+"""
+Deadline date parsing
+
+One engine for every place that turns deadline text into a date: the
+pipeline's extract_deadline(), the LLM answer validation, the analyzer's
+fallback and the deadline back-fill (ai_engine/deadlines.py).
+
+    parse_day("Apply by 25th Jan")              -> next 25 January on or after today
+    parse_day("15.02.2025")                     -> 2025-02-15
+    parse_day("in 2 weeks", reference=created)  -> created + 14 days
+
+Understood, anywhere in the text (the leftmost one wins):
+
+    2025-02-15, 2025/02/15        ISO-ish, year first (a time part is ignored)
+    02/15/2025, 2-15-25           month first, unless the first number can't be a month
+    15.02.2025                    day first (the European dotted form)
+    25th Jan, 25 of January 2026, Jan 25, March 15th, 2026
+    today, tonight, tomorrow, day after tomorrow
+    in 3 days, within a week, in 2 months, next week / month / year
+    end of day / week / month / year, EOD, EOW, EOM, EOY
+    friday, this friday, next friday
+
+Months and weekdays may be abbreviated to any unambiguous prefix of three
+or more letters ("sept", "thurs"); a trie over the names resolves them.
+A date without a year is the next one on or after the reference day.
+"next <weekday>" is the first one after the reference day, a bare weekday
+may be the reference day itself, and "end of week" is Friday.
+
+Scanning is split from resolving: scan() runs the grammar once per distinct
+(normalized) snippet and is memoized, since the same few deadline phrasings
+repeat across messages; resolve() applies the reference date and is cheap.
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Union
+
+from monitoring.metrics import registry
+
+MONTH_NAMES = ("january", "february", "march", "april", "may", "june", "july", "august", "september",
+               "october", "november", "december")
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                "eight": 8, "nine": 9, "ten": 10}
+END_OF_WEEK = 4  # Friday
+SCAN_CACHE_SIZE = 8192
+
+
+class NameTrie:
+    """Full names and their unambiguous prefixes of min_length or more letters"""
+
+    def __init__(self, names, min_length: int = 3):
+        self.min_length = min_length
+        self.root = {}
+        for value, name in enumerate(names, 1):
+            node = self.root
+            for char in name:
+                node = node.setdefault(char, {})
+                node.setdefault("", set()).add(value)
+            node["$"] = value
+
+    def lookup(self, word: str) -> Optional[int]:
+        """1-based position of the name word spells or abbreviates, None if it's no name (or ambiguous)"""
+        node = self.root
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return None
+        if "$" in node:
+            return node["$"]
+        values = node.get("", ())
+        if len(word) >= self.min_length and len(values) == 1:
+            return next(iter(values))
+        return None
+
+
+MONTHS = NameTrie(MONTH_NAMES)
+WEEKDAYS = NameTrie(WEEKDAY_NAMES)
+
+_ORDINAL = r"(?:st|nd|rd|th)?"
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]{0,6}"
+_WEEKDAY = r"(?:mon|tue|wed|thu|fri|sat|sun)[a-z]{0,6}"
+# "Friday, March 6th": a weekday in front of a full date is part of it, not a date of its own
+_ON = rf"(?:{_WEEKDAY},?\s+(?:the\s+)?)?"
+# One grammar; each alternative's groups are named after it. The word alternatives only match
+# the shape of a month/weekday, the tries decide whether the word is one.
+GRAMMAR = re.compile(rf"""
+    \b(?:
+        (?P<iso>{_ON}(?P<iso_y>\d{{4}})[-/.](?P<iso_m>\d{{1,2}})[-/.](?P<iso_d>\d{{1,2}})(?:t[\d:.]+(?:z|[+-]\d\d:?\d\d)?)?)(?!\d)
+      | (?P<num>{_ON}(?P<num_a>\d{{1,2}})(?P<num_sep>[/.-])(?P<num_b>\d{{1,2}})(?P=num_sep)(?P<num_y>\d{{4}}|\d{{2}}))(?!\d)
+      | (?P<dm>{_ON}(?P<dm_d>\d{{1,2}}){_ORDINAL}(?:\s+of)?[\s-]+(?P<dm_m>{_MONTH})\b\.?(?:,?[\s-]+(?P<dm_y>\d{{4}}))?)
+      | (?P<md>{_ON}(?P<md_m>{_MONTH})\.?\s+(?P<md_d>\d{{1,2}}){_ORDINAL}(?!\d)\b(?:,?\s+(?P<md_y>\d{{4}}))?)
+      | (?P<within>(?:with)?in\s+(?P<within_n>\d+|an?|one|two|three|four|five|six|seven|eight|nine|ten)\s+
+                   (?P<within_unit>day|week|month|year)s?)
+      | (?P<end>end\s+of\s+(?:the\s+)?(?P<end_unit>day|week|month|year)|eo(?P<end_abbr>[dwmy]))
+      | (?P<next>next\s+(?P<next_unit>week|month|year))
+      | (?P<word>today|tonight|tomorrow|day\s+after\s+tomorrow)
+      | (?P<wd>(?:(?P<wd_q>this|next|coming)\s+)?(?P<wd_name>{_WEEKDAY}))
+    )\b
+""", re.VERBOSE)
+
+_END_UNITS = {"d": "day", "w": "week", "m": "month", "y": "year"}
+_WORD_DAYS = {"today": 0, "tonight": 0, "tomorrow": 1}
+
+
+def _year(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def _spec(match) -> Optional[tuple]:
+    """The reference-independent meaning of one grammar match, None if it isn't a date after all"""
+    kind = match.lastgroup
+    if kind == "iso":
+        return ("date", int(match.group("iso_y")), int(match.group("iso_m")), int(match.group("iso_d")))
+    if kind == "num":
+        first, second, year = int(match.group("num_a")), int(match.group("num_b")), _year(match.group("num_y"))
+        # 15.02.2025 is day first; 02/15/2025 month first, unless the first number can't be a month
+        if match.group("num_sep") == "." or first > 12:
+            first, second = second, first
+        return ("date", year, first, second)
+    if kind == "dm":
+        month = MONTHS.lookup(match.group("dm_m"))
+        return ("date", _year(match.group("dm_y")), month, int(match.group("dm_d"))) if month else None
+    if kind == "md":
+        month = MONTHS.lookup(match.group("md_m"))
+        return ("date", _year(match.group("md_y")), month, int(match.group("md_d"))) if month else None
+    if kind == "within":
+        amount = match.group("within_n")
+        return ("in", int(amount) if amount.isdigit() else NUMBER_WORDS[amount], match.group("within_unit"))
+    if kind == "end":
+        return ("end", match.group("end_unit") or _END_UNITS[match.group("end_abbr")])
+    if kind == "next":
+        return ("in", 1, match.group("next_unit"))
+    if kind == "word":
+        return ("days", _WORD_DAYS.get(match.group("word"), 2))
+    if kind == "wd":
+        weekday = WEEKDAYS.lookup(match.group("wd_name"))
+        return ("weekday", weekday - 1, match.group("wd_q") == "next") if weekday else None
+    return None
+
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def _scan(text: str) -> Optional[tuple]:
+    match = GRAMMAR.search(text)
+    while match:
+        spec = _spec(match)
+        if spec is not None:
+            return spec
+        # Not a date after all ("mar 5" is, "mark 5" isn't); look again just past where it started
+        match = GRAMMAR.search(text, match.start() + 1)
+    return None
+
+
+def scan(text: str) -> Optional[tuple]:
+    """The first date expression in text, unresolved (memoized per normalized snippet)"""
+    return _scan(" ".join(text.lower().split()))
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def resolve(spec: Optional[tuple], reference: date) -> Optional[date]:
+    """The date a scan() result means on the reference day; None if it names no valid date"""
+    if spec is None:
+        return None
+    kind = spec[0]
+    try:
+        if kind == "date":
+            _, year, month, day = spec
+            if year is not None:
+                return date(year, month, day)
+            # No year: the next one on or after the reference day (a leap day may be years away)
+            year = reference.year
+            while year <= reference.year + 8:
+                try:
+                    candidate = date(year, month, day)
+                except ValueError:
+                    if (month, day) != (2, 29):
+                        return None
+                else:
+                    if candidate >= reference:
+                        return candidate
+                year += 1
+            return None
+        if kind == "days":
+            return reference + timedelta(days=spec[1])
+        if kind == "in":
+            _, amount, unit = spec
+            if unit == "day":
+                return reference + timedelta(days=amount)
+            if unit == "week":
+                return reference + timedelta(weeks=amount)
+            return _add_months(reference, amount * (12 if unit == "year" else 1))
+        if kind == "end":
+            unit = spec[1]
+            if unit == "day":
+                return reference
+            if unit == "week":
+                return reference + timedelta(days=(END_OF_WEEK - reference.weekday()) % 7)
+            if unit == "month":
+                return reference.replace(day=calendar.monthrange(reference.year, reference.month)[1])
+            return reference.replace(month=12, day=31)
+        if kind == "weekday":
+            _, weekday, after = spec
+            ahead = (weekday - reference.weekday()) % 7
+            return reference + timedelta(days=ahead or (7 if after else 0))
+    except (ValueError, OverflowError):
+        # 31/02, month 13 and the like
+        return None
+    return None
+
+
+def parse_day(text, reference: Union[date, datetime, None] = None) -> Optional[date]:
+    """The first date in text, relative expressions resolved against reference (default today)"""
+    if not text:
+        return None
+    if isinstance(reference, datetime):
+        reference = reference.date()
+    return resolve(scan(str(text)), reference or date.today())
+
+
+def parse_iso(text, reference: Union[date, datetime, None] = None) -> Optional[str]:
+    """parse_day() as YYYY-MM-DD"""
+    day = parse_day(text, reference)
+    return day.isoformat() if day else None
+
+
+def _cache_stats() -> dict:
+    info = _scan.cache_info()
+    return {"date_scan_cache_hits": info.hits, "date_scan_cache_misses": info.misses,
+            "date_scan_cache_entries": info.currsize}
+
+
+registry.add_collector(_cache_stats)
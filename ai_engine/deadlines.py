@@ -0,0 +1,192 @@
+"""
+Normalized deadlines
+
+The deadline column holds whatever the writer had: ISO dates from the
+pipeline, but also "March 15, 2026", "12/31/2026" or "next week" from the
+LLMs and older rows. The sqlite apps keep, next to it,
+
+    deadline_at     UTC epoch seconds (midnight UTC for a bare date), None if unparseable
+    deadline_text   the text deadline_at was parsed from
+
+indexed on deadline_at, so "due in the next N days" is one index range scan:
+
+    GET /opportunities/upcoming?days=7
+
+Writers call index() in the same transaction as their INSERT; backfill()
+parses rows written before the columns existed (or whose deadline changed
+since) in batches at startup, resolving relative dates ("next week") from
+the row's created_at rather than from today:
+
+    python -m ai_engine.deadlines final_opportunities.db
+"""
+import argparse
+import asyncio
+import calendar
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from ai_engine.dates import parse_day
+from monitoring.metrics import count, observe, timer
+
+MAX_UPCOMING_DAYS = 366
+
+
+def deadline_datetime(deadline, reference: Optional[datetime] = None) -> Optional[datetime]:
+    """Naive UTC datetime for a deadline (date, datetime or text); None if there isn't a parseable one"""
+    if deadline is None:
+        return None
+    if isinstance(deadline, datetime):
+        parsed = deadline
+    elif isinstance(deadline, date):
+        parsed = datetime.combine(deadline, datetime.min.time())
+    else:
+        text = str(deadline).strip()
+        if not text:
+            return None
+        try:
+            # Fast path: what the pipeline and the backend write
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            day = parse_day(text, reference)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, datetime.min.time())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def deadline_epoch(deadline, reference: Optional[datetime] = None) -> Optional[int]:
+    """UTC epoch seconds for a deadline; None if there isn't a parseable one"""
+    parsed = deadline_datetime(deadline, reference)
+    return calendar.timegm(parsed.timetuple()) if parsed is not None else None
+
+
+def upcoming_range(days: int, now: Optional[datetime] = None) -> tuple:
+    """[start, end) as naive UTC datetimes: from the start of today through the end of the day N days out"""
+    today = datetime.combine((now or datetime.now(timezone.utc).replace(tzinfo=None)).date(), datetime.min.time())
+    return today, today + timedelta(days=days + 1)
+
+
+def upcoming_window(days: int, now: Optional[datetime] = None) -> tuple:
+    """upcoming_range() in epoch seconds"""
+    return tuple(calendar.timegm(moment.timetuple()) for moment in upcoming_range(days, now))
+
+
+def _created(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+class DeadlineIndex:
+    """deadline_at / deadline_text columns on one opportunities table, and the upcoming listing"""
+
+    def __init__(self, db_path: str, read_model=None, table: str = "opportunities", batch_size: int = 5000):
+        self.db_path = db_path
+        self.read_model = read_model
+        self.table = table
+        self.batch_size = batch_size
+
+    def init_schema(self, conn: sqlite3.Connection) -> bool:
+        """Add the columns, their index and the re-parse trigger; False without a deadline column"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        if "deadline" not in columns:
+            return False
+        # Appended at the end, so SELECT * row indexes in the apps don't move
+        if "deadline_at" not in columns:
+            conn.execute(f"ALTER TABLE {self.table} ADD COLUMN deadline_at INTEGER")
+        if "deadline_text" not in columns:
+            conn.execute(f"ALTER TABLE {self.table} ADD COLUMN deadline_text TEXT")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_deadline_at ON {self.table}(deadline_at)")
+        # deadline_text is set once parsed (even when deadline_at stays NULL), so NULL marks rows backfill() still owes
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_deadline_unparsed ON {self.table}(id) "
+                     f"WHERE deadline_text IS NULL AND deadline IS NOT NULL")
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table}_deadline_update AFTER UPDATE OF deadline ON {self.table}
+            BEGIN
+                UPDATE {self.table} SET deadline_text = NULL WHERE id = NEW.id;
+            END
+        ''')
+        conn.commit()
+        return True
+
+    def index(self, conn: sqlite3.Connection, opportunity_id: int, deadline: Optional[str]):
+        """Store one row's parse; call inside the writer's transaction, after its INSERT"""
+        self._write(conn, [(opportunity_id, deadline, None)])
+
+    def _write(self, conn: sqlite3.Connection, rows):
+        values = []
+        for opportunity_id, deadline, created_at in rows:
+            text = str(deadline) if deadline is not None else None
+            values.append((deadline_epoch(text, _created(created_at)), text, opportunity_id))
+        conn.executemany(f"UPDATE {self.table} SET deadline_at = ?, deadline_text = ? WHERE id = ?", values)
+        count("deadlines_parsed_total", len(rows))
+
+    def backfill(self) -> int:
+        """Parse every row with a deadline but no deadline_text, in batches; returns how many"""
+        start = time.perf_counter()
+        done = 0
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.init_schema(conn):
+                return 0
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+            created = "created_at" if "created_at" in columns else "NULL"
+            while True:
+                rows = conn.execute(
+                    f"SELECT id, deadline, {created} FROM {self.table} "
+                    f"WHERE deadline_text IS NULL AND deadline IS NOT NULL LIMIT ?", (self.batch_size,)
+                ).fetchall()
+                if not rows:
+                    break
+                with conn:
+                    self._write(conn, rows)
+                done += len(rows)
+        finally:
+            conn.close()
+        observe("deadline_backfill", time.perf_counter() - start)
+        return done
+
+    # Reads
+    def upcoming_ids(self, days: int, now: Optional[datetime] = None) -> List[int]:
+        """Ids due from today through N days out, soonest first"""
+        start, end = upcoming_window(days, now)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            return [row[0] for row in conn.execute(
+                f"SELECT id FROM {self.table} WHERE deadline_at >= ? AND deadline_at < ? ORDER BY deadline_at, id",
+                (start, end)
+            )]
+        finally:
+            conn.close()
+
+    def json(self, days: int) -> bytes:
+        """Upcoming opportunities as a JSON array, bodies from the read model (blocking)"""
+        with timer("upcoming_query"):
+            ids = self.upcoming_ids(days)
+        return self.read_model.json_for(ids)
+
+    async def respond(self, days: int):
+        """GET /opportunities/upcoming"""
+        from ai_engine.serialization import json_response
+
+        return json_response(await asyncio.to_thread(self.json, days))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-fill normalized deadline columns")
+    parser.add_argument("db_path", help="SQLite database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done = DeadlineIndex(args.db_path, table=args.table).backfill()
+    print(f"✅ Parsed deadlines for {done} opportunities in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
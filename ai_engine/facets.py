@@ -0,0 +1,328 @@
+"""
+Structured requirements and contacts
+
+The sqlite apps store requirements as one '|'-joined (or JSON) string and
+contact_info as str(dict), so "all Python jobs" or "everything from
+@techcorp.com" meant a full scan and re-parsing every row. This keeps two
+side tables next to the opportunities table:
+
+    opportunity_requirements (opportunity_id, position, skill, requirement)
+        index on (skill, opportunity_id)
+    opportunity_contacts (opportunity_id, type, value)
+        index on (type, value, opportunity_id); type is email, phone,
+        website or domain
+
+skill is a normalized key ("3+ years of Python experience" -> "python"),
+and an email or website also yields its domain and parent domains, so both
+lookups are one index range scan.
+
+Writers call index() in the same transaction as their INSERT or UPDATE.
+Triggers drop a row's entries when it is deleted or its requirements or
+contact_info change under another writer; backfill() (run at startup, or
+from the command line) indexes every row without entries, which is also
+the migration for existing databases:
+
+    python -m ai_engine.facets final_opportunities.db
+    python -m ai_engine.facets final_opportunities.db --skill python
+    python -m ai_engine.facets final_opportunities.db --contact @techcorp.com
+"""
+import argparse
+import ast
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from monitoring.metrics import count, observe
+
+# Keys the extractors (and older rows) have used for each contact type
+CONTACT_KEYS = {
+    "emails": "email", "email": "email",
+    "phones": "phone", "phone": "phone",
+    "websites": "website", "website": "website", "urls": "website", "url": "website",
+}
+
+SKILL_ALIASES = {
+    "python3": "python", "python 3": "python", "py": "python",
+    "js": "javascript", "ecmascript": "javascript",
+    "ts": "typescript",
+    "node": "node.js", "nodejs": "node.js",
+    "react.js": "react", "reactjs": "react",
+    "postgres": "postgresql", "psql": "postgresql",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+}
+_SKILL_PREFIX = re.compile(
+    r'^(?:(?:at\s+least|minimum(?:\s+of)?)\s+)?(?:\d+\s*\+?\s*(?:-\s*\d+\s*)?(?:years?|yrs?)\s*(?:of\s+)?)?'
+    r'(?:(?:strong|good|solid|proven|excellent|deep|hands-on)\s+)?'
+    r'(?:(?:experience|knowledge|proficiency|familiarity|expertise|background)\s+(?:in|with|of)\s+)?'
+)
+_SKILL_SUFFIX = re.compile(r'\s+(?:experience|skills?|knowledge|proficiency|expertise|development)$')
+_SKILL_JUNK = re.compile(r'[^a-z0-9+#./ ]+')
+# Second-level labels under a country code that aren't a registrant's domain (techcorp.co.uk -> not co.uk)
+_PUBLIC_SECOND_LEVEL = {"co", "com", "org", "net", "ac", "gov", "edu", "ltd", "plc", "gob", "nic"}
+
+
+def skill_key(requirement: str) -> str:
+    """Lookup key for one requirement, "" when nothing is left of it (e.g. "3+ years")"""
+    text = unicodedata.normalize("NFKC", requirement).lower().strip()
+    text = _SKILL_JUNK.sub(" ", text)
+    text = " ".join(text.split())
+    text = _SKILL_PREFIX.sub("", text)
+    text = _SKILL_SUFFIX.sub("", text).strip(" ./")
+    return SKILL_ALIASES.get(text, text)
+
+
+def parse_requirements(value) -> List[str]:
+    """Requirements as stored ('|'-joined or a JSON list) or as analyzed (a list)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = text.strip("[]").split(",")
+        else:
+            value = text.split("|")
+    return [str(item).strip() for item in value if item and str(item).strip()]
+
+
+def parse_contact_info(value) -> Dict[str, List[str]]:
+    """contact_info as stored (str(dict) or JSON) or as analyzed (a dict), as {type: [values]}"""
+    if not value:
+        return {}
+    if isinstance(value, str):
+        text = value
+        # str(dict) of plain strings is JSON once its quotes are swapped, and json is ~10x literal_eval
+        if "'" in text and '"' not in text and "\\" not in text:
+            text = text.replace("'", '"')
+        try:
+            value = json.loads(text)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return {}
+    if not isinstance(value, dict):
+        return {}
+    contacts: Dict[str, List[str]] = {}
+    for key, values in value.items():
+        kind = CONTACT_KEYS.get(str(key).lower())
+        if kind is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        contacts.setdefault(kind, []).extend(str(v) for v in values or () if v)
+    return contacts
+
+
+def domains(host: str) -> List[str]:
+    """host and its parent domains: careers.techcorp.com -> [careers.techcorp.com, techcorp.com]"""
+    labels = host.lower().strip(".").split(".")
+    if labels and labels[0] == "www":
+        labels = labels[1:]
+    found = []
+    for start in range(len(labels) - 1):
+        parent = labels[start:]
+        if len(parent) == 2 and len(parent[1]) == 2 and parent[0] in _PUBLIC_SECOND_LEVEL:
+            break
+        found.append(".".join(parent))
+    return found
+
+
+def contact_key(kind: str, value: str) -> str:
+    """Normalized value for one contact, the same whether indexing or looking up"""
+    value = value.strip()
+    if kind == "email":
+        return value.lower()
+    if kind == "phone":
+        return re.sub(r"\D", "", value)
+    if kind == "website":
+        value = re.sub(r"^https?://", "", value.lower()).rstrip("/.,;)")
+        return value[4:] if value.startswith("www.") else value
+    if kind == "domain":
+        return value.lower().lstrip("@").strip(".")
+    return value
+
+
+def contact_entries(contact_info) -> List[Tuple[str, str]]:
+    """(type, value) rows for a contact_info value, domains derived from emails and websites"""
+    entries = []
+    for kind, values in parse_contact_info(contact_info).items():
+        for value in values:
+            key = contact_key(kind, value)
+            if not key:
+                continue
+            entries.append((kind, key))
+            host = key.rsplit("@", 1)[1] if kind == "email" and "@" in key else None
+            if kind == "website":
+                host = key.split("/", 1)[0].split(":", 1)[0]
+            if host:
+                entries.extend(("domain", domain) for domain in domains(host))
+    return list(dict.fromkeys(entries))
+
+
+def parse_contact_query(query: str) -> Tuple[str, str]:
+    """"@techcorp.com" -> domain, "hr@techcorp.com" -> email, "+234..." -> phone, a URL -> website"""
+    query = query.strip()
+    if query.startswith("@"):
+        return "domain", contact_key("domain", query)
+    if "@" in query:
+        return "email", contact_key("email", query)
+    if re.fullmatch(r"[+\d][\d\s().-]{5,}", query):
+        return "phone", contact_key("phone", query)
+    if "/" in query:
+        return "website", contact_key("website", query)
+    return "domain", contact_key("domain", query)
+
+
+class FacetIndex:
+    """Skill and contact side tables for one opportunities table"""
+
+    def __init__(self, db_path: str, table: str = "opportunities", batch_size: int = 2000):
+        self.db_path = db_path
+        self.table = table
+        self.batch_size = batch_size
+
+    def init_schema(self, conn: sqlite3.Connection) -> bool:
+        """Create the side tables, indexes and triggers; False if the table doesn't exist yet"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        if not {"requirements", "contact_info"} <= columns:
+            return False
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS opportunity_requirements (
+                opportunity_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                skill TEXT NOT NULL,
+                requirement TEXT NOT NULL,
+                PRIMARY KEY (opportunity_id, position)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS opportunity_contacts (
+                opportunity_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (opportunity_id, type, value)
+            )
+        ''')
+        # Rows whose entries are current, so backfill() can skip them
+        conn.execute('CREATE TABLE IF NOT EXISTS opportunity_facets (opportunity_id INTEGER PRIMARY KEY)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunity_requirements_skill '
+                     'ON opportunity_requirements(skill, opportunity_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunity_contacts_value '
+                     'ON opportunity_contacts(type, value, opportunity_id)')
+        clear = ''.join(f"DELETE FROM {side} WHERE opportunity_id = OLD.id;"
+                        for side in ("opportunity_requirements", "opportunity_contacts", "opportunity_facets"))
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table}_facets_delete AFTER DELETE ON {self.table}
+            BEGIN {clear} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table}_facets_update AFTER UPDATE OF requirements, contact_info
+            ON {self.table}
+            BEGIN {clear} END
+        ''')
+        conn.commit()
+        return True
+
+    def index(self, conn: sqlite3.Connection, opportunity_id: int, requirements, contact_info):
+        """Replace one row's entries; call inside the writer's transaction, after its INSERT/UPDATE"""
+        self._write(conn, [(opportunity_id, requirements, contact_info)], replace=True)
+
+    def _write(self, conn: sqlite3.Connection, rows, replace: bool = False):
+        ids = [(row[0],) for row in rows]
+        if replace:
+            # Unmarked rows have no entries (the triggers clear both together), so only index() deletes
+            for side in ("opportunity_requirements", "opportunity_contacts"):
+                conn.executemany(f"DELETE FROM {side} WHERE opportunity_id = ?", ids)
+        skills, contacts = [], []
+        for opportunity_id, requirements, contact_info in rows:
+            for position, requirement in enumerate(parse_requirements(requirements)):
+                key = skill_key(requirement)
+                if key:
+                    skills.append((opportunity_id, position, key, requirement))
+            contacts.extend((opportunity_id, kind, value) for kind, value in contact_entries(contact_info))
+        conn.executemany("INSERT OR REPLACE INTO opportunity_requirements VALUES (?, ?, ?, ?)", skills)
+        conn.executemany("INSERT OR IGNORE INTO opportunity_contacts VALUES (?, ?, ?)", contacts)
+        conn.executemany("INSERT OR IGNORE INTO opportunity_facets VALUES (?)", ids)
+        count("facets_indexed_total", len(rows))
+
+    def backfill(self) -> int:
+        """Index every row without entries, in batches; returns how many"""
+        start = time.perf_counter()
+        done = 0
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.init_schema(conn):
+                return 0
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT id, requirements, contact_info FROM {self.table} o WHERE id > ? "
+                    f"AND NOT EXISTS (SELECT 1 FROM opportunity_facets f WHERE f.opportunity_id = o.id) "
+                    f"ORDER BY id LIMIT ?", (last_id, self.batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+                with conn:
+                    self._write(conn, rows)
+                done += len(rows)
+                last_id = rows[-1][0]
+        finally:
+            conn.close()
+        observe("facets_backfill", time.perf_counter() - start)
+        return done
+
+    # Lookups
+    def with_skill(self, skill: str, conn: Optional[sqlite3.Connection] = None) -> List[int]:
+        """Ids of opportunities requiring this skill, newest first"""
+        return self._ids(
+            "SELECT DISTINCT opportunity_id FROM opportunity_requirements WHERE skill = ? ORDER BY opportunity_id DESC",
+            (skill_key(skill),), conn
+        )
+
+    def with_contact(self, query: str, conn: Optional[sqlite3.Connection] = None) -> List[int]:
+        """Ids of opportunities with this contact: "@techcorp.com", "hr@techcorp.com", a phone or a URL"""
+        kind, value = parse_contact_query(query)
+        return self._ids(
+            "SELECT DISTINCT opportunity_id FROM opportunity_contacts WHERE type = ? AND value = ? "
+            "ORDER BY opportunity_id DESC", (kind, value), conn
+        )
+
+    def _ids(self, sql: str, params: tuple, conn: Optional[sqlite3.Connection]) -> List[int]:
+        own = conn is None
+        conn = conn or sqlite3.connect(self.db_path, timeout=30)
+        try:
+            return [row[0] for row in conn.execute(sql, params)]
+        finally:
+            if own:
+                conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-fill and query structured requirements and contacts")
+    parser.add_argument("db_path", help="SQLite database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    parser.add_argument("--skill", help="list opportunities requiring this skill")
+    parser.add_argument("--contact", help="list opportunities with this contact, e.g. @techcorp.com")
+    args = parser.parse_args()
+
+    facets = FacetIndex(args.db_path, args.table)
+    start = time.perf_counter()
+    done = facets.backfill()
+    print(f"✅ Indexed {done} opportunities in {time.perf_counter() - start:.2f}s")
+    if args.skill:
+        print(f"🔎 skill={skill_key(args.skill)}: {facets.with_skill(args.skill)}")
+    if args.contact:
+        print(f"🔎 {'='.join(parse_contact_query(args.contact))}: {facets.with_contact(args.contact)}")
+
+
+if __name__ == "__main__":
+    main()
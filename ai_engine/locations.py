@@ -0,0 +1,310 @@
+"""
+Location gazetteer
+
+Where an opportunity is and how it's worked, from the post text:
+
+    extract_location("Backend role. Location: Ikeja, Lagos")    -> "Ikeja, Nigeria"
+    extract_location("Hybrid role in Nairobi, 3 days in office") -> "Hybrid (Nairobi, Kenya)"
+    extract_location("Fully remote, must be in the UK")          -> "Remote (United Kingdom)"
+    extract_location("Strong in Python and Django")              -> None
+
+Place names come from ai_engine/data/locations.tsv (cities, regions and
+countries plus their aliases), loaded on first use into a trie keyed by
+whole words, so "New York City" and "New York" share their first two nodes
+and every word string is stored once. One left-to-right pass over the
+words looks each one up in the trie and keeps the longest name that
+starts there; the cost doesn't grow with the size of the gazetteer.
+
+Names that are also ordinary words (Delta, Jordan, Rivers) only count
+when capitalized; all-caps ones (US, UK, NYC) only in capitals. Remote,
+hybrid and on-site are one regex over the lower-cased text, and a name
+inside a "Location:" / "based in" label wins over one mentioned elsewhere.
+
+The sqlite apps keep, next to the location label, lower-cased keys the
+location filter matches on, each leading an index with priority_score:
+
+    loc_place     city or region ("lagos"), None for a whole country
+    loc_country   country ("nigeria")
+    loc_mode      remote, hybrid or onsite, None when not stated
+
+so GET /opportunities?location=Lagos finds "Lagos, Nigeria", "Remote (Lagos,
+Nigeria)" and an LLM's "Lagos (hybrid)" alike. Writers call index() in the
+same transaction as their INSERT; backfill() keys older rows at startup:
+
+    python -m ai_engine.locations final_opportunities.db
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from monitoring.metrics import count, observe
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "locations.tsv")
+
+KIND_RANK = {"city": 3, "region": 2, "country": 1}
+
+# Latin letters (all the gazetteer is written in), with inner apostrophes and dots ("Côte d'Ivoire", "U.S");
+# hyphens split words, so "Lagos-based" finds Lagos
+WORD = re.compile(r"[A-Za-zÀ-ÖØ-öø-ɏ]+(?:['’.][A-Za-zÀ-ÖØ-öø-ɏ]+)*")
+LABEL = re.compile(r"\b(?:location|based in|located in)\s*[:\-]?\s+([^\n]+?)(?:\.(?:\s|$)|\n|$)", re.IGNORECASE)
+# "not remote" / "non-remote" is on-site; hybrid beats remote beats on-site when several appear
+WORK_MODE = re.compile(
+    r"\b(?P<onsite>(?:not|no|non)[\s-]+remote|on[\s-]?site|in[\s-]office|in[\s-]person)\b"
+    r"|\b(?P<hybrid>hybrid)\b"
+    r"|\b(?P<remote>remote(?:ly)?|work(?:ing)?\s+from\s+home|wfh)\b"
+)
+# Substrings every WORK_MODE match contains; most posts have none, and `in` is far cheaper than the regex
+WORK_MODE_HINTS = ("remote", "hybrid", "site", "office", "person", "home", "wfh")
+
+
+def _key(word: str) -> str:
+    return word.lower().replace("’", "'")
+
+
+class Place(NamedTuple):
+    name: str
+    kind: str
+    country: str
+
+    def label(self) -> str:
+        if self.kind == "country" or self.name == self.country:
+            return self.country
+        return f"{self.name}, {self.country}"
+
+
+class Gazetteer:
+    """Word-level trie over place names; a node is a dict of next word -> node, its entry under \"\""""
+
+    def __init__(self):
+        self.root = {}
+        self.places: List[Place] = []
+        # Per entry: 0 any case, 1 capitalized, 2 exactly as written (words kept in spelled)
+        self.case: List[int] = []
+        self.spelled: Dict[int, tuple] = {}
+
+    def add(self, name: str, kind: str, country: str, canonical: str = "", flags: str = ""):
+        words = [sys.intern(_key(word)) for word in WORD.findall(name)]
+        if not words:
+            return
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        if "" in node:
+            # First listing wins: cities come before the regions and countries they share a name with
+            return
+        entry = node[""] = len(self.places)
+        self.places.append(Place(canonical or name, sys.intern(kind), sys.intern(country)))
+        if name.isupper():
+            self.case.append(2)
+            self.spelled[entry] = tuple(WORD.findall(name))
+        else:
+            self.case.append(1 if "cap" in flags.split(",") else 0)
+
+    def _cased(self, entry: int, words: List[str], start: int, end: int) -> bool:
+        """Whether words[start:end] as written may mean this entry"""
+        rule = self.case[entry]
+        if rule == 2:
+            # After another all-caps word it's shouting, not an abbreviation: "JOIN US"
+            return tuple(words[start:end]) == self.spelled[entry] and not (start and words[start - 1].isupper())
+        if rule == 1:
+            return all(word[0].isupper() for word in words[start:end])
+        return True
+
+    def scan(self, text: str, lower: Optional[str] = None) -> List[Place]:
+        """Every non-overlapping longest match, left to right (lower: text.lower(), if already at hand)"""
+        return self._walk(text, WORD.findall(_key(text) if lower is None else lower.replace("’", "'")))
+
+    def _walk(self, text: str, keys: List[str], words: Optional[List[str]] = None) -> List[Place]:
+        root = self.root
+        found = []
+        i, end = 0, len(keys)
+        while i < end:
+            node = root.get(keys[i])
+            if node is None:
+                i += 1
+                continue
+            best = None
+            j = i
+            while node is not None:
+                entry = node.get("")
+                if entry is not None:
+                    # The words as written are only needed to check the case of a case-sensitive name
+                    if self.case[entry] and words is None:
+                        words = WORD.findall(text)
+                        if len(words) != end:
+                            # Lower-casing changed the words (rare Unicode): start over on the words as written
+                            return self._walk(text, [_key(word) for word in words], words)
+                    if not self.case[entry] or self._cased(entry, words, i, j + 1):
+                        best = (entry, j + 1)
+                j += 1
+                node = node.get(keys[j]) if j < end else None
+            if best is None:
+                i += 1
+                continue
+            found.append(self.places[best[0]])
+            i = best[1]
+        return found
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path: str = GAZETTEER_PATH) -> Gazetteer:
+    """The gazetteer in path, read once per process"""
+    gazetteer = Gazetteer()
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            gazetteer.add(*fields[:5])
+    return gazetteer
+
+
+def work_mode(lower: str) -> Optional[str]:
+    """"hybrid", "remote", "onsite" or None, from lower-cased text"""
+    if not any(hint in lower for hint in WORK_MODE_HINTS):
+        return None
+    modes = {match.lastgroup for match in WORK_MODE.finditer(lower)}
+    for mode in ("hybrid", "remote", "onsite"):
+        if mode in modes:
+            return mode
+    return None
+
+
+def find_place(content: str, lower: Optional[str] = None) -> Optional[Place]:
+    """The place the post is about: the one in its location label, else the most specific one mentioned"""
+    gazetteer = load_gazetteer()
+    for match in LABEL.finditer(content):
+        places = gazetteer.scan(match.group(1))
+        if places:
+            return max(places, key=lambda place: KIND_RANK[place.kind])
+    places = gazetteer.scan(content, lower)
+    if not places:
+        return None
+    return max(places, key=lambda place: KIND_RANK[place.kind])
+
+
+def extract_location(content: str, lower: Optional[str] = None) -> Optional[str]:
+    """"City, Country" (or region / country), prefixed by Remote / Hybrid when the post says so"""
+    if lower is None:
+        lower = content.lower()
+    mode = work_mode(lower)
+    place = find_place(content, lower)
+    if place is None and mode is None:
+        # A labelled location we have no name for is still better than nothing
+        match = LABEL.search(content)
+        return match.group(1).strip()[:80] if match else None
+    if mode == "remote":
+        return f"Remote ({place.label()})" if place else "Remote"
+    if mode == "hybrid":
+        return f"Hybrid ({place.label()})" if place else "Hybrid"
+    return place.label() if place else "On-site"
+
+
+def location_keys(text: Optional[str]) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """(loc_place, loc_country, loc_mode) for a location label or filter value; None if it names nothing we know"""
+    if not text or not str(text).strip():
+        return None
+    text = str(text)
+    mode = work_mode(text.lower())
+    places = load_gazetteer().scan(text)
+    if not places and mode is None:
+        return None
+    if not places:
+        return None, None, mode
+    place = max(places, key=lambda found: KIND_RANK[found.kind])
+    name = None if place.kind == "country" else place.name.lower()
+    return name, place.country.lower(), mode
+
+
+COLUMNS = (("loc_place", "TEXT"), ("loc_country", "TEXT"), ("loc_mode", "TEXT"), ("loc_text", "TEXT"))
+KEY_COLUMNS = ("loc_place", "loc_country", "loc_mode")
+
+
+class LocationIndex:
+    """loc_* key columns on one opportunities table"""
+
+    def __init__(self, db_path: str, table: str = "opportunities", batch_size: int = 5000):
+        self.db_path = db_path
+        self.table = table
+        self.batch_size = batch_size
+
+    def init_schema(self, conn: sqlite3.Connection) -> bool:
+        """Add the loc_* columns, their indexes and the re-key trigger; False without a location column"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        if "location" not in columns:
+            return False
+        # Appended at the end, so SELECT * row indexes in the apps don't move
+        for name, kind in COLUMNS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {kind}")
+        # Each key leads an index with the default sort, like the other equality filters (ai_engine/queries.py)
+        order = ", priority_score" if "priority_score" in columns else ""
+        for name in KEY_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{name} ON {self.table}({name}{order})")
+        # loc_text is set once keyed (even when every key stays NULL), so NULL marks rows backfill() still owes
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_loc_unparsed ON {self.table}(id) "
+                     f"WHERE loc_text IS NULL AND location IS NOT NULL")
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table}_location_update AFTER UPDATE OF location ON {self.table}
+            BEGIN
+                UPDATE {self.table} SET loc_text = NULL WHERE id = NEW.id;
+            END
+        ''')
+        conn.commit()
+        return True
+
+    def index(self, conn: sqlite3.Connection, opportunity_id: int, location: Optional[str]):
+        """Store one row's keys; call inside the writer's transaction, after its INSERT"""
+        self._write(conn, [(opportunity_id, location)])
+
+    def _write(self, conn: sqlite3.Connection, rows):
+        values = []
+        for opportunity_id, location in rows:
+            text = str(location) if location is not None else None
+            values.append((location_keys(text) or (None, None, None)) + (text, opportunity_id))
+        conn.executemany(f"UPDATE {self.table} SET loc_place = ?, loc_country = ?, loc_mode = ?, loc_text = ? "
+                         f"WHERE id = ?", values)
+        count("locations_keyed_total", len(rows))
+
+    def backfill(self) -> int:
+        """Key every row with a location but no loc_text, in batches; returns how many"""
+        start = time.perf_counter()
+        done = 0
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.init_schema(conn):
+                return 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT id, location FROM {self.table} "
+                    f"WHERE loc_text IS NULL AND location IS NOT NULL LIMIT ?", (self.batch_size,)
+                ).fetchall()
+                if not rows:
+                    break
+                with conn:
+                    self._write(conn, rows)
+                done += len(rows)
+        finally:
+            conn.close()
+        observe("location_backfill", time.perf_counter() - start)
+        return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-fill location key columns")
+    parser.add_argument("db_path", help="SQLite database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done = LocationIndex(args.db_path, args.table).backfill()
+    print(f"✅ Keyed locations for {done} opportunities in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Heuristic analysis pipeline shared by every entry point
+
+Each output field is produced by one registered extractor that declares the
+fields it depends on. analyze_content() returns an Analysis: a dict that
+computes a field the first time it is read, so callers only pay for what
+they use, and shared intermediates (lower-cased text, contact scan) are
+computed once per post.
+
+    analysis = analyze_content(text)
+    analysis["title"], analysis["priority_score"]     # only these + their deps run
+    analysis.complete()                               # plain dict with every output field
+
+Values that are already known (e.g. from an LLM) are passed as known= and
+are never recomputed; fields derived from them (priority from deadline)
+use the known values.
+"""
+import re
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from ai_engine.compensation import (CURRENCY_SYMBOLS, CURRENCY_WORDS, _MULTIPLIER, _NUMBER, _RANGE, is_high_pay,
+                                    parse_compensation)
+from ai_engine.dates import parse_iso
+from ai_engine.locations import extract_location as find_location
+from ai_engine.rescoring import deadline_bonus, deadline_bucket
+from monitoring.metrics import observe
+
+OUTPUT_FIELDS = ("title", "category", "deadline", "requirements", "contact_info",
+                 "priority_score", "compensation", "location", "summary")
+
+# What the WhatsApp confirmation shows; everything else can wait
+CONFIRMATION_FIELDS = ("title", "category", "priority_score", "compensation", "location", "deadline")
+
+# field -> (function(content, *dependencies), dependency field names)
+EXTRACTORS: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+
+
+def extractor(field: str, requires: Iterable[str] = ()):
+    """Register fn(content, *required_values) as the extractor for field"""
+
+    def register(fn):
+        EXTRACTORS[field] = (fn, tuple(requires))
+        return fn
+
+    return register
+
+
+def _is_known(value) -> bool:
+    return value is not None and value != "" and value != [] and value != {}
+
+
+class Analysis(dict):
+    """Lazily computed analysis of one post"""
+
+    def __init__(self, content: str, known: Optional[Dict] = None):
+        super().__init__()
+        self.content = content or ""
+        self._computing = set()
+        if known:
+            self.update({k: v for k, v in known.items() if _is_known(v)})
+
+    def __missing__(self, field: str):
+        if field not in EXTRACTORS:
+            raise KeyError(field)
+        if field in self._computing:
+            raise RuntimeError(f"Extractor dependency cycle at {field}")
+        fn, requires = EXTRACTORS[field]
+        self._computing.add(field)
+        try:
+            args = [self[dep] for dep in requires]
+            start = time.perf_counter()
+            value = fn(self.content, *args)
+            observe(f"extract_{field}", time.perf_counter() - start)
+        finally:
+            self._computing.discard(field)
+        self[field] = value
+        return value
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def fields(self, names: Iterable[str]) -> Dict:
+        return {name: self[name] for name in names}
+
+    def complete(self) -> Dict:
+        """Every output field plus anything already known (e.g. ai_provider)"""
+        for name in OUTPUT_FIELDS:
+            self[name]
+        return {k: v for k, v in self.items() if not k.startswith("_")}
+
+
+def analyze_content(content: str, known: Optional[Dict] = None) -> Analysis:
+    return Analysis(content, known)
+
+
+# Touches every extractor and pattern; used for startup warm-up
+WARMUP_SAMPLE = (
+    "URGENT: Senior Python Developer at Acme Corp\n"
+    "Location: Lagos. Salary: $120k - $150k + equity. Deadline: December 15, 2026.\n"
+    "Requirements: 5+ years Python, Django and AWS. Apply to jobs@acme.com or 555-123-4567, "
+    "details at https://acme.com/careers"
+)
+
+
+def warm_up():
+    """Run every extractor once so the first real post doesn't pay for regex compilation"""
+    analyze_content(WARMUP_SAMPLE).complete()
+
+
+# Shared intermediates
+@extractor("_lower")
+def _lower(content: str) -> str:
+    return content.lower()
+
+
+@extractor("_contacts")
+def _contacts(content: str) -> Dict:
+    return {
+        "emails": re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', content),
+        "phones": re.findall(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', content),
+        "websites": re.findall(r'https?://[^\s]+', content)
+    }
+
+
+# Output fields
+@extractor("title")
+def extract_title(content: str) -> str:
+    """First line, cut at the first sentence when it runs long"""
+    first_line = content.strip().split('\n')[0].strip()
+    if not first_line:
+        return "Untitled Opportunity"
+    if len(first_line) > 80:
+        first_line = first_line.split('. ')[0]
+    return first_line[:80] + "..." if len(first_line) > 80 else first_line
+
+
+CATEGORY_KEYWORDS = {
+    "job": ["job", "position", "role", "hiring", "employment", "career", "developer", "engineer", "manager"],
+    "freelance": ["freelance", "contract", "gig", "project", "consultant"],
+    "business": ["business", "partnership", "investment", "startup", "entrepreneur", "venture"],
+    "grant": ["grant", "funding", "scholarship", "award", "fellowship", "sponsorship"],
+    "competition": ["competition", "contest", "hackathon", "challenge", "tournament"],
+    "internship": ["internship", "intern ", "graduate trainee"]
+}
+
+
+@extractor("category", requires=("_lower",))
+def detect_category(content: str, lower: str) -> str:
+    """Category with the most keyword hits (first listed wins ties)"""
+    best, best_score = "other", 0
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in lower)
+        if score > best_score:
+            best, best_score = category, score
+    return best
+
+
+# A dot followed by a digit (15.02.2025) doesn't end the snippet
+DEADLINE_PATTERNS = [
+    r'deadline[:\s]*((?:[^.\n!]|\.(?=\d))+)',
+    r'due[:\s]*((?:[^.\n!]|\.(?=\d))+)',
+    r'apply by[:\s]*((?:[^.\n!]|\.(?=\d))+)',
+    r'closes?[:\s]*((?:[^.\n!]|\.(?=\d))+)',
+    r'expires[:\s]*((?:[^.\n!]|\.(?=\d))+)',
+    r'(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{4}',
+    r'\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s+\d{4}',
+    r'\d{1,2}/\d{1,2}/\d{4}',
+    r'\d{1,2}\.\d{1,2}\.\d{4}',
+    r'\d{4}-\d{1,2}-\d{1,2}'
+]
+
+
+def parse_date(date_text: str, now: Optional[datetime] = None) -> Optional[str]:
+    """YYYY-MM-DD for the first date in date_text (ai_engine/dates.py); relative ones count from now, default today"""
+    return parse_iso(date_text, now)
+
+
+@extractor("deadline")
+def extract_deadline(content: str) -> Optional[str]:
+    for pattern in DEADLINE_PATTERNS:
+        match = re.search(pattern, content, re.IGNORECASE)
+        if match:
+            date_text = match.group(1) if match.groups() else match.group(0)
+            parsed = parse_date(date_text)
+            if parsed:
+                return parsed
+    return None
+
+
+REQUIREMENT_PATTERNS = [
+    r'requirements?[:\s]*([^.!]+)',
+    r'qualifications?[:\s]*([^.!]+)',
+    r'skills?[:\s]*([^.!]+)',
+    r'experience[:\s]*([^.!]+)',
+    r'must have[:\s]*([^.!]+)',
+    r'need someone with[:\s]*([^.!]+)'
+]
+
+
+@extractor("requirements")
+def extract_requirements(content: str) -> list:
+    requirements = []
+    for pattern in REQUIREMENT_PATTERNS:
+        for match in re.findall(pattern, content, re.IGNORECASE):
+            for item in re.split(r'[,;•\n]|and\s+', match):
+                item = item.strip()
+                if 3 < len(item) < 50:
+                    requirements.append(item)
+    return requirements[:5]
+
+
+@extractor("contact_info", requires=("_contacts",))
+def extract_contact_info(content: str, contacts: Dict) -> Dict:
+    return dict(contacts)
+
+
+# Currency, amount, optional range and the period / "+ equity" after it, in the grammar
+# ai_engine/compensation.py parses, so nothing it understands ("$1.2 million", "$50,000 and $70,000") is cut off
+_PAY_CURRENCY = (r'(?:[' + "".join(CURRENCY_SYMBOLS) + r']|\b(?:'
+                 + "|".join(sorted(CURRENCY_WORDS, key=len, reverse=True)) + r')\b)')
+_PAY_VALUE = r'(?:' + _NUMBER + r')(?:\s*' + _MULTIPLIER + r')?'
+_PAY_AMOUNT = (_PAY_VALUE + r'(?:\s*' + _PAY_CURRENCY + r')?'
+               r'(?:' + _RANGE + r'(?:' + _PAY_CURRENCY + r'\s*)?' + _PAY_VALUE + r'(?:\s*' + _PAY_CURRENCY + r')?)?')
+_PAY_PERIOD = (r'(?:\s*(?:/\s*(?:hour|hr|day|week|month|mo|year|yr)\b|per\s+(?:hour|day|week|month|year|annum|project)\b'
+               r'|an?\s+(?:hour|day|week|month|year)\b|hourly\b|daily\b|weekly\b|monthly\b|annually\b|yearly\b))?'
+               r'(?:\s*\+\s*\w+)?')
+COMPENSATION_PATTERNS = [
+    r'salary[:\s]*(?:' + _PAY_CURRENCY + r'\s*)?' + _PAY_AMOUNT + _PAY_PERIOD,
+    r'budget[:\s]*(?:' + _PAY_CURRENCY + r'\s*)?' + _PAY_AMOUNT + _PAY_PERIOD,
+    _PAY_CURRENCY + r'\s*' + _PAY_AMOUNT + _PAY_PERIOD,
+    r'pay[:\s]*(?:' + _PAY_CURRENCY + r'\s*)?' + _PAY_AMOUNT + _PAY_PERIOD,
+    # "15 dollars an hour": no keyword and the currency after the amount
+    r'\b' + _PAY_VALUE + r'\s*' + _PAY_CURRENCY + _PAY_PERIOD,
+]
+
+
+@extractor("compensation")
+def extract_compensation(content: str) -> Optional[str]:
+    for pattern in COMPENSATION_PATTERNS:
+        match = re.search(pattern, content, re.IGNORECASE)
+        if match:
+            return match.group(0).strip()
+    return None
+
+
+@extractor("location", requires=("_lower",))
+def extract_location(content: str, lower: str) -> Optional[str]:
+    """Place from the gazetteer plus remote / hybrid / on-site (ai_engine/locations.py)"""
+    return find_location(content, lower)
+
+
+@extractor("priority_score", requires=("_lower", "deadline", "compensation"))
+def calculate_priority(content: str, lower: str, deadline: Optional[str], compensation: Optional[str]) -> float:
+    score = 5.0
+
+    if any(word in lower for word in ['urgent', 'asap', 'immediate', 'rush']):
+        score += 2.0
+    if any(word in lower for word in ['senior', 'lead', 'manager', 'director', 'cto']):
+        score += 1.5
+
+    if compensation:
+        pay = parse_compensation(compensation)
+        if is_high_pay(pay):
+            score += 1.0
+        if pay["equity"]:
+            score += 0.5
+
+    # Same buckets the re-scoring job moves rows between as the deadline approaches
+    score += deadline_bonus(deadline_bucket(deadline))
+
+    return min(10.0, score)
+
+
+@extractor("summary", requires=("category", "requirements"))
+def summarize(content: str, category: str, requirements: list) -> str:
+    return f"Smart analysis: {category} opportunity with {len(requirements)} requirements"
@@ -0,0 +1,206 @@
+"""
+Message Pre-Filter - cheap triage before any LLM or DB work
+
+Routes every incoming message to one of:
+  ignore      - chatter like "thanks", "ok 👍", group banter
+  command     - bot commands ("help", "/list", ...)
+  opportunity - worth a full analysis and an insert
+
+Features are length, keyword density and structure (links, emails, money,
+dates, bullets). A tiny logistic regression is trained locally on the seed
+examples below the first time it is needed - no API keys, no downloads.
+"""
+import json
+import math
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+COMMANDS = {"help", "start", "menu", "list", "stats", "status", "hi", "hello"}
+
+OPPORTUNITY_KEYWORDS = {
+    "job", "position", "role", "hiring", "developer", "engineer", "manager", "intern",
+    "internship", "freelance", "contract", "gig", "project", "grant", "funding",
+    "scholarship", "fellowship", "competition", "hackathon", "contest", "apply",
+    "application", "deadline", "salary", "budget", "requirements", "experience",
+    "skills", "remote", "opportunity", "vacancy", "opening", "startup", "investment",
+    "paid", "stipend", "prize", "award", "candidates", "qualifications"
+}
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_URL_RE = re.compile(r"https?://|www\.")
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_MONEY_RE = re.compile(r"[$€£₦]\s?\d|\d+\s?k\b|\b\d{2,3},\d{3}\b", re.IGNORECASE)
+_DATE_RE = re.compile(
+    r"\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b|\b\d{4}-\d{1,2}-\d{1,2}\b|"
+    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b",
+    re.IGNORECASE
+)
+_LABEL_RE = re.compile(r"^\s*[A-Za-z ]{3,20}:", re.MULTILINE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+", re.MULTILINE)
+
+FEATURE_NAMES = [
+    "log_length", "keyword_density", "keyword_count", "has_url", "has_email",
+    "has_money", "has_date", "line_count", "label_count", "bullet_count"
+]
+
+# Seed corpus for the local model: (text, is_opportunity)
+SEED_EXAMPLES = [
+    ("Hiring a Senior Python Developer, remote. Salary $120k. Apply by March 10, 2025 at jobs@acme.io", 1),
+    ("Freelance React project, budget $2,000. Must have 3 years experience. DM me", 1),
+    ("Google Africa scholarship open! Deadline: 15/02/2025. Apply here https://g.co/apply", 1),
+    ("We are looking for a data analyst intern. Requirements: SQL, Excel, Python", 1),
+    ("Grant funding of up to $50,000 for early stage startups. Applications close April 1", 1),
+    ("Hackathon this weekend, $5k prize pool, register at https://hack.dev", 1),
+    ("Position: Backend Engineer\nLocation: Lagos\nSalary: 400k/month\nSend CV to hr@firm.ng", 1),
+    ("Contract gig: build a landing page, paid, 2 weeks, reply if interested", 1),
+    ("Fellowship opportunity for young researchers, stipend provided, deadline next week", 1),
+    ("Urgent! Need a mobile developer for a startup project, equity + pay", 1),
+    ("Job opening: product manager at fintech, 5+ years experience, hybrid in Nairobi", 1),
+    ("Call for applications: women in tech program, fully funded, apply before 30 June", 1),
+    ("Vacancy - customer support role, remote, $800/month, send resume", 1),
+    ("Looking for a UI/UX designer for a 3 month contract. Skills: Figma, prototyping", 1),
+    ("Investment opportunity: seed round for agritech startup, contact founder@agri.co", 1),
+    ("Writing competition for students, winners get $1000 award, closes Jan 31", 1),
+    ("thanks", 0),
+    ("ok 👍", 0),
+    ("Good morning everyone", 0),
+    ("lol that's funny", 0),
+    ("Happy birthday bro!! 🎉🎉", 0),
+    ("Who is coming tonight?", 0),
+    ("I'll call you later", 0),
+    ("Thank you so much, I really appreciate it", 0),
+    ("😂😂😂", 0),
+    ("yes", 0),
+    ("Please share the notes from yesterday's class", 0),
+    ("Did anyone see the match last night? What a game", 0),
+    ("Congrats on the new job man, well deserved", 0),
+    ("Sorry I missed your call, was in a meeting", 0),
+    ("Amen 🙏", 0),
+    ("Where are we meeting for lunch?", 0),
+]
+
+
+def extract_features(text: str) -> List[float]:
+    """Cheap numeric features for one message"""
+    lowered = text.lower()
+    words = _WORD_RE.findall(lowered)
+    keyword_count = sum(1 for word in words if word in OPPORTUNITY_KEYWORDS)
+    return [
+        math.log1p(len(text)) / 6.0,
+        keyword_count / max(1, len(words)),
+        min(keyword_count, 10) / 10.0,
+        1.0 if _URL_RE.search(text) else 0.0,
+        1.0 if _EMAIL_RE.search(text) else 0.0,
+        1.0 if _MONEY_RE.search(text) else 0.0,
+        1.0 if _DATE_RE.search(text) else 0.0,
+        min(text.count("\n") + 1, 10) / 10.0,
+        min(len(_LABEL_RE.findall(text)), 5) / 5.0,
+        min(len(_BULLET_RE.findall(text)), 5) / 5.0,
+    ]
+
+
+class LogisticModel:
+    """Minimal logistic regression trained with batch gradient descent"""
+
+    def __init__(self, n_features: int):
+        self.weights = [0.0] * n_features
+        self.bias = 0.0
+
+    def predict(self, features: List[float]) -> float:
+        z = self.bias + sum(w * x for w, x in zip(self.weights, features))
+        if z < -30:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def fit(self, rows: List[List[float]], labels: List[int], epochs: int = 400, lr: float = 0.5):
+        n = len(rows)
+        for _ in range(epochs):
+            grad_w = [0.0] * len(self.weights)
+            grad_b = 0.0
+            for features, label in zip(rows, labels):
+                error = self.predict(features) - label
+                grad_b += error
+                for i, x in enumerate(features):
+                    grad_w[i] += error * x
+            self.bias -= lr * grad_b / n
+            self.weights = [w - lr * g / n for w, g in zip(self.weights, grad_w)]
+        return self
+
+
+class MessagePrefilter:
+    """Routes messages to ignore / command / opportunity"""
+
+    def __init__(self, threshold: Optional[float] = None, min_chars: Optional[int] = None,
+                 audit_path: Optional[str] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("PREFILTER_THRESHOLD", "0.4"))
+        self.min_chars = min_chars if min_chars is not None else int(os.getenv("PREFILTER_MIN_CHARS", "15"))
+        self.audit_path = audit_path or os.getenv("PREFILTER_AUDIT_LOG", "prefilter_audit.log")
+        self.enabled = os.getenv("PREFILTER_ENABLED", "true").lower() != "false"
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> LogisticModel:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    rows = [extract_features(text) for text, _ in SEED_EXAMPLES]
+                    labels = [label for _, label in SEED_EXAMPLES]
+                    self._model = LogisticModel(len(FEATURE_NAMES)).fit(rows, labels)
+        return self._model
+
+    def classify(self, text: str, has_media: bool = False) -> Dict:
+        """Return {"route", "score", "reason"} for one message"""
+        text = (text or "").strip()
+
+        if has_media:
+            return {"route": "opportunity", "score": 1.0, "reason": "media attached"}
+        if not text:
+            return {"route": "command", "score": 0.0, "reason": "empty message"}
+
+        first_word = text.split()[0].lower().lstrip("/!").rstrip("!.?")
+        if (text.startswith("/") or len(text.split()) <= 2) and first_word in COMMANDS:
+            return {"route": "command", "score": 0.0, "reason": f"command:{first_word}"}
+
+        if not self.enabled:
+            return {"route": "opportunity", "score": 1.0, "reason": "prefilter disabled"}
+
+        features = extract_features(text)
+        if len(text) < self.min_chars and not any(features[3:7]):
+            return {"route": "ignore", "score": 0.0, "reason": "too short"}
+
+        score = self.model.predict(features)
+        if score < self.threshold:
+            return {"route": "ignore", "score": round(score, 3), "reason": "below threshold"}
+        return {"route": "opportunity", "score": round(score, 3), "reason": "model"}
+
+    def audit(self, decision: Dict, text: str, sender: str = ""):
+        """Append a dropped message to the audit log (JSON lines)"""
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "from": sender,
+            "route": decision["route"],
+            "score": decision["score"],
+            "reason": decision["reason"],
+            "text": (text or "")[:200]
+        }
+        try:
+            with self._lock:
+                with open(self.audit_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write prefilter audit log: {e}")
+
+
+_prefilter = None
+
+
+def get_prefilter() -> MessagePrefilter:
+    """Shared pre-filter for the process"""
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = MessagePrefilter()
+    return _prefilter
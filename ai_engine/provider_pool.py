@@ -0,0 +1,366 @@
+"""
+LLM Provider Pool - routes analysis across Gemini and OpenAI
+
+Every provider sits behind the same interface. The pool picks the provider
+with the best observed latency / error rate that still has quota left,
+hedges to a second provider when the first runs past its p95, and fails
+over instead of dropping straight to keyword analysis.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ai_engine.clients import get_gemini_model, get_openai_client, has_library
+from ai_engine.dates import parse_iso
+from monitoring.metrics import count, observe
+
+VALID_CATEGORIES = ["job", "freelance", "business", "grant", "competition", "internship", "other"]
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove markdown code fences around a JSON answer"""
+    text = text.strip()
+    if '```json' in text:
+        text = text.split('```json')[1].split('```')[0]
+    elif '```' in text:
+        text = text.split('```')[1].split('```')[0]
+    return text.strip()
+
+
+def validate_analysis(result: dict) -> dict:
+    """Normalize any provider's output to the shared analysis shape"""
+
+    if not isinstance(result, dict):
+        raise ValueError("LLM response is not a JSON object")
+
+    contact_info = result.get("contact_info") or {}
+    if not isinstance(contact_info, dict):
+        contact_info = {}
+
+    requirements = result.get("requirements") or []
+    if isinstance(requirements, str):
+        requirements = [requirements]
+    requirements = [str(item).strip() for item in requirements if str(item).strip()]
+
+    try:
+        priority_score = float(result.get("priority_score", 5.0))
+    except (TypeError, ValueError):
+        priority_score = 5.0
+
+    validated = {
+        "title": str(result.get("title") or "Untitled Opportunity")[:100],
+        "category": str(result.get("category") or "other").lower(),
+        "deadline": result.get("deadline"),
+        "requirements": requirements,
+        "contact_info": contact_info,
+        "priority_score": max(1.0, min(10.0, priority_score)),
+        "compensation": result.get("compensation") or None,
+        "location": result.get("location") or None,
+        "summary": str(result.get("summary") or "")[:200]
+    }
+
+    # Validate category
+    if validated["category"] not in VALID_CATEGORIES:
+        validated["category"] = "other"
+
+    # Validate deadline format (OpenAI may add a time part)
+    deadline = validated["deadline"]
+    if isinstance(deadline, datetime):
+        validated["deadline"] = deadline.strftime("%Y-%m-%d")
+    elif deadline:
+        try:
+            validated["deadline"] = datetime.strptime(str(deadline)[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            # "March 15, 2026", "15.03.2026", "next Friday" and the like
+            validated["deadline"] = parse_iso(str(deadline))
+    else:
+        validated["deadline"] = None
+
+    return validated
+
+
+class LLMProvider(ABC):
+    """Common interface for one LLM backend with its own health stats"""
+
+    name = "llm"
+
+    def __init__(self, rpm_limit: int = 60, window: int = 200):
+        self.rpm_limit = rpm_limit
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.calls = deque()
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def request(self, content: str) -> dict:
+        """Return the provider's raw JSON answer, raising on failure"""
+
+    def prepare(self):
+        """Import the SDK and build the client ahead of the first request"""
+
+    def call(self, content: str) -> dict:
+        """Run one request and record latency, outcome and quota usage"""
+        with self.lock:
+            self.calls.append(time.time())
+        start = time.perf_counter()
+        try:
+            result = self.request(content)
+        except Exception as e:
+            latency = time.perf_counter() - start
+            self._record(latency, False)
+            observe(f"llm_{self.name}", latency)
+            if isinstance(e, json.JSONDecodeError):
+                count("llm_json_parse_failures_total", provider=self.name)
+                outcome = "bad_json"
+            elif is_quota_error(e):
+                # Provider told us we're out of quota, back off for a while
+                self.cooldown_until = time.time() + 60
+                outcome = "quota"
+            else:
+                outcome = "error"
+            count("llm_calls_total", provider=self.name, outcome=outcome)
+            raise
+        latency = time.perf_counter() - start
+        self._record(latency, True)
+        observe(f"llm_{self.name}", latency)
+        count("llm_calls_total", provider=self.name, outcome="ok")
+        return result
+
+    def _record(self, latency: float, ok: bool):
+        with self.lock:
+            self.latencies.append(latency)
+            self.outcomes.append(ok)
+            # Trip the breaker when most recent calls failed
+            recent = list(self.outcomes)[-10:]
+            if len(recent) >= 5 and recent.count(False) / len(recent) > 0.5:
+                self.cooldown_until = max(self.cooldown_until, time.time() + 30)
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency of recent calls"""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < 5:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def mean_latency(self, default: float = 2.0) -> float:
+        with self.lock:
+            samples = list(self.latencies)
+        return sum(samples) / len(samples) if samples else default
+
+    def error_rate(self) -> float:
+        with self.lock:
+            outcomes = list(self.outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def remaining_quota(self) -> int:
+        cutoff = time.time() - 60
+        with self.lock:
+            while self.calls and self.calls[0] < cutoff:
+                self.calls.popleft()
+            return self.rpm_limit - len(self.calls)
+
+    def available(self) -> bool:
+        return time.time() >= self.cooldown_until and self.remaining_quota() > 0
+
+    def score(self) -> float:
+        """Lower is better: expected latency under quota pressure plus an error penalty"""
+        quota_pressure = 1.0 - self.remaining_quota() / max(1, self.rpm_limit)
+        return self.mean_latency() * (1 + quota_pressure) + 10.0 * self.error_rate()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "available": self.available(),
+            "mean_latency": round(self.mean_latency(), 3),
+            "p95_latency": self.p95(),
+            "error_rate": round(self.error_rate(), 3),
+            "remaining_quota": self.remaining_quota()
+        }
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, **kwargs):
+        super().__init__(rpm_limit=int(os.getenv("GEMINI_RPM", "60")), **kwargs)
+        self._analyzer = None
+
+    def prepare(self):
+        if self._analyzer is None:
+            from gemini_analyzer import GeminiOpportunityAnalyzer
+            self._analyzer = GeminiOpportunityAnalyzer(use_pool=False)
+        get_gemini_model()
+
+    def request(self, content: str) -> dict:
+        if self._analyzer is None:
+            self.prepare()
+        return self._analyzer.request_analysis(content)
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, **kwargs):
+        super().__init__(rpm_limit=int(os.getenv("OPENAI_RPM", "60")), **kwargs)
+        self._analyzer = None
+
+    def prepare(self):
+        if self._analyzer is None:
+            from ai_engine.analyzer import OpportunityAnalyzer
+            self._analyzer = OpportunityAnalyzer(use_pool=False)
+        get_openai_client(self._analyzer.api_base)
+
+    def request(self, content: str) -> dict:
+        if self._analyzer is None:
+            self.prepare()
+        return self._analyzer.request_analysis(content)
+
+
+def is_quota_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+class ProviderPool:
+    """Routes each analysis to the healthiest provider, hedging slow calls"""
+
+    def __init__(self, providers: List[LLMProvider], timeout: float = 20.0, hedge_delay: float = 3.0):
+        self.providers = providers
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=max(2, 4 * len(providers)), thread_name_prefix="llm")
+
+    def ranked(self) -> List[LLMProvider]:
+        """Available providers, best first"""
+        return sorted((p for p in self.providers if p.available()), key=lambda p: p.score())
+
+    def provider_names(self) -> List[str]:
+        return [p.name for p in self.providers]
+
+    def analyze(self, content: str) -> Optional[Dict]:
+        """Analyze with the best provider; None only when every provider failed"""
+
+        candidates = self.ranked()
+        if not candidates:
+            if self.providers:
+                count("llm_fallbacks_total", reason="no_provider_available")
+            return None
+
+        pending = {}
+
+        def launch():
+            provider = candidates.pop(0)
+            pending[self.executor.submit(provider.call, content)] = provider
+            return provider
+
+        primary = launch()
+        hedge_at = time.monotonic() + (primary.p95() or self.hedge_delay)
+        give_up_at = time.monotonic() + self.timeout
+
+        while pending:
+            now = time.monotonic()
+            if now >= give_up_at:
+                break
+            wait_until = min(hedge_at, give_up_at) if candidates else give_up_at
+            done, _ = wait(list(pending), timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is past its p95, race a second provider
+                if candidates and time.monotonic() >= hedge_at:
+                    hedged = launch()
+                    count("llm_hedges_total")
+                    hedge_at = time.monotonic() + (hedged.p95() or self.hedge_delay)
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = validate_analysis(future.result())
+                except Exception as e:
+                    print(f"⚠️ {provider.name} failed: {e}")
+                    # Fail over right away instead of waiting for the hedge timer
+                    if candidates and not pending:
+                        launch()
+                    continue
+                result["ai_provider"] = provider.name
+                return result
+
+        print("⚠️ No LLM provider answered in time")
+        count("llm_fallbacks_total", reason="no_answer")
+        return None
+
+    async def analyze_async(self, content: str) -> Optional[Dict]:
+        """Run analyze() off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze, content)
+
+    def status(self) -> List[dict]:
+        return [p.status() for p in self.providers]
+
+    def warm_up(self, call: Optional[bool] = None):
+        """Build every provider's client; with WARMUP_LLM_CALL=true also send one synthetic analysis
+
+        Building a client doesn't connect, so only the call pays the TLS handshake
+        up front - at the cost of one request against each provider's quota.
+        """
+        for provider in self.providers:
+            try:
+                provider.prepare()
+            except Exception as e:
+                print(f"⚠️ Could not prepare {provider.name}: {e}")
+        if call is None:
+            call = os.getenv("WARMUP_LLM_CALL", "false").lower() in ("1", "true", "yes")
+        if call and self.providers:
+            from ai_engine.pipeline import WARMUP_SAMPLE
+            self.analyze(WARMUP_SAMPLE)
+
+
+def _configured(value: Optional[str], placeholder: str) -> bool:
+    return bool(value) and value != placeholder and not value.startswith(placeholder)
+
+
+def build_default_pool() -> ProviderPool:
+    """Build a pool from the providers configured in the environment"""
+    providers = []
+
+    # SDKs are only imported on a provider's first request (ai_engine/clients.py)
+    if _configured(os.getenv("GEMINI_API_KEY"), "your-gemini-key-here"):
+        if has_library("google.generativeai"):
+            providers.append(GeminiProvider())
+        else:
+            print("⚠️ Gemini library not installed")
+
+    if _configured(os.getenv("OPENAI_API_KEY"), "sk-your-openai"):
+        if has_library("openai"):
+            providers.append(OpenAIProvider())
+        else:
+            print("⚠️ OpenAI library not installed")
+
+    return ProviderPool(
+        providers,
+        timeout=float(os.getenv("LLM_POOL_TIMEOUT", "20")),
+        hedge_delay=float(os.getenv("LLM_HEDGE_DELAY", "3"))
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_provider_pool() -> ProviderPool:
+    """Shared pool for the process"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = build_default_pool()
+    return _pool
@@ -0,0 +1,485 @@
+"""
+Server-side filtering and sorting for GET /opportunities
+
+    GET /opportunities?status=new&min_priority=7&deadline_to=2026-12-31&sort=deadline&limit=50
+
+Filters: category, status, source, location, min_priority (>=),
+max_priority (<=), deadline_from / deadline_to (YYYY-MM-DD, inclusive) and,
+in the sqlite apps, skill and contact (ai_engine/facets.py) and
+min_salary / max_salary (annual pay, inclusive) and currency
+(ai_engine/compensation.py). sort is priority (highest first, the default),
+deadline (soonest first, none last), salary (best paid first, none last;
+amounts aren't converted between currencies, so pair it with currency),
+newest or oldest. A request without parameters is still the read model's
+full listing. An unknown parameter or a bad value is a 400 naming it.
+
+Deadlines are compared as dates, not as the text an LLM wrote: the sqlite
+apps filter and sort on ai_engine/deadlines.py's indexed deadline_at (UTC
+epoch seconds), the backend on its DateTime deadline column.
+
+location is matched by place, not by label: "Lagos" finds "Lagos, Nigeria"
+and "Remote (Lagos, Nigeria)", "Nigeria" every place in it and "remote"
+every remote one, via ai_engine/locations.py's loc_* keys; a value the
+gazetteer doesn't know is compared with the whole label, ignoring case.
+
+The same filter dict drives both backends:
+
+  * sqlite apps - OpportunitySearch builds one SELECT id query; the ids come
+    off a composite index and the bodies are the read model's cached JSON
+    fragments, so a filtered page costs an index search and a join
+  * backend - apply_filters() adds the same clauses to a SQLAlchemy query;
+    the model declares the matching indexes
+
+Indexes follow the dashboard's query mix: each equality filter leads an
+index on (column, priority_score) so the default sort comes off the index
+too (location's keys lead ai_engine/locations.py's own); priority ranges
+have their own, deadline ranges use deadline_at's, salary ranges use
+ai_engine/compensation.py's (comp_currency, comp_annual) and (comp_annual). check_plans() runs
+EXPLAIN QUERY PLAN for every supported filter under every sort and reports
+any that falls back to a table scan:
+
+    python -m ai_engine.queries final_opportunities.db
+    python -m ai_engine.queries --backend
+
+tests/test_query_plans.py runs the same checks on every app's schema and
+on the backend model.
+"""
+import argparse
+import asyncio
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from fastapi import Request
+except ImportError:
+    # Only the GET /opportunities dependency needs it; the plan checks run without FastAPI
+    Request = None
+
+from ai_engine.compensation import currency_code
+from ai_engine.deadlines import deadline_epoch
+from ai_engine.locations import KEY_COLUMNS, location_keys
+from monitoring.metrics import timer
+
+EQUALITY_FILTERS = ("category", "status", "source", "location")
+RANGE_FILTERS = ("min_priority", "max_priority", "deadline_from", "deadline_to")
+FACET_FILTERS = ("skill", "contact")
+SALARY_FILTERS = ("min_salary", "max_salary", "currency")
+FILTERS = EQUALITY_FILTERS + RANGE_FILTERS + FACET_FILTERS + SALARY_FILTERS
+# Which column a filter needs, for tables that lack some
+FILTER_COLUMNS = {
+    "location": "loc_place",
+    "min_priority": "priority_score", "max_priority": "priority_score",
+    "deadline_from": "deadline_at", "deadline_to": "deadline_at",
+    "skill": "requirements", "contact": "contact_info",
+    "min_salary": "comp_annual", "max_salary": "comp_annual", "currency": "comp_currency",
+}
+
+# sort -> ((column, descending), ...); ties break on id, which is insert order
+SORTS = {
+    "priority": (("priority_score", True), ("id", True)),
+    "deadline": (("deadline_at", False), ("id", False)),
+    "salary": (("comp_annual", True), ("id", True)),
+    "newest": (("id", True),),
+    "oldest": (("id", False),),
+}
+MAX_LIMIT = 1000
+
+# (name suffix, indexed expression); created for whichever columns the table has
+INDEXES = (
+    ("status_priority", ("status", "priority_score")),
+    ("category_priority", ("category", "priority_score")),
+    ("source_priority", ("source", "priority_score")),
+    ("location_priority", ("location COLLATE NOCASE", "priority_score")),
+    ("priority", ("priority_score",)),
+)
+# The backend model's deadline is already a DateTime, so it stands in for deadline_at
+BACKEND_COLUMNS = {"deadline_at": "deadline"}
+
+
+def _parse_day(name: str, value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD), got {value!r}")
+
+
+def parse_filters(params, default_sort: str = "priority") -> Dict:
+    """Validated filters from query parameters; ValueError names the bad one"""
+    unknown = set(params) - set(FILTERS) - {"sort", "limit", "offset"}
+    if unknown:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+
+    filters = {}
+    for name in EQUALITY_FILTERS + FACET_FILTERS:
+        value = params.get(name)
+        if value not in (None, ""):
+            filters[name] = str(value).strip()
+    for name in ("min_priority", "max_priority", "min_salary", "max_salary"):
+        value = params.get(name)
+        if value not in (None, ""):
+            try:
+                filters[name] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+    for name in ("deadline_from", "deadline_to"):
+        value = params.get(name)
+        if value not in (None, ""):
+            filters[name] = _parse_day(name, value)
+    value = params.get("currency")
+    if value not in (None, ""):
+        filters["currency"] = currency_code(str(value))
+        if filters["currency"] is None:
+            raise ValueError(f"currency must be a currency code such as USD or NGN, got {value!r}")
+
+    sort = params.get("sort") or default_sort
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of {', '.join(SORTS)}, got {sort!r}")
+    filters["sort"] = sort
+    for name, low, high in (("limit", 1, MAX_LIMIT), ("offset", 0, None)):
+        value = params.get(name)
+        if value in (None, ""):
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer, got {value!r}")
+        if value < low or (high is not None and value > high):
+            raise ValueError(f"{name} must be between {low} and {high}" if high else f"{name} must be >= {low}")
+        filters[name] = value
+    return filters
+
+
+def opportunity_filters(request: Request, category: Optional[str] = None, status: Optional[str] = None,
+                        source: Optional[str] = None, location: Optional[str] = None,
+                        min_priority: Optional[str] = None, max_priority: Optional[str] = None,
+                        deadline_from: Optional[str] = None, deadline_to: Optional[str] = None,
+                        skill: Optional[str] = None, contact: Optional[str] = None,
+                        min_salary: Optional[str] = None, max_salary: Optional[str] = None,
+                        currency: Optional[str] = None, sort: Optional[str] = None,
+                        limit: Optional[str] = None, offset: Optional[str] = None) -> Dict:
+    """FastAPI dependency: the query string as sent, for parse_filters() to validate
+
+    The parameters above only document the API. They are declared as text so
+    a malformed number or date gets parse_filters()' 400 like any other bad
+    value, not FastAPI's 422, and undeclared ones are passed on so it rejects
+    them too.
+    """
+    return dict(request.query_params)
+
+
+def unsupported(filters: Dict, columns) -> List[str]:
+    """Filters (and the sort) that need a column this table doesn't have"""
+    missing = [name for name in FILTERS if name in filters and FILTER_COLUMNS.get(name, name) not in columns]
+    sort = filters.get("sort", "priority")
+    if any(column not in columns for column, _ in SORTS[sort]):
+        missing.append(f"sort={sort}")
+    return missing
+
+
+def sort_from_index(filters: Dict) -> bool:
+    """Whether the index a filter searches also yields the sort order (or there is no filter)
+
+    Without table statistics SQLite will happily scan the whole table in sort
+    order rather than search a range index and sort the matches; that's only
+    a good trade when the search index is already in sort order.
+    """
+    filtered = [name for name in FILTERS if name in filters]
+    if not filtered:
+        return True
+    sort = filters.get("sort", "priority")
+    if sort == "salary":
+        # (comp_currency, comp_annual) and (comp_annual) are in salary order
+        return all(name in SALARY_FILTERS for name in filtered)
+    return sort == "priority" and any(name in filters for name in EQUALITY_FILTERS)
+
+
+# sqlite apps
+def build_sql(filters: Dict, table: str = "opportunities", select: str = "id") -> Tuple[str, list]:
+    """SELECT <select> FROM table WHERE ... ORDER BY ... for a parse_filters() dict"""
+    where, params = [], []
+    for name in ("category", "status", "source"):
+        if name in filters:
+            where.append(f"{name} = ?")
+            params.append(filters[name])
+    if "location" in filters:
+        keys = location_keys(filters["location"])
+        if keys is None:
+            where.append("location = ? COLLATE NOCASE")
+            params.append(filters["location"])
+        else:
+            for column, key in zip(KEY_COLUMNS, keys):
+                if key is not None:
+                    where.append(f"{column} = ?")
+                    params.append(key)
+    if "min_priority" in filters:
+        where.append("priority_score >= ?")
+        params.append(filters["min_priority"])
+    if "max_priority" in filters:
+        where.append("priority_score <= ?")
+        params.append(filters["max_priority"])
+    # UTC days, like GET /opportunities/upcoming: from midnight on deadline_from to midnight after deadline_to
+    if "deadline_from" in filters:
+        where.append("deadline_at >= ?")
+        params.append(deadline_epoch(filters["deadline_from"]))
+    if "deadline_to" in filters:
+        where.append("deadline_at < ?")
+        params.append(deadline_epoch(filters["deadline_to"] + timedelta(days=1)))
+    if "skill" in filters:
+        from ai_engine.facets import skill_key
+        where.append("id IN (SELECT opportunity_id FROM opportunity_requirements WHERE skill = ?)")
+        params.append(skill_key(filters["skill"]))
+    if "contact" in filters:
+        from ai_engine.facets import parse_contact_query
+        where.append("id IN (SELECT opportunity_id FROM opportunity_contacts WHERE type = ? AND value = ?)")
+        params.extend(parse_contact_query(filters["contact"]))
+    if "currency" in filters:
+        where.append("comp_currency = ?")
+        params.append(filters["currency"])
+    if "min_salary" in filters:
+        where.append("comp_annual >= ?")
+        params.append(filters["min_salary"])
+    if "max_salary" in filters:
+        where.append("comp_annual <= ?")
+        params.append(filters["max_salary"])
+
+    sql = f"SELECT {select} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # +column keeps an index out of the ORDER BY, so the planner can't trade the filter's index for a sorted scan
+    prefix = "" if sort_from_index(filters) else "+"
+    order = []
+    for column, descending in SORTS[filters.get("sort", "priority")]:
+        if column == "deadline_at":
+            order.append("deadline_at IS NULL")
+        order.append(f"{prefix}{column} DESC" if descending else f"{prefix}{column}")
+    sql += " ORDER BY " + ", ".join(order)
+    if "limit" in filters or "offset" in filters:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([filters.get("limit", -1), filters.get("offset", 0)])
+    return sql, params
+
+
+def init_indexes(conn: sqlite3.Connection, table: str = "opportunities") -> bool:
+    """Create the composite indexes the filters use; False if the table doesn't exist yet"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if not columns:
+        return False
+    for suffix, expressions in INDEXES:
+        if all(expression.split()[0] in columns for expression in expressions):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{suffix} ON {table}({', '.join(expressions)})")
+        elif expressions[0].split()[0] in columns and expressions[1:] == ("priority_score",):
+            # No priority to sort by (simple_start): the filter column alone still spares a scan
+            column = expressions[0].split()[0]
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({expressions[0]})")
+    conn.commit()
+    return True
+
+
+class OpportunitySearch:
+    """Filtered listings for one sqlite app: ids from an index, bodies from the read model"""
+
+    def __init__(self, db_path: str, read_model, table: str = "opportunities", default_sort: str = "priority"):
+        self.db_path = db_path
+        self.read_model = read_model
+        self.table = table
+        self.default_sort = default_sort
+        self.columns = set()
+
+    def init_schema(self):
+        """Create the indexes and note the table's columns; call from the startup handler, after init_db()"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            init_indexes(conn, self.table)
+            self.columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        finally:
+            conn.close()
+
+    def parse(self, params: Dict) -> Dict:
+        filters = parse_filters(params, self.default_sort)
+        if not self.columns:
+            self.init_schema()
+        missing = unsupported(filters, self.columns)
+        if missing:
+            raise ValueError(f"Not supported by this app: {', '.join(missing)}")
+        return filters
+
+    def ids(self, filters: Dict) -> List[int]:
+        sql, params = build_sql(filters, self.table)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            return [row[0] for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def json(self, filters: Dict) -> bytes:
+        """Matching opportunities as a JSON array (blocking)"""
+        with timer("filtered_query"):
+            ids = self.ids(filters)
+        return self.read_model.json_for(ids)
+
+    async def respond(self, params: Dict):
+        """GET /opportunities with filters: the JSON response, or a 400 naming the bad parameter"""
+        from fastapi import HTTPException
+        from ai_engine.serialization import json_response
+
+        try:
+            filters = self.parse(params)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return json_response(await asyncio.to_thread(self.json, filters))
+
+
+# SQLAlchemy backend
+def backend_columns(model) -> set:
+    """The filter columns the backend model has, under the names FILTER_COLUMNS and SORTS use"""
+    columns = set(model.__table__.columns.keys()) - {"requirements", "contact_info"}
+    return columns | {name for name, column in BACKEND_COLUMNS.items() if column in columns}
+
+
+def apply_filters(query, model, filters: Dict):
+    """The same filters and sort on a SQLAlchemy query over the backend's Opportunity model"""
+    missing = unsupported(filters, backend_columns(model))
+    if missing:
+        raise ValueError(f"Not supported by this API: {', '.join(missing)}")
+    for name in ("category", "status", "source"):
+        if name in filters:
+            query = query.filter(getattr(model, name) == filters[name])
+    if "min_priority" in filters:
+        query = query.filter(model.priority_score >= filters["min_priority"])
+    if "max_priority" in filters:
+        query = query.filter(model.priority_score <= filters["max_priority"])
+    if "deadline_from" in filters:
+        query = query.filter(model.deadline >= datetime.combine(filters["deadline_from"], datetime.min.time()))
+    if "deadline_to" in filters:
+        query = query.filter(model.deadline < datetime.combine(filters["deadline_to"] + timedelta(days=1),
+                                                               datetime.min.time()))
+
+    order = []
+    for column, descending in SORTS[filters.get("sort", "priority")]:
+        attribute = getattr(model, BACKEND_COLUMNS.get(column, column))
+        if column == "deadline_at":
+            order.append(attribute.is_(None))
+        elif not sort_from_index(filters):
+            # build_sql()'s +column, spelled portably for numeric columns
+            attribute = attribute + 0
+        order.append(attribute.desc() if descending else attribute)
+    query = query.order_by(*order)
+    if "offset" in filters:
+        query = query.offset(filters["offset"])
+    if "limit" in filters:
+        query = query.limit(filters["limit"])
+    return query
+
+
+# Plan checks
+def plan_cases(columns) -> List[Dict]:
+    """One filter dict per supported filter under each sort, plus every filter at once"""
+    samples = {
+        "category": "job", "status": "new", "source": "whatsapp", "location": "Lagos",
+        "min_priority": 8.0, "max_priority": 3.0, "deadline_from": date(2026, 1, 1), "deadline_to": date(2026, 1, 31),
+        "skill": "python", "contact": "@techcorp.com", "min_salary": 100000.0, "max_salary": 50000.0,
+        "currency": "NGN",
+    }
+    supported = {name: value for name, value in samples.items() if not unsupported({name: value, "sort": "oldest"}, columns)}
+    cases = [{name: value, "sort": sort} for name, value in supported.items() for sort in SORTS]
+    cases += [dict(supported, sort=sort) for sort in SORTS]
+    if "location" in supported:
+        # A work mode and a label the gazetteer doesn't know take the other two location paths
+        cases += [{"location": value, "sort": sort} for value in ("remote", "Head office") for sort in SORTS]
+    return [filters for filters in cases if not unsupported(filters, columns)]
+
+
+def table_scans(plan: List[str], table: str) -> List[str]:
+    """Plan lines that read the whole table (or a whole index of it) instead of searching"""
+    return [line for line in plan if line.startswith(f"SCAN {table}")]
+
+
+def check_plans(conn: sqlite3.Connection, table: str = "opportunities") -> List[Tuple[Dict, List[str]]]:
+    """Every plan_cases() query that scans the table, with its plan
+
+    Planned against an empty copy of the schema: whether a filter has an index
+    shouldn't depend on this database's contents or ANALYZE statistics (which
+    rightly prefer a scan for a filter that matches most rows).
+    """
+    from ai_engine.compensation import CompensationIndex
+    from ai_engine.deadlines import DeadlineIndex
+    from ai_engine.facets import FacetIndex
+    from ai_engine.locations import LocationIndex
+
+    schema = sqlite3.connect(":memory:")
+    try:
+        for (sql,) in conn.execute("SELECT sql FROM sqlite_master WHERE type IN ('table', 'index') "
+                                   "AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY type DESC"):
+            schema.execute(sql)
+        FacetIndex("", table).init_schema(schema)
+        CompensationIndex("", table).init_schema(schema)
+        DeadlineIndex("", table=table).init_schema(schema)
+        LocationIndex("", table).init_schema(schema)
+        columns = {row[1] for row in schema.execute(f"PRAGMA table_info({table})")}
+        failures = []
+        for filters in plan_cases(columns):
+            sql, params = build_sql(filters, table)
+            plan = [row[3] for row in schema.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            if table_scans(plan, table):
+                failures.append((filters, plan))
+    finally:
+        schema.close()
+    return failures
+
+
+def check_backend_plans() -> List[Tuple[Dict, List[str]]]:
+    """check_plans() for apply_filters() against the backend model's indexes, in an in-memory SQLite"""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+    from backend.models.opportunity import Base, Opportunity
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    failures = []
+    with Session(engine) as session:
+        for filters in plan_cases(backend_columns(Opportunity)):
+            statement = apply_filters(session.query(Opportunity.id), Opportunity, filters).statement
+            compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+            if table_scans(plan, Opportunity.__tablename__):
+                failures.append((filters, plan))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a supported GET /opportunities filter scans the table")
+    parser.add_argument("db_path", nargs="?", help="SQLite app database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    parser.add_argument("--backend", action="store_true", help="check the SQLAlchemy backend's model instead")
+    args = parser.parse_args()
+    if not args.db_path and not args.backend:
+        parser.error("give a database path or --backend")
+
+    if args.backend:
+        failures = check_backend_plans()
+    else:
+        conn = sqlite3.connect(args.db_path)
+        try:
+            if not init_indexes(conn, args.table):
+                parser.error(f"no {args.table} table in {args.db_path}")
+            failures = check_plans(conn, args.table)
+        finally:
+            conn.close()
+
+    for filters, plan in failures:
+        print(f"❌ {filters}")
+        for line in plan:
+            print(f"     {line}")
+    if failures:
+        sys.exit(1)
+    print("✅ Every supported filter is served by an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+In-memory read model for GET /opportunities
+
+Each app process holds every opportunity as a fully materialized record
+(requirements already split, etc.) in a list kept in the endpoint's sort
+order, so a listing is served from memory with no database access.
+
+Writes reach it two ways:
+
+  * write-through - the create and status-update handlers call refresh(ids)
+    right after their commit, so a worker's own writes show up at once
+  * change log - triggers on the table append every inserted, updated or
+    deleted id to <table>_changes. A background watcher checks SQLite's
+    PRAGMA data_version (which moves when any other connection commits) every
+    READ_MODEL_POLL_MS and re-reads just the logged ids. Other workers,
+    the re-scoring job and scripts writing to the same file are picked up
+    within one poll interval
+
+The record list is copy-on-write: a writer builds the new list and swaps it
+in, so a request serializing the current list never sees it change.
+Refreshes are serialized, so a slower re-read can't overwrite a newer one.
+
+Each record is encoded to JSON once, when it changes (ai_engine.serialization),
+and json() joins the fragments into a response body, memoized until the
+next change:
+
+    return json_response(read_model.json())
+
+    read_model = install_read_model(app, 'final_opportunities.db', row_to_opportunity)
+
+    @app.on_event("startup")
+    async def startup():
+        init_db()
+        read_model.start()
+"""
+import asyncio
+import bisect
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ai_engine.serialization import dumps, json_array
+from monitoring.metrics import count, registry, timer
+
+
+# Ids are handed out in insert order, so "created_at DESC" is "id DESC" with ties broken
+def by_priority(record: dict) -> tuple:
+    """ORDER BY priority_score DESC, created_at DESC"""
+    return (-(record.get("priority_score") or 0), -record["id"])
+
+
+def by_newest(record: dict) -> tuple:
+    """ORDER BY created_at DESC"""
+    return (-record["id"],)
+
+
+class OpportunityReadModel:
+    """Sorted, fully materialized copy of one table, kept fresh by write-through and a change log"""
+
+    def __init__(self, db_path: str, to_record: Callable[[tuple], dict], sort_key: Callable[[dict], tuple] = by_priority,
+                 table: str = "opportunities", poll_interval: Optional[float] = None, keep_changes: int = 10000):
+        self.db_path = db_path
+        self.to_record = to_record
+        self.sort_key = sort_key
+        self.table = table
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("READ_MODEL_POLL_MS", "500")) / 1000
+        self.keep_changes = keep_changes
+        # (sort keys, records in the same order, id -> sort key, records' JSON in the same order),
+        # swapped as a whole on every change
+        self.view = ([], [], {}, [])
+        self._body = None
+        self.last_seq = 0
+        self.loaded = False
+        self._lock = threading.RLock()
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        registry.add_collector(lambda: {"read_model_records": len(self.view[1])})
+
+    # Schema
+    def init_schema(self, conn: sqlite3.Connection):
+        changes = f"{self.table}_changes"
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {changes} (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                opportunity_id INTEGER NOT NULL
+            )
+        ''')
+        for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {changes}_{event.lower()} AFTER {event} ON {self.table}
+                BEGIN
+                    INSERT INTO {changes} (opportunity_id) VALUES ({ref}.id);
+                END
+            ''')
+        conn.commit()
+
+    # Reads
+    def list(self) -> List[dict]:
+        """Every record in sort order; loads on first use if start() hasn't run"""
+        if not self.loaded:
+            self.reload()
+        return self.view[1]
+
+    def json(self) -> bytes:
+        """list() as a JSON array, assembled from per-record fragments once per change"""
+        if not self.loaded:
+            self.reload()
+        view, body = self.view, self._body
+        if body is None or body[0] is not view:
+            body = self._body = (view, json_array(view[3]))
+        return body[1]
+
+    def get(self, opportunity_id: int) -> Optional[dict]:
+        keys, records, index, _ = self.view
+        key = index.get(opportunity_id)
+        if key is None:
+            return None
+        position = bisect.bisect_left(keys, key)
+        return records[position] if position < len(keys) and keys[position] == key else None
+
+    def fragments(self, ids: Iterable[int]) -> List[Optional[bytes]]:
+        """Cached JSON for each id, None where the record isn't (yet) in the model"""
+        keys, _, index, fragments = self.view
+        found = []
+        for opportunity_id in ids:
+            key = index.get(opportunity_id)
+            position = bisect.bisect_left(keys, key) if key is not None else len(keys)
+            found.append(fragments[position] if position < len(keys) and keys[position] == key else None)
+        return found
+
+    def json_for(self, ids: List[int]) -> bytes:
+        """These records as a JSON array, in the order given (blocking: re-reads ids not yet in the model)"""
+        found = self.fragments(ids)
+        missing = [opportunity_id for opportunity_id, fragment in zip(ids, found) if fragment is None]
+        if missing:
+            # Committed by another writer since the last poll
+            self.refresh(missing)
+            found = self.fragments(ids)
+        return json_array(fragment for fragment in found if fragment is not None)
+
+    # Writes
+    def reload(self):
+        """Full load from the table, e.g. at startup or after falling behind the change log"""
+        with self._lock, timer("read_model_reload"):
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                self.init_schema(conn)
+                # Read the cursor first: changes after it are replayed on the next poll
+                seq = conn.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {self.table}_changes").fetchone()[0]
+                records = [self.to_record(row) for row in conn.execute(f"SELECT * FROM {self.table}")]
+            finally:
+                conn.close()
+            self.view = self._build(records)
+            self.last_seq = seq
+            self.loaded = True
+        count("read_model_reloads_total")
+
+    def refresh(self, ids: Iterable[int]):
+        """Re-read these rows and apply them (write-through after a commit; blocking)"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.reload()
+                return
+            found = {}
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                for offset in range(0, len(ids), 500):
+                    chunk = ids[offset:offset + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    for row in conn.execute(f"SELECT * FROM {self.table} WHERE id IN ({placeholders})", chunk):
+                        record = self.to_record(row)
+                        found[record["id"]] = record
+            finally:
+                conn.close()
+            self.apply({opportunity_id: found.get(opportunity_id) for opportunity_id in ids})
+
+    def apply(self, changes: Dict[int, Optional[dict]]):
+        """Swap in a new list with these records replaced; None removes a record"""
+        with self._lock:
+            if len(changes) > 64 and len(changes) > len(self.view[1]) // 8:
+                # A re-scoring batch: one sort beats many O(n) list inserts
+                fragments = dict(zip((record["id"] for record in self.view[1]), self.view[3]))
+                merged = {record["id"]: record for record in self.view[1]}
+                merged.update(changes)
+                self.view = self._build([r for r in merged.values() if r is not None],
+                                        {i: f for i, f in fragments.items() if i not in changes})
+                count("read_model_updates_total", len(changes))
+                return
+            keys, records, index, fragments = (list(self.view[0]), list(self.view[1]), dict(self.view[2]),
+                                               list(self.view[3]))
+            for opportunity_id, record in changes.items():
+                old = index.pop(opportunity_id, None)
+                if old is not None:
+                    position = bisect.bisect_left(keys, old)
+                    if position < len(keys) and keys[position] == old:
+                        del keys[position]
+                        del records[position]
+                        del fragments[position]
+                if record is not None:
+                    key = self.sort_key(record)
+                    position = bisect.bisect_left(keys, key)
+                    keys.insert(position, key)
+                    records.insert(position, record)
+                    fragments.insert(position, dumps(record))
+                    index[opportunity_id] = key
+            self.view = (keys, records, index, fragments)
+        count("read_model_updates_total", len(changes))
+
+    def _build(self, records: List[dict], fragments: Optional[Dict[int, bytes]] = None) -> tuple:
+        """Sorted view over records, encoding the ones without a fragment yet"""
+        fragments = fragments or {}
+        pairs = sorted(((self.sort_key(record), record) for record in records), key=lambda pair: pair[0])
+        return (
+            [key for key, _ in pairs],
+            [record for _, record in pairs],
+            {record["id"]: key for key, record in pairs},
+            [fragments.get(record["id"]) or dumps(record) for _, record in pairs]
+        )
+
+    # Cross-process invalidation
+    def poll(self) -> int:
+        """Apply changes other connections committed since the last poll; returns how many rows (blocking)"""
+        if self._watch_conn is None:
+            self._watch_conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        # data_version only moves when another connection commits, so an idle poll is one cheap pragma
+        version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return 0
+        self._data_version = version
+
+        changes = f"{self.table}_changes"
+        rows = self._watch_conn.execute(
+            f"SELECT seq, opportunity_id FROM {changes} WHERE seq > ? ORDER BY seq", (self.last_seq,)
+        ).fetchall()
+        self._watch_conn.commit()
+        if not rows:
+            return 0
+        oldest = self._watch_conn.execute(f"SELECT MIN(seq) FROM {changes}").fetchone()[0]
+        if oldest is not None and oldest > self.last_seq + 1:
+            # The log was pruned past this worker's cursor
+            self.reload()
+            return len(rows)
+
+        self.refresh(opportunity_id for _, opportunity_id in rows)
+        self.last_seq = max(self.last_seq, rows[-1][0])
+        if oldest is not None and rows[-1][0] - oldest >= 2 * self.keep_changes:
+            # Workers further behind than keep_changes fall back to a full reload
+            with self._watch_conn:
+                self._watch_conn.execute(f"DELETE FROM {changes} WHERE seq <= ?", (rows[-1][0] - self.keep_changes,))
+        return len(rows)
+
+    def start(self):
+        """Load now and watch for other writers; call from a startup handler, after init_db()"""
+        self.reload()
+        if self.task is None and self.poll_interval > 0:
+            self.task = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception as e:
+                print(f"⚠️ Read model refresh failed: {e}")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self._watch_conn is not None:
+            self._watch_conn.close()
+            self._watch_conn = None
+
+
+def install_read_model(app, db_path: str, to_record: Callable[[tuple], dict],
+                       sort_key: Callable[[dict], tuple] = by_priority) -> OpportunityReadModel:
+    """Read model for an app's table; start() it from the startup handler, after init_db()"""
+    read_model = OpportunityReadModel(db_path, to_record, sort_key)
+    app.add_event_handler("shutdown", read_model.stop)
+    return read_model
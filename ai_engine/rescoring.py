@@ -0,0 +1,238 @@
+"""
+Time-aware priority re-scoring
+
+priority_score includes a bonus for how close the deadline is, fixed at
+insert time, so it goes stale as deadlines approach and ORDER BY
+priority_score drifts. Deadline proximity is bucketed:
+
+    expired | <=3 days | <=7 | <=14 | <=30 | later
+
+and a row only needs re-scoring on the day it crosses a bucket boundary.
+Between two runs on days D0 and D1, a row with deadline d crossed the
+"<= k days" boundary iff D0 + k < d <= D1 + k, so each run does one range
+scan per boundary on the indexed deadline_at (ai_engine/deadlines.py, so
+"December 15, 2026" counts as the date it is), plus the rows inserted since
+the last run. Tables without deadline_at fall back to the deadline text,
+which only ranges correctly for ISO dates. Cost is proportional to the rows
+that changed, not the table.
+
+Each scored row keeps priority_base (the score without the deadline bonus)
+and deadline_bucket; a re-score is priority_base + the new bucket's bonus.
+
+    python -m ai_engine.rescoring final_opportunities.db
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from ai_engine.deadlines import deadline_datetime, deadline_epoch
+from monitoring.metrics import count, observe
+
+EXPIRED = 0
+# (bucket, highest days-until-deadline in it, priority bonus); later than 30 days is bucket 5, no bonus
+DEADLINE_BUCKETS = (
+    (EXPIRED, -1, 0.0),
+    (1, 3, 1.5),
+    (2, 7, 1.0),
+    (3, 14, 0.75),
+    (4, 30, 0.5),
+)
+LATER = 5
+BONUS = {bucket: bonus for bucket, _, bonus in DEADLINE_BUCKETS}
+
+
+def parse_deadline(deadline) -> Optional[date]:
+    if not deadline:
+        return None
+    if isinstance(deadline, datetime):
+        return deadline.date()
+    if isinstance(deadline, date):
+        return deadline
+    try:
+        return datetime.strptime(str(deadline)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        # "March 15, 2026" and the like, from an LLM or an older row
+        parsed = deadline_datetime(deadline)
+        return parsed.date() if parsed else None
+
+
+def _epoch_day(epoch: Optional[int]) -> Optional[date]:
+    return datetime.fromtimestamp(epoch, timezone.utc).date() if epoch is not None else None
+
+
+def deadline_bucket(deadline, today: Optional[date] = None) -> Optional[int]:
+    """Proximity bucket of a deadline, None when there is no (parseable) deadline"""
+    due = parse_deadline(deadline)
+    if due is None:
+        return None
+    days_until = (due - (today or date.today())).days
+    for bucket, max_days, _ in DEADLINE_BUCKETS:
+        if days_until <= max_days:
+            return bucket
+    return LATER
+
+
+def deadline_bonus(bucket: Optional[int]) -> float:
+    return BONUS.get(bucket, 0.0)
+
+
+def rescored(base: float, bucket: Optional[int]) -> float:
+    return max(1.0, min(10.0, base + deadline_bonus(bucket)))
+
+
+class PriorityRescorer:
+    """Keeps priority_score in one SQLite table in step with the calendar"""
+
+    def __init__(self, db_path: str, table: str = "opportunities", batch_size: int = 5000,
+                 interval: Optional[float] = None):
+        self.db_path = db_path
+        self.table = table
+        self.batch_size = batch_size
+        # Buckets move once a day; running more often only costs a couple of empty range scans
+        self.interval = interval if interval is not None else float(os.getenv("RESCORE_INTERVAL_MINUTES", "60")) * 60
+        self.task: Optional[asyncio.Task] = None
+
+    def init_schema(self, conn: sqlite3.Connection) -> bool:
+        """Add the bookkeeping columns, deadline index and run state; False if the table doesn't exist yet"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        if not columns:
+            return False
+        # Appended at the end, so SELECT * row indexes in the apps don't move
+        if "priority_base" not in columns:
+            conn.execute(f"ALTER TABLE {self.table} ADD COLUMN priority_base REAL")
+        if "deadline_bucket" not in columns:
+            conn.execute(f"ALTER TABLE {self.table} ADD COLUMN deadline_bucket INTEGER")
+        if "deadline_at" not in columns:
+            # deadline_at brings its own index (ai_engine/deadlines.py)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_deadline ON {self.table}(deadline)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS priority_rescoring (
+                table_name TEXT PRIMARY KEY,
+                last_run_date TEXT NOT NULL,
+                last_id INTEGER NOT NULL
+            )
+        ''')
+        conn.commit()
+        return True
+
+    def run(self, today: Optional[date] = None) -> Dict:
+        """One incremental pass; returns what it looked at and changed"""
+        today = today or date.today()
+        start = time.perf_counter()
+        stats = {"new": 0, "crossed": 0, "updated": 0, "ranges": 0}
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self.init_schema(conn):
+                return stats
+            state = conn.execute(
+                "SELECT last_run_date, last_id FROM priority_rescoring WHERE table_name = ?", (self.table,)
+            ).fetchone()
+            last_run = parse_deadline(state[0]) if state else today
+            last_id = state[1] if state else 0
+            max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}").fetchone()[0]
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+            epochs = "deadline_at" in columns
+            column = "deadline_at" if epochs else "deadline"
+            due = _epoch_day if epochs else parse_deadline
+            bound = deadline_epoch if epochs else date.isoformat
+
+            updates = {}
+
+            # Rows inserted since the last run: split their insert-time score into base + bonus
+            for row_id, stored, score, created_at in conn.execute(
+                f"SELECT id, {column}, priority_score, created_at FROM {self.table} "
+                f"WHERE id > ? AND id <= ? AND {column} IS NOT NULL", (last_id, max_id)
+            ):
+                deadline = due(stored)
+                scored_on = parse_deadline(created_at) or today
+                base = (score if score is not None else 5.0) - deadline_bonus(deadline_bucket(deadline, scored_on))
+                bucket = deadline_bucket(deadline, today)
+                updates[row_id] = (rescored(base, bucket), base, bucket)
+                stats["new"] += 1
+
+            # Rows whose deadline crossed a boundary: D0 + k < deadline <= D1 + k
+            if today > last_run:
+                for max_days in [max_days for _, max_days, _ in DEADLINE_BUCKETS]:
+                    low = bound(last_run + timedelta(days=max_days + 1))
+                    high = bound(today + timedelta(days=max_days + 1))
+                    stats["ranges"] += 1
+                    for row_id, stored, base, stored_bucket in conn.execute(
+                        f"SELECT id, {column}, priority_base, deadline_bucket FROM {self.table} "
+                        f"WHERE {column} >= ? AND {column} < ? AND id <= ?", (low, high, last_id)
+                    ):
+                        stats["crossed"] += 1
+                        bucket = deadline_bucket(due(stored), today)
+                        if base is None or bucket == stored_bucket or row_id in updates:
+                            continue
+                        updates[row_id] = (rescored(base, bucket), base, bucket)
+
+            # Bulk update, one transaction per batch so readers aren't blocked for long
+            rows = [(score, base, bucket, row_id) for row_id, (score, base, bucket) in updates.items()]
+            for offset in range(0, len(rows), self.batch_size):
+                with conn:
+                    conn.executemany(
+                        f"UPDATE {self.table} SET priority_score = ?, priority_base = ?, deadline_bucket = ? WHERE id = ?",
+                        rows[offset:offset + self.batch_size]
+                    )
+            stats["updated"] = len(rows)
+
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO priority_rescoring (table_name, last_run_date, last_id) VALUES (?, ?, ?)",
+                    (self.table, max(today, last_run).isoformat(), max_id)
+                )
+        finally:
+            conn.close()
+
+        observe("rescoring", time.perf_counter() - start)
+        count("priority_rescored_total", stats["updated"])
+        return stats
+
+    # Background schedule inside an app
+    def start(self):
+        """Run now and then every RESCORE_INTERVAL_MINUTES; call from a startup handler"""
+        if self.task is None and self.interval > 0:
+            self.task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            try:
+                stats = await asyncio.to_thread(self.run)
+                if stats["updated"]:
+                    print(f"🔁 Re-scored {stats['updated']} opportunities in {self.db_path}")
+            except Exception as e:
+                print(f"⚠️ Priority re-scoring failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+
+def install_rescoring(app, db_path: str, table: str = "opportunities") -> PriorityRescorer:
+    """Rescorer for an app's database; start() it from the startup handler, after init_db()"""
+    rescorer = PriorityRescorer(db_path, table)
+    app.add_event_handler("shutdown", rescorer.stop)
+    return rescorer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score priorities whose deadline bucket changed")
+    parser.add_argument("db_path", help="SQLite database, e.g. final_opportunities.db")
+    parser.add_argument("--table", default="opportunities")
+    parser.add_argument("--today", help="YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+
+    today = parse_deadline(args.today) if args.today else None
+    stats = PriorityRescorer(args.db_path, args.table).run(today)
+    print(f"✅ {stats['updated']} re-scored ({stats['new']} new, {stats['crossed']} near a boundary)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Pre-serialized JSON for list endpoints
+
+A listing is mostly rows that haven't changed since the last request, so
+each row's JSON is encoded once and kept, keyed by row id and a version
+(the record object in the read model, updated_at in the backend). A list
+response is those fragments joined into an array and sent as raw bytes,
+skipping jsonable_encoder and the per-request json.dumps.
+
+orjson is used when installed (pip install orjson); otherwise the stdlib
+encoder with FastAPI's compact separators. Both write datetimes as ISO 8601.
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """One value as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    """Already-encoded values joined into one JSON array"""
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def json_response(body: bytes, status_code: int = 200):
+    """Raw JSON bytes as a response, no re-encoding"""
+    from fastapi import Response
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+class FragmentCache:
+    """Encoded JSON per row id, valid while the row's version is unchanged"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, version: Hashable, fragment: bytes) -> bytes:
+        with self._lock:
+            self.entries[key] = (version, fragment)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return fragment
+
+    def fragment(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> bytes:
+        """Cached fragment, or encode build() and keep it"""
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        return self.put(key, version, dumps(build()))
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self.entries.pop(key, None)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -16,6 +16,15 @@ except Exception as e:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def create_indexes(model, bind=None) -> bool:
+    """Create a model's indexes on its existing table (create_all() skips tables that exist); False if there is none yet"""
+    bind = bind or engine
+    if not inspect(bind).has_table(model.__tablename__):
+        return False
+    for index in model.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+    return True
+
 def get_db():
     db = SessionLocal()
     try:
@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+import asyncio
 import os
 from dotenv import load_dotenv
 
-from backend.database.connection import get_db
+from backend.database.connection import create_indexes, engine, get_db
 from backend.models.opportunity import Opportunity
 from backend.schemas.opportunity import OpportunityCreate, OpportunityResponse
 from ai_engine.analyzer import OpportunityAnalyzer
+from ai_engine.deadlines import MAX_UPCOMING_DAYS, deadline_datetime, upcoming_range
+from ai_engine.pipeline import WARMUP_SAMPLE, warm_up
+from ai_engine.prefilter import get_prefilter
+from ai_engine.provider_pool import get_provider_pool
+from ai_engine.queries import apply_filters, opportunity_filters, parse_filters
+from ai_engine.serialization import FragmentCache, json_array, json_response
 from whatsapp_bot.webhook import whatsapp_router
+from monitoring.metrics import install_metrics, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_sqlalchemy
 
 load_dotenv()
 
@@ -22,40 +33,98 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
 
 # Include routers
 app.include_router(whatsapp_router, prefix="/whatsapp", tags=["WhatsApp"])
 
 analyzer = OpportunityAnalyzer()
 
+# Validated + encoded OpportunityResponse per row, valid until the row's updated_at moves
+response_cache = FragmentCache()
+
+def encode_opportunity(opportunity: Opportunity) -> bytes:
+    return response_cache.fragment(
+        opportunity.id,
+        opportunity.updated_at,
+        lambda: OpportunityResponse.model_validate(opportunity).model_dump(mode="json")
+    )
+
+@app.on_event("startup")
+async def startup():
+    # create_all() only indexes new tables; add the model's newer indexes to an existing one
+    await asyncio.to_thread(create_indexes, Opportunity)
+    readiness.start({
+        "analysis": warm_up,
+        "prefilter": lambda: get_prefilter().classify(WARMUP_SAMPLE),
+        "llm": get_provider_pool().warm_up,
+        "database": lambda: warm_sqlalchemy(engine)
+    })
+
 @app.get("/")
 async def root():
     return {"message": "OpportunityBot API is running"}
 
 @app.get("/opportunities", response_model=list[OpportunityResponse])
-async def get_opportunities(db: Session = Depends(get_db)):
-    opportunities = db.query(Opportunity).all()
-    return opportunities
+async def get_opportunities(params: dict = Depends(opportunity_filters), db: Session = Depends(get_db)):
+    # Versions first; only rows changed since they were last encoded are loaded and validated
+    query = db.query(Opportunity.id, Opportunity.updated_at)
+    if params:
+        try:
+            query = apply_filters(query, Opportunity, parse_filters(params))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return cached_listing(db, query.all(), bulk=not params)
+
+def cached_listing(db: Session, versions, bulk: bool = False):
+    """JSON array for (id, updated_at) pairs, in order, encoding only rows changed since they were cached"""
+    fragments = {opportunity_id: response_cache.get(opportunity_id, updated_at) for opportunity_id, updated_at in versions}
+    missing = [opportunity_id for opportunity_id, fragment in fragments.items() if fragment is None]
+    if bulk and len(missing) > len(versions) // 2:
+        for opportunity in db.query(Opportunity).all():
+            fragments[opportunity.id] = encode_opportunity(opportunity)
+    else:
+        for offset in range(0, len(missing), 500):
+            chunk = missing[offset:offset + 500]
+            for opportunity in db.query(Opportunity).filter(Opportunity.id.in_(chunk)):
+                fragments[opportunity.id] = encode_opportunity(opportunity)
+    
+    return json_response(json_array(fragments[opportunity_id] for opportunity_id, _ in versions
+                                    if fragments.get(opportunity_id)))
+
+@app.get("/opportunities/upcoming", response_model=list[OpportunityResponse])
+async def get_upcoming_opportunities(days: int = Query(7, ge=0, le=MAX_UPCOMING_DAYS), db: Session = Depends(get_db)):
+    """Opportunities due from today through the next N days, soonest first (a range scan on the deadline index)"""
+    start, end = upcoming_range(days)
+    versions = (db.query(Opportunity.id, Opportunity.updated_at)
+                .filter(Opportunity.deadline >= start, Opportunity.deadline < end)
+                .order_by(Opportunity.deadline, Opportunity.id).all())
+    return cached_listing(db, versions)
 
 @app.post("/opportunities", response_model=OpportunityResponse)
 async def create_opportunity(opportunity: OpportunityCreate, db: Session = Depends(get_db)):
     # Analyze the opportunity using AI
-    analysis = await analyzer.analyze_opportunity(opportunity.content)
+    with timer("analysis"):
+        analysis = await analyzer.analyze_opportunity(opportunity.content)
     
     db_opportunity = Opportunity(
         title=analysis.get("title", "Untitled Opportunity"),
         content=opportunity.content,
         category=analysis.get("category", "general"),
-        deadline=analysis.get("deadline"),
+        deadline=deadline_datetime(analysis.get("deadline")),
         requirements=analysis.get("requirements", []),
         contact_info=analysis.get("contact_info"),
         priority_score=analysis.get("priority_score", 5),
         status="new"
     )
     
-    db.add(db_opportunity)
-    db.commit()
-    db.refresh(db_opportunity)
+    with timer("db_write"):
+        db.add(db_opportunity)
+        db.commit()
+        db.refresh(db_opportunity)
     
     return db_opportunity
 
@@ -64,7 +133,7 @@ async def get_opportunity(opportunity_id: int, db: Session = Depends(get_db)):
     opportunity = db.query(Opportunity).filter(Opportunity.id == opportunity_id).first()
     if not opportunity:
         raise HTTPException(status_code=404, detail="Opportunity not found")
-    return opportunity
+    return json_response(encode_opportunity(opportunity))
 
 @app.put("/opportunities/{opportunity_id}/status")
 async def update_opportunity_status(opportunity_id: int, status: str, db: Session = Depends(get_db)):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -20,5 +20,14 @@ class Opportunity(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # GET /opportunities filters (ai_engine/queries.py): equality filters lead, priority is the default sort
+    __table_args__ = (
+        Index("idx_opportunities_status_priority", "status", "priority_score"),
+        Index("idx_opportunities_category_priority", "category", "priority_score"),
+        Index("idx_opportunities_source_priority", "source", "priority_score"),
+        Index("idx_opportunities_priority", "priority_score"),
+        Index("idx_opportunities_deadline", "deadline"),
+    )
+    
     def __repr__(self):
         return f"<Opportunity(id={self.id}, title='{self.title}', category='{self.category}')>"
\ No newline at end of file
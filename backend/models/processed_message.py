@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+
+from backend.models.opportunity import Base
+
+class ProcessedMessage(Base):
+    __tablename__ = "processed_messages"
+
+    id = Column(Integer, primary_key=True)
+    message_sid = Column(String(64), unique=True, index=True, nullable=False)
+    response = Column(Text, nullable=True)  # TwiML replayed to Twilio retries
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProcessedMessage(message_sid='{self.message_sid}')>"
@@ -0,0 +1,159 @@
+"""
+Cold-start benchmark
+
+Starts each app in a fresh interpreter under `python -X importtime`, the way
+a serverless container or a Render deploy does, and measures import time,
+startup events and the first request. The importtime log is grouped by
+top-level package so the heavy imports stand out.
+
+    python -m benchmarks.coldstart
+    python -m benchmarks.coldstart --targets final_bot backend.main --runs 5
+    python -m benchmarks.coldstart --compare benchmarks/results/coldstart-<old>.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.harness import REPO_ROOT, compare, write_results
+
+TARGETS = ["final_bot", "whatsapp_bot", "working_gemini", "gemini_start", "smart_start",
+           "simple_start", "quick_start", "backend.main"]
+
+IMPORTED_MARKER = "--- app imported ---"
+
+# Runs in the fresh interpreter; stdlib only so the measurement is the app's imports
+CHILD = '''
+import importlib, importlib.util, json, os, sys, time
+name, path, root = sys.argv[1], sys.argv[2], sys.argv[3]
+sys.path.insert(0, root)
+start = time.perf_counter()
+file = os.path.join(root, name + ".py")
+if os.path.exists(file):
+    # whatsapp_bot.py is shadowed by the whatsapp_bot/ package
+    spec = importlib.util.spec_from_file_location("cold_" + name, file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+else:
+    module = importlib.import_module(name)
+imported = time.perf_counter()
+sys.stderr.write("--- app imported ---\\n")
+sys.stderr.flush()
+from fastapi.testclient import TestClient
+client_ready = time.perf_counter()
+with TestClient(module.app, raise_server_exceptions=False) as client:
+    started = time.perf_counter()
+    response = client.get(path)
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - client_ready) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+    "status": response.status_code
+}))
+'''
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self time in ms per top-level package, from the app's imports only"""
+    by_package = defaultdict(float)
+    for line in stderr.splitlines():
+        if line.startswith(IMPORTED_MARKER):
+            break
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(by_package)
+
+
+def child_env(workdir: str, keys: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    env.setdefault("TWILIO_ACCOUNT_SID", "ACbenchmark")
+    env.setdefault("TWILIO_AUTH_TOKEN", "benchmark")
+    env["PREFILTER_AUDIT_LOG"] = os.devnull
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'opportunities.db')}"
+    if keys:
+        # A configured deploy: with keys set, anything built eagerly at import shows up
+        env["GEMINI_API_KEY"] = "benchmark"
+        env["OPENAI_API_KEY"] = "benchmark"
+    else:
+        env.pop("GEMINI_API_KEY", None)
+        env.pop("OPENAI_API_KEY", None)
+    return env
+
+
+def run_once(target: str, path: str, keys: bool) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="coldstart-") as workdir:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD, target, path, str(REPO_ROOT)],
+            cwd=workdir, env=child_env(workdir, keys), capture_output=True, text=True, timeout=120
+        )
+        process_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        tail = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")][-5:]
+        raise RuntimeError("\n".join(tail))
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    result["packages"] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(runs: List[Dict], top: int) -> Dict:
+    median = lambda key: round(statistics.median(run[key] for run in runs), 1)
+    packages = defaultdict(list)
+    for run in runs:
+        for package, ms in run["packages"].items():
+            packages[package].append(ms)
+    heaviest = sorted(((name, statistics.median(values)) for name, values in packages.items()),
+                      key=lambda item: item[1], reverse=True)[:top]
+    summary = {key: median(key) for key in ("import_ms", "startup_ms", "first_request_ms", "process_ms")}
+    summary["cold_start_ms"] = round(summary["import_ms"] + summary["startup_ms"] + summary["first_request_ms"], 1)
+    summary["status"] = runs[-1]["status"]
+    summary["runs"] = len(runs)
+    summary["heaviest_packages_ms"] = {name: round(ms, 1) for name, ms in heaviest}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import and first-request time per app")
+    parser.add_argument("--targets", nargs="+", default=TARGETS, help="app modules to start")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per target (median reported)")
+    parser.add_argument("--path", default="/opportunities", help="first request to send")
+    parser.add_argument("--no-keys", action="store_true", help="start without Gemini/OpenAI keys configured")
+    parser.add_argument("--top", type=int, default=6, help="heaviest packages to list per target")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/coldstart-<ts>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff cold_start_ms against")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        try:
+            runs = [run_once(target, args.path, not args.no_keys) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"⚠️ Skipping {target}:\n{e}")
+            continue
+        results[target] = summary = summarize(runs, args.top)
+        print(f"  {target:<16} cold start {summary['cold_start_ms']:>7} ms  (import {summary['import_ms']}, "
+              f"startup {summary['startup_ms']}, first {args.path} {summary['first_request_ms']}; "
+              f"process {summary['process_ms']})")
+        print("      " + ", ".join(f"{name} {ms}" for name, ms in summary["heaviest_packages_ms"].items()))
+
+    meta = {"runs": args.runs, "path": args.path, "keys": not args.no_keys}
+    path = write_results("coldstart", results, meta, args.output)
+    print(f"✅ Results written to {path}")
+
+    if args.compare:
+        compare(args.compare, results, metric="cold_start_ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Synthetic opportunity corpus - seeded, so every run sees the same posts
+
+Generates job, freelance, grant and competition posts of varying length and
+noise (emojis, forwarded headers, shouting, chatter lines), plus a share of
+plain group chatter for the pre-filter.
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+COMPANIES = ["TechCorp", "Acme Labs", "Flutterwave", "Paystack", "Andela", "DataCorp", "GreenGrid",
+             "Kuda Bank", "Shopify", "Interswitch", "BlueOcean AI", "Moniepoint"]
+ROLES = ["Senior Python Developer", "Backend Engineer", "Frontend Engineer", "Data Analyst",
+         "Product Manager", "DevOps Engineer", "Mobile Developer", "UI/UX Designer",
+         "Machine Learning Engineer", "Technical Writer", "Engineering Manager"]
+SKILLS = ["Python", "Django", "FastAPI", "React", "Node.js", "PostgreSQL", "AWS", "Docker",
+          "Kubernetes", "TypeScript", "Go", "Figma", "SQL", "Excel", "Flutter", "Kotlin",
+          "5+ years experience", "strong communication skills", "a degree in Computer Science"]
+LOCATIONS = ["Lagos, Nigeria", "Nairobi", "Accra, Ghana", "San Francisco", "London", "Berlin",
+             "Remote", "Kigali", "Cape Town, South Africa", "New York"]
+FUNDERS = ["Mastercard Foundation", "Google for Startups", "Tony Elumelu Foundation",
+           "Gates Foundation", "Chevening", "African Development Bank"]
+COMPETITIONS = ["Hackathon", "Innovation Challenge", "Writing Contest", "Pitch Competition",
+                "Data Science Challenge"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December"]
+CHATTER = ["thanks", "ok 👍", "Good morning everyone", "lol 😂😂", "Who's coming tonight?",
+           "Happy birthday!! 🎉", "Amen 🙏", "Please share the notes from class",
+           "Did anyone watch the match?", "See you all tomorrow", "😂😂😂", "yes", "Noted"]
+EMOJIS = ["🚀", "🔥", "💼", "📢", "✅", "👉", "⚡", "🌍"]
+
+
+def _deadline(rng: random.Random) -> str:
+    day = date(2025, 1, 1) + timedelta(days=rng.randint(0, 364))
+    style = rng.randint(0, 4)
+    if style == 0:
+        return f"{MONTHS[day.month - 1]} {day.day}, {day.year}"
+    if style == 1:
+        return f"{day.month}/{day.day}/{day.year}"
+    if style == 2:
+        return day.isoformat()
+    if style == 3:
+        return f"{day.day} {MONTHS[day.month - 1][:3]} {day.year}"
+    return rng.choice(["next week", "tomorrow", "end of month", "in 2 weeks"])
+
+
+def _salary(rng: random.Random) -> str:
+    low = rng.randrange(40, 180, 10)
+    style = rng.randint(0, 4)
+    if style == 0:
+        return f"${low}k-{low + rng.randrange(20, 80, 10)}k + equity"
+    if style == 1:
+        return f"Salary: ${low},000"
+    if style == 2:
+        return f"${rng.randrange(20, 120, 5)}/hour"
+    if style == 3:
+        return f"₦{rng.randrange(200, 900, 50)},000 per month"
+    return f"Budget: ${rng.randrange(500, 10000, 500)}"
+
+
+def _contact(rng: random.Random, company: str) -> str:
+    domain = company.lower().replace(" ", "") + ".com"
+    options = [
+        f"Send your CV to careers@{domain}",
+        f"Apply here: https://{domain}/careers/{rng.randint(100, 999)}",
+        f"Call {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        f"DM @{company.split()[0].lower()} or email hr@{domain}",
+    ]
+    return rng.choice(options)
+
+
+def _job(rng: random.Random) -> str:
+    company = rng.choice(COMPANIES)
+    skills = rng.sample(SKILLS, rng.randint(2, 6))
+    return "\n".join([
+        f"{rng.choice(['Hiring', 'We are hiring', 'Job opening', 'URGENT'])}: {rng.choice(ROLES)} at {company}",
+        f"Location: {rng.choice(LOCATIONS)}",
+        f"Requirements: {', '.join(skills)}",
+        _salary(rng),
+        f"Deadline: {_deadline(rng)}",
+        _contact(rng, company),
+    ])
+
+
+def _freelance(rng: random.Random) -> str:
+    company = rng.choice(COMPANIES)
+    return (
+        f"Freelance gig: need a {rng.choice(ROLES).lower()} for a {rng.randint(2, 12)} week contract project. "
+        f"Must have {', '.join(rng.sample(SKILLS, 3))}. {_salary(rng)}. "
+        f"Apply by {_deadline(rng)}. {_contact(rng, company)}"
+    )
+
+
+def _grant(rng: random.Random) -> str:
+    funder = rng.choice(FUNDERS)
+    return (
+        f"{funder} {rng.choice(['Grant', 'Scholarship', 'Fellowship'])} is now open! "
+        f"Funding of up to ${rng.randrange(5, 100, 5)},000 for early-stage founders in {rng.choice(LOCATIONS)}. "
+        f"Eligibility: {', '.join(rng.sample(SKILLS, 2))}. Applications close {_deadline(rng)}. "
+        f"More info: https://{funder.split()[0].lower()}.org/apply"
+    )
+
+
+def _competition(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(EMOJIS)} {rng.choice(COMPANIES)} {rng.choice(COMPETITIONS)} {rng.randint(2025, 2026)}\n"
+        f"Prize pool: ${rng.randrange(1, 50)}k. Teams of 2-4. Skills: {', '.join(rng.sample(SKILLS, 2))}\n"
+        f"Register before {_deadline(rng)} at https://{rng.choice(COMPANIES).split()[0].lower()}.dev/challenge"
+    )
+
+
+GENERATORS = {"job": _job, "freelance": _freelance, "grant": _grant, "competition": _competition}
+
+
+def _add_noise(rng: random.Random, text: str) -> str:
+    if rng.random() < 0.3:
+        text = f"Forwarded many times\n{text}"
+    if rng.random() < 0.3:
+        text = " ".join(f"{word} {rng.choice(EMOJIS)}" if rng.random() < 0.1 else word for word in text.split(" "))
+    if rng.random() < 0.15:
+        text = text.upper()
+    if rng.random() < 0.2:
+        text = f"{text}\n\n{rng.choice(CHATTER)}"
+    return text
+
+
+def generate_corpus(size: int = 500, seed: int = 42, chatter_ratio: float = 0.2) -> List[Dict]:
+    """Return [{"kind", "text"}] - identical for the same size and seed"""
+    rng = random.Random(seed)
+    corpus = []
+    kinds = list(GENERATORS)
+    for _ in range(size):
+        if rng.random() < chatter_ratio:
+            corpus.append({"kind": "chatter", "text": rng.choice(CHATTER)})
+            continue
+        kind = rng.choice(kinds)
+        text = GENERATORS[kind](rng)
+        # Long posts: repeat a description paragraph a few times
+        if rng.random() < 0.25:
+            text += "\n\n" + " ".join([f"About {rng.choice(COMPANIES)}: we build products used by millions."] * rng.randint(2, 12))
+        corpus.append({"kind": kind, "text": _add_noise(rng, text)})
+    return corpus
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def generate_deadlines(size: int = 5000, seed: int = 42) -> List[str]:
+    """Deadline snippets as they reach the date parser: the posts' styles plus international and relative ones"""
+    rng = random.Random(seed)
+    snippets = []
+    for _ in range(size):
+        day = date(2025, 1, 1) + timedelta(days=rng.randint(0, 364))
+        style = rng.randint(0, 7)
+        if style < 3:
+            text = _deadline(rng)
+        elif style == 3:
+            suffix = "th" if day.day in (11, 12, 13) else {1: "st", 2: "nd", 3: "rd"}.get(day.day % 10, "th")
+            text = f"{day.day}{suffix} {MONTHS[day.month - 1][:3]}"
+        elif style == 4:
+            text = f"{day.day:02d}.{day.month:02d}.{day.year}"
+        elif style == 5:
+            text = rng.choice(["in 3 days", "in a week", "end of week", "EOM", "day after tomorrow", "in 2 months"])
+        elif style == 6:
+            text = f"{rng.choice(['', 'this ', 'next '])}{rng.choice(WEEKDAYS)}"
+        else:
+            text = rng.choice(["ASAP", "rolling basis", "until filled", "soon"])
+        snippets.append(text + rng.choice(["", "", " 11:59pm WAT", ", no extensions"]))
+    return snippets
@@ -0,0 +1,120 @@
+"""
+Deadline date parsing benchmark
+
+Runs the date engine (ai_engine/dates.py) and the parsers it replaced over
+the same seeded deadline snippets (benchmarks/corpus.py): throughput, how
+many snippets each understands, and how often the old pipeline parser and
+the engine agree where both produce a date. The engine runs with its scan
+cache cleared once up front and warm, plus uncached (every snippet scanned).
+
+    python -m benchmarks.dates --size 5000
+    python -m benchmarks.dates --compare benchmarks/results/dates-<old>.json
+"""
+import argparse
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+from benchmarks.corpus import generate_deadlines
+from benchmarks.harness import compare, measure, write_results
+from ai_engine.dates import _scan, parse_iso, resolve
+
+REFERENCE = datetime(2025, 1, 1)
+
+# The parsers the engine replaced, frozen here as the baseline
+LEGACY_MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
+
+def legacy_parse_date(date_text: str, now: Optional[datetime] = None) -> Optional[str]:
+    """ai_engine.pipeline.parse_date before the engine"""
+    date_text = date_text.strip().lower()
+    now = now or datetime.now()
+
+    for month_name, month_num in LEGACY_MONTHS.items():
+        if month_name in date_text:
+            day_match = re.search(r'\b(\d{1,2})\b', date_text)
+            year_match = re.search(r'\b(20\d{2})\b', date_text)
+            if day_match and year_match:
+                return f"{year_match.group(1)}-{month_num:02d}-{int(day_match.group(1)):02d}"
+
+    match = re.search(r'(\d{4})-(\d{1,2})-(\d{1,2})', date_text)
+    if match:
+        year, month, day = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+
+    match = re.search(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', date_text)
+    if match:
+        month, day, year = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+
+    if 'tomorrow' in date_text:
+        return (now + timedelta(days=1)).strftime("%Y-%m-%d")
+    if 'next week' in date_text:
+        return (now + timedelta(weeks=1)).strftime("%Y-%m-%d")
+    if 'next month' in date_text:
+        return (now + timedelta(days=30)).strftime("%Y-%m-%d")
+    return None
+
+
+def legacy_parse_deadline(deadline_str: str) -> Optional[datetime]:
+    """ai_engine.analyzer.OpportunityAnalyzer._parse_deadline before the engine"""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(deadline_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def engine_uncached(text: str) -> Optional[str]:
+    day = resolve(_scan.__wrapped__(" ".join(text.lower().split())), REFERENCE.date())
+    return day.isoformat() if day else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deadline date parsing")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/dates-<ts>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff ops/sec against")
+    args = parser.parse_args()
+
+    snippets = generate_deadlines(args.size, args.seed)
+    parsers = {
+        "legacy.pipeline_parse_date": lambda text: legacy_parse_date(text, REFERENCE),
+        "legacy.analyzer_parse_deadline": legacy_parse_deadline,
+        "dates.uncached": engine_uncached,
+        "dates.parse_iso": lambda text: parse_iso(text, REFERENCE),
+    }
+
+    results = {}
+    for name, parse in parsers.items():
+        _scan.cache_clear()
+        stats = measure(parse, snippets, repeat=args.repeat)
+        stats["parsed_pct"] = round(sum(1 for text in snippets if parse(text) is not None) / len(snippets) * 100, 1)
+        results[name] = stats
+        print(f"  {name:<32} {stats['ops_per_sec']:>12} ops/s  p50 {stats['us_per_call_p50']:>7} us  "
+              f"parsed {stats['parsed_pct']:>5}%")
+
+    both = [(legacy_parse_date(text, REFERENCE), parse_iso(text, REFERENCE)) for text in snippets]
+    both = [(old, new) for old, new in both if old and new]
+    agreement = round(sum(1 for old, new in both if old == new) / len(both) * 100, 1) if both else None
+    info = _scan.cache_info()
+    results["dates.agreement"] = {"agree_pct": agreement, "compared": len(both)}
+    print(f"  legacy and engine agree on {agreement}% of the {len(both)} snippets both parse; "
+          f"{info.currsize} distinct snippets cached")
+
+    meta = {"size": args.size, "seed": args.seed, "repeat": args.repeat, "distinct": len(set(snippets))}
+    output = write_results("dates", results, meta, args.output)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
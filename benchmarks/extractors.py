@@ -0,0 +1,116 @@
+"""
+Extractor micro-benchmarks
+
+Runs every heuristic analyzer front end (and each field extractor of the
+shared ai_engine.pipeline on its own) over the same seeded corpus, plus an
+end-to-end pre-filter -> analysis -> SQLite insert pass, and writes
+comparable JSON results.
+
+    python -m benchmarks.extractors --size 500 --seed 42
+    python -m benchmarks.extractors --compare benchmarks/results/extractors-<old>.json
+"""
+import argparse
+import os
+import sqlite3
+from typing import Callable, Dict
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import compare, load_app_module, measure, write_results
+
+
+def collect_extractors() -> Dict[str, Callable]:
+    """Every heuristic analysis entry point we can import here"""
+    extractors = {}
+
+    from ai_engine.pipeline import CONFIRMATION_FIELDS, OUTPUT_FIELDS, analyze_content
+    for field in OUTPUT_FIELDS:
+        extractors[f"pipeline.{field}"] = lambda text, field=field: analyze_content(text)[field]
+    extractors["pipeline.confirmation_fields"] = lambda text: analyze_content(text).fields(CONFIRMATION_FIELDS)
+    extractors["pipeline.complete"] = lambda text: analyze_content(text).complete()
+
+    ai_analyzer = load_app_module("ai_analyzer")
+    if ai_analyzer:
+        extractors["ai_analyzer.FreeOpportunityAnalyzer"] = ai_analyzer.FreeOpportunityAnalyzer().analyze_opportunity
+
+    working_gemini = load_app_module("working_gemini")
+    if working_gemini:
+        extractors["working_gemini.analyze_basic"] = working_gemini.analyze_basic
+
+    whatsapp_bot = load_app_module("whatsapp_bot")
+    if whatsapp_bot:
+        # What the webhook computes before replying; the rest is saved afterwards
+        extractors["whatsapp_bot.fallback"] = lambda text: whatsapp_bot.analyze_opportunity(text, use_llm=False).fields(
+            CONFIRMATION_FIELDS)
+
+    ai_engine = load_app_module("ai_engine.analyzer")
+    if ai_engine:
+        extractors["ai_engine._fallback_analysis"] = ai_engine.OpportunityAnalyzer(use_pool=False)._fallback_analysis
+
+    return extractors
+
+
+def build_end_to_end(analyze: Callable) -> Callable:
+    """Pre-filter, analyze and insert into an in-memory copy of the opportunities table"""
+    from ai_engine.prefilter import MessagePrefilter
+
+    prefilter = MessagePrefilter(audit_path=os.devnull)
+    conn = sqlite3.connect(":memory:")
+    conn.execute('''
+        CREATE TABLE opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL, content TEXT NOT NULL, category TEXT, deadline TEXT,
+            requirements TEXT, contact_info TEXT, priority_score REAL, compensation TEXT,
+            location TEXT, summary TEXT, status TEXT DEFAULT 'new',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    def run(text: str):
+        if prefilter.classify(text)["route"] != "opportunity":
+            return
+        analysis = analyze(text)
+        conn.execute(
+            'INSERT INTO opportunities (title, content, category, deadline, requirements, contact_info, '
+            'priority_score, compensation, location, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (analysis.get("title"), text, analysis.get("category"), analysis.get("deadline"),
+             '|'.join(analysis.get("requirements") or []), str(analysis.get("contact_info")),
+             analysis.get("priority_score"), analysis.get("compensation"), analysis.get("location"),
+             analysis.get("summary"))
+        )
+        conn.commit()
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the heuristic extractors")
+    parser.add_argument("--size", type=int, default=500, help="corpus size")
+    parser.add_argument("--seed", type=int, default=42, help="corpus seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the corpus")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/extractors-<ts>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff ops/sec against")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.size, args.seed)
+    texts = [item["text"] for item in corpus]
+    print(f"📝 Corpus: {len(texts)} posts (seed {args.seed})")
+
+    extractors = collect_extractors()
+    results = {}
+    for name, fn in extractors.items():
+        results[name] = measure(fn, texts, repeat=args.repeat)
+        print(f"  {name:<40} {results[name]['ops_per_sec']:>10} ops/s  p95 {results[name]['us_per_call_p95']} µs")
+
+    name = "end_to_end.prefilter+pipeline+sqlite"
+    results[name] = measure(build_end_to_end(extractors["pipeline.complete"]), texts, repeat=args.repeat)
+    print(f"  {name:<40} {results[name]['ops_per_sec']:>10} ops/s  p95 {results[name]['us_per_call_p95']} µs")
+
+    path = write_results("extractors", results, {"corpus_size": len(texts), "seed": args.seed, "repeat": args.repeat}, args.output)
+    print(f"✅ Results written to {path}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Local fake LLM server - speaks enough of the Gemini and OpenAI REST APIs for
+the analyzers, so LLM paths can be benchmarked offline and reproducibly.
+
+    python -m benchmarks.fake_llm --port 8090 --latency lognormal:0.8:0.4 --error-rate 0.05
+
+Point the apps at it:
+
+    GEMINI_API_KEY=fake GEMINI_API_BASE=http://127.0.0.1:8090
+    OPENAI_API_KEY=fake OPENAI_API_BASE=http://127.0.0.1:8090/v1
+
+Answers are schema-conformant JSON derived from the text in the prompt
+(benchmarks.stubs.fake_analysis). Faults are injected per request, in this
+order: timeout (hang), 429, malformed JSON, ```json fenced JSON.
+
+    GET  /stats    request and fault counters
+    POST /config   update fault settings at runtime, e.g. {"error_rate": 0.5}
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from benchmarks.stubs import fake_analysis, parse_latency
+
+PROMPT_TEXT = re.compile(r'(?:TEXT|Text):\s*"(.*)"\s*\n\s*(?:\n\s*)?Extract', re.DOTALL)
+FAULTS = ("timeouts", "rate_limited", "malformed", "fenced")
+
+
+def extract_post(prompt: str) -> str:
+    """The opportunity text embedded in one of the analyzer prompts"""
+    match = PROMPT_TEXT.search(prompt)
+    return match.group(1) if match else prompt
+
+
+class FakeLLMServer:
+    """Threaded HTTP server answering Gemini generateContent and OpenAI chat completions"""
+
+    def __init__(self, port: int = 0, latency: str = "constant:0.2", error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, fenced_rate: float = 0.0, timeout_rate: float = 0.0,
+                 hang_seconds: float = 60.0, seed: int = 7):
+        self.config = {
+            "latency": latency,
+            "error_rate": error_rate,
+            "malformed_rate": malformed_rate,
+            "fenced_rate": fenced_rate,
+            "timeout_rate": timeout_rate,
+            "hang_seconds": hang_seconds,
+            "seed": seed
+        }
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "gemini": 0, "openai": 0, "ok": 0, **{fault: 0 for fault in FAULTS}}
+        self._configure()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    with fake.lock:
+                        self._send_json(200, {"config": fake.config, "stats": dict(fake.stats)})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "invalid JSON body"}})
+                    return
+
+                if self.path.rstrip("/") == "/config":
+                    fake.update(payload)
+                    self._send_json(200, fake.config)
+                elif ":generateContent" in self.path:
+                    fake.handle(self, "gemini", payload)
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    fake.handle(self, "openai", payload)
+                else:
+                    self._send_json(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+
+            def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _configure(self):
+        self.sample_latency = parse_latency(self.config["latency"], self.config["seed"])
+        self.rng = random.Random(self.config["seed"] + 1)
+
+    def update(self, changes: Dict):
+        with self.lock:
+            self.config.update({key: value for key, value in changes.items() if key in self.config})
+            self._configure()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _pick_fault(self) -> Optional[str]:
+        """Draw this request's latency and fault under the lock, so runs are reproducible"""
+        roll = self.rng.random()
+        threshold = 0.0
+        for fault, key in zip(FAULTS, ("timeout_rate", "error_rate", "malformed_rate", "fenced_rate")):
+            threshold += self.config[key]
+            if roll < threshold:
+                return fault
+        return None
+
+    def handle(self, handler, api: str, payload: Dict):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[api] += 1
+            delay = self.sample_latency()
+            fault = self._pick_fault()
+            hang = self.config["hang_seconds"]
+            self.stats[fault or "ok"] += 1
+
+        if fault == "timeouts":
+            time.sleep(hang)
+            return
+        time.sleep(delay)
+
+        if fault == "rate_limited":
+            message = "Resource has been exhausted (e.g. check quota)." if api == "gemini" else "Rate limit reached for requests"
+            body = {"error": {"code": 429, "message": message, "status": "RESOURCE_EXHAUSTED", "type": "rate_limit_exceeded"}}
+            handler._send_json(429, body, {"Retry-After": "1"})
+            return
+
+        if api == "gemini":
+            parts = payload.get("contents", [{}])[-1].get("parts", [])
+            prompt = "".join(part.get("text", "") for part in parts)
+        else:
+            prompt = payload.get("messages", [{}])[-1].get("content", "")
+
+        text = json.dumps(fake_analysis(extract_post(prompt)), indent=2)
+        if fault == "malformed":
+            text = text[:len(text) // 2]
+        elif fault == "fenced":
+            text = f"```json\n{text}\n```"
+
+        if api == "gemini":
+            body = {
+                "candidates": [{
+                    "content": {"parts": [{"text": text}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0
+                }],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+            }
+        else:
+            body = {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "gpt-3.5-turbo"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                          "total_tokens": (len(prompt) + len(text)) // 4}
+            }
+        handler._send_json(200, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini/OpenAI server for offline benchmarks")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:0.8:0.4", help="constant:S, uniform:A:B or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated JSON answers")
+    parser.add_argument("--fenced-rate", type=float, default=0.0, help="share of answers wrapped in ```json fences")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=60.0, help="how long a hanging request hangs")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.port, args.latency, args.error_rate, args.malformed_rate,
+                           args.fenced_rate, args.timeout_rate, args.hang_seconds, args.seed)
+    print(f"🤖 Fake LLM listening on {server.url}")
+    print(f"   GEMINI_API_BASE={server.url}  OPENAI_API_BASE={server.url}/v1")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
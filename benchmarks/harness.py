@@ -0,0 +1,132 @@
+"""
+Shared helpers for the benchmark scripts: timing, allocation tracking,
+loading the app modules and writing comparable JSON results.
+"""
+import gc
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+def use_dummy_twilio_credentials():
+    """Let the Twilio client constructors succeed - benchmarks never send anything"""
+    os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACbenchmark")
+    os.environ.setdefault("TWILIO_AUTH_TOKEN", "benchmark")
+
+
+def load_app_module(name: str):
+    """Import one of the top-level app scripts, or None if its dependencies are missing
+
+    whatsapp_bot.py is shadowed by the whatsapp_bot/ package, so scripts are
+    loaded straight from their file.
+    """
+    use_dummy_twilio_credentials()
+    path = REPO_ROOT / f"{name}.py"
+    try:
+        if path.exists():
+            spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        return importlib.import_module(name)
+    except ImportError as e:
+        print(f"⚠️ Skipping {name}: {e}")
+        return None
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(fn: Callable, inputs: Iterable, repeat: int = 3, warmup: int = 1) -> Dict:
+    """Time fn over every input, then measure allocations in a separate pass"""
+    inputs = list(inputs)
+    for _ in range(warmup):
+        for item in inputs:
+            fn(item)
+
+    timings = []
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            call_start = time.perf_counter_ns()
+            fn(item)
+            timings.append((time.perf_counter_ns() - call_start) / 1000.0)
+    elapsed = time.perf_counter() - start
+
+    # Allocation pass (tracemalloc slows everything down, so it's not timed)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    snapshot_before = tracemalloc.take_snapshot()
+    for item in inputs:
+        fn(item)
+    snapshot_after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, "filename") if stat.size_diff > 0)
+
+    calls = len(timings)
+    return {
+        "calls": calls,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(calls / elapsed, 1) if elapsed else None,
+        "us_per_call_mean": round(sum(timings) / calls, 2) if calls else None,
+        "us_per_call_p50": round(percentile(timings, 50), 2),
+        "us_per_call_p95": round(percentile(timings, 95), 2),
+        "alloc_peak_kb": round((peak - before) / 1024, 2),
+        "alloc_retained_bytes_per_call": round(allocated / max(1, len(inputs)), 1)
+    }
+
+
+def write_results(name: str, results: Dict, meta: Dict, output: Optional[str] = None) -> Path:
+    """Write {"meta", "results"} JSON; defaults to benchmarks/results/<name>-<timestamp>.json"""
+    payload = {
+        "meta": {
+            "benchmark": name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta
+        },
+        "results": results
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def compare(baseline_path: str, results: Dict, metric: str = "ops_per_sec"):
+    """Print the relative change of one metric against an earlier results file"""
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    print(f"\n📊 {metric} vs {baseline_path}")
+    for name, current in results.items():
+        old = baseline.get(name, {}).get(metric)
+        new = current.get(metric)
+        if not old or new is None:
+            print(f"  {name:<40} {new!s:>12}   (no baseline)")
+            continue
+        change = (new - old) / old * 100
+        print(f"  {name:<40} {new:>12} {change:+7.1f}%")
@@ -0,0 +1,223 @@
+"""
+Webhook load test with a local Twilio simulator
+
+Replays realistic Twilio form posts (From, Body, MediaUrl0, MessageSid) at a
+target rate and concurrency against whatsapp_bot.py's /whatsapp or the
+backend's /whatsapp/webhook, and reports throughput, p50/p95/p99 latency,
+error rate and SQLite lock errors.
+
+By default the app runs in-process (uvicorn in a thread, databases in a temp
+dir) with a stub LLM in the provider pool and a stub media server:
+
+    python -m benchmarks.loadtest --target whatsapp_bot --rate 50 --duration 20
+    python -m benchmarks.loadtest --target backend --llm-latency uniform:0.2:1.5 --media-ratio 0.2
+    python -m benchmarks.loadtest --url http://localhost:8000/whatsapp   # an already running server
+"""
+import argparse
+import io
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import REPO_ROOT, load_app_module, percentile, use_dummy_twilio_credentials, write_results
+from benchmarks.stubs import StubLLMProvider, StubMediaServer
+
+LOCK_MARKERS = ("database is locked", "database table is locked")
+ERROR_MARKERS = ("error processing", "sorry, there was an error")
+
+
+class LockCounter(io.TextIOBase):
+    """Tee for stdout that counts SQLite lock errors printed by the app"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.locks = 0
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        lowered = text.lower()
+        if any(marker in lowered for marker in LOCK_MARKERS):
+            with self.lock:
+                self.locks += 1
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app_in_process(target: str, args) -> str:
+    """Start the target app under uvicorn in a thread; returns the webhook URL"""
+    import uvicorn
+    from ai_engine import provider_pool
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    os.chdir(workdir)
+    print(f"🗂️  App databases in {workdir}")
+
+    use_dummy_twilio_credentials()
+    os.environ.setdefault("AGGREGATION_WINDOW_SECONDS", str(args.aggregation_window))
+    os.environ.setdefault("PREFILTER_AUDIT_LOG", os.devnull)
+    if not args.rate_limit:
+        os.environ["RATE_LIMIT_BURST"] = "1000000"
+
+    # Every LLM call in the app goes to the stub
+    provider_pool._pool = provider_pool.ProviderPool(
+        [StubLLMProvider(latency=args.llm_latency, error_rate=args.llm_error_rate)],
+        timeout=float(os.getenv("LLM_POOL_TIMEOUT", "20"))
+    )
+
+    if target == "backend":
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'opportunities.db')}"
+        from backend.main import app
+        from backend.database.connection import engine
+        from backend.models.opportunity import Base
+        Base.metadata.create_all(bind=engine)
+        path = "/whatsapp/webhook"
+    else:
+        app = load_app_module("whatsapp_bot").app
+        path = "/whatsapp"
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}{path}"
+
+
+def build_requests(count: int, senders: int, media_ratio: float, media_url: str, seed: int) -> List[Dict]:
+    """Twilio-shaped form posts drawn from the synthetic corpus"""
+    rng = random.Random(seed)
+    corpus = generate_corpus(max(count, 1), seed)
+    forms = []
+    for i in range(count):
+        form = {
+            "From": f"whatsapp:+1555{rng.randrange(senders):07d}",
+            "To": "whatsapp:+14155238886",
+            "Body": corpus[i % len(corpus)]["text"],
+            "MessageSid": f"SM{seed:04d}{i:028d}",
+            "NumMedia": "0"
+        }
+        if media_url and rng.random() < media_ratio:
+            form["NumMedia"] = "1"
+            form["MediaUrl0"] = f"{media_url}/media/{i}.png"
+            form["MediaContentType0"] = "image/png"
+        forms.append(form)
+    return forms
+
+
+def run_load(url: str, forms: List[Dict], rate: float, concurrency: int, timeout: float) -> Dict:
+    """Open-loop replay; latency is measured from the scheduled send time"""
+    local = threading.local()
+    results = []
+    results_lock = threading.Lock()
+
+    def send(form, scheduled):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        outcome = "ok"
+        try:
+            response = local.session.post(url, data=form, timeout=timeout)
+            body = response.text.lower()
+            if response.status_code >= 400:
+                outcome = f"http_{response.status_code}"
+            elif any(marker in body for marker in LOCK_MARKERS):
+                outcome = "sqlite_locked"
+            elif any(marker in body for marker in ERROR_MARKERS):
+                outcome = "app_error"
+        except requests.Timeout:
+            outcome = "timeout"
+        except requests.RequestException:
+            outcome = "connection_error"
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((latency, outcome))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, form in enumerate(forms):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, form, scheduled)
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for latency, _ in results]
+    outcomes = {}
+    for _, outcome in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    errors = sum(count for outcome, count in outcomes.items() if outcome != "ok")
+    return {
+        "requests": len(results),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "latency_ms_p50": round(percentile(latencies, 50), 1),
+        "latency_ms_p95": round(percentile(latencies, 95), 1),
+        "latency_ms_p99": round(percentile(latencies, 99), 1),
+        "latency_ms_max": round(max(latencies), 1) if latencies else None,
+        "error_rate": round(errors / len(results), 4) if results else None,
+        "outcomes": outcomes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the WhatsApp webhooks")
+    parser.add_argument("--target", choices=["whatsapp_bot", "backend"], default="whatsapp_bot")
+    parser.add_argument("--url", help="hit an already running webhook instead of starting one in-process")
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=32, help="max in-flight requests")
+    parser.add_argument("--senders", type=int, default=200, help="distinct From numbers")
+    parser.add_argument("--media-ratio", type=float, default=0.1, help="share of posts with MediaUrl0")
+    parser.add_argument("--media-latency", default="constant:0.05", help="stub media server latency")
+    parser.add_argument("--llm-latency", default="lognormal:0.8:0.4", help="stub LLM latency distribution")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="stub LLM failure rate")
+    parser.add_argument("--aggregation-window", type=float, default=0.0, help="AGGREGATION_WINDOW_SECONDS for the app")
+    parser.add_argument("--rate-limit", action="store_true", help="keep per-sender rate limiting on")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/loadtest-<ts>.json)")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    lock_counter = LockCounter(sys.stdout)
+    sys.stdout = lock_counter
+
+    media = StubMediaServer(latency=args.media_latency).start()
+    url = args.url or start_app_in_process(args.target, args)
+    count = int(args.rate * args.duration)
+    forms = build_requests(count, args.senders, args.media_ratio, media.url, args.seed)
+
+    print(f"🚀 {count} requests at {args.rate}/s (concurrency {args.concurrency}) -> {url}")
+    results = run_load(url, forms, args.rate, args.concurrency, args.timeout)
+    results["sqlite_lock_errors_logged"] = lock_counter.locks
+    media.stop()
+
+    for key, value in results.items():
+        print(f"  {key:<28} {value}")
+
+    meta = {key: value for key, value in vars(args).items() if key != "output"}
+    meta["url"] = url
+    path = write_results("loadtest", {args.target if not args.url else "external": results}, meta, args.output)
+    sys.stdout = lock_counter.stream
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Outbound messaging benchmark
+
+Sends a burst of confirmations (several per phone for some recipients) to a
+StubTwilioServer that answers 429 above a per-sender rate, once with ad-hoc
+concurrent messages.create calls and once through the OutboundMessenger,
+and reports throughput, 429s, lost messages and connections opened.
+
+    python -m benchmarks.outbound --notifications 1000 --recipients 400 --mps 80
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import use_dummy_twilio_credentials, write_results
+from benchmarks.stubs import StubTwilioServer
+
+SENDER = "whatsapp:+15550000000"
+
+
+def workload(notifications: int, recipients: int, seed: int):
+    rng = random.Random(seed)
+    return [(f"whatsapp:+1555{rng.randrange(recipients):07d}", f"✅ Opportunity #{i} saved")
+            for i in range(notifications)]
+
+
+def run_naive(messages, threads: int) -> dict:
+    """What ad-hoc to_thread(messages.create) calls amount to: no pacing, no retry"""
+    from whatsapp_bot.twilio_client import get_twilio_client
+
+    def send(item):
+        to, body = item
+        try:
+            get_twilio_client().messages.create(from_=SENDER, to=to, body=body)
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        delivered = sum(pool.map(send, messages))
+    return {"seconds": round(time.perf_counter() - start, 3), "delivered": delivered,
+            "lost": len(messages) - delivered}
+
+
+async def run_messenger(messages, mps: float, dead_letter_path: str) -> dict:
+    from whatsapp_bot.outbound import OutboundMessenger
+
+    messenger = OutboundMessenger(sends_per_second=mps, dead_letter_path=dead_letter_path, retry_delay=0.5)
+    start = time.perf_counter()
+    sids = await asyncio.gather(*(messenger.send(to, body, from_=SENDER) for to, body in messages))
+    elapsed = time.perf_counter() - start
+    await messenger.stop()
+    return {"seconds": round(elapsed, 3), "delivered": sum(1 for sid in sids if sid),
+            "lost": sum(1 for sid in sids if not sid)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paced outbound WhatsApp sends against a 429ing stub")
+    parser.add_argument("--notifications", type=int, default=1000)
+    parser.add_argument("--recipients", type=int, default=400, help="distinct phones (fewer means more coalescing)")
+    parser.add_argument("--mps", type=float, default=80.0, help="stub's per-sender messages per second")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent calls in the ad-hoc run")
+    parser.add_argument("--latency", default="constant:0.02", help="stub Twilio latency distribution")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/outbound-<ts>.json)")
+    args = parser.parse_args()
+
+    use_dummy_twilio_credentials()
+    messages = workload(args.notifications, args.recipients, args.seed)
+    results = {}
+    for name in ("ad_hoc", "messenger"):
+        # Fresh stub per run so its per-sender bucket starts full
+        stub = StubTwilioServer(latency=args.latency, sender_mps=args.mps).start()
+        os.environ["TWILIO_API_BASE"] = stub.url
+        import whatsapp_bot.twilio_client as twilio_client
+        twilio_client._client = None
+
+        if name == "ad_hoc":
+            result = run_naive(messages, args.threads)
+        else:
+            with tempfile.TemporaryDirectory(prefix="outbound-") as workdir:
+                result = asyncio.run(run_messenger(messages, args.mps, os.path.join(workdir, "dead_letters.log")))
+        result.update(requests=len(stub.messages) + stub.throttled, throttled=stub.throttled,
+                      messages=len(stub.messages), connections=stub.connections)
+        stub.stop()
+        results[name] = result
+        print(f"  {name:<10} {result['seconds']:>7}s  {result['delivered']} delivered, {result['lost']} lost, "
+              f"{result['throttled']} x 429, {result['messages']} messages over {result['connections']} connection(s)")
+
+    meta = {"notifications": args.notifications, "recipients": args.recipients, "mps": args.mps,
+            "threads": args.threads, "latency": args.latency, "seed": args.seed}
+    output = write_results("outbound", results, meta, args.output)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
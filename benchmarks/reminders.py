@@ -0,0 +1,124 @@
+"""
+Deadline reminder benchmark
+
+Fills a throwaway WhatsApp database with opportunities spread over a few
+thousand phone numbers, syncs their reminders, loads the heap horizon, then
+makes a burst of them due and lets the scheduler send it through the
+outbound messenger and the real Twilio client to StubTwilioServer.
+
+    python -m benchmarks.reminders --rows 100000 --due 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.harness import use_dummy_twilio_credentials, write_results
+from benchmarks.stubs import StubTwilioServer
+
+
+def build_table(path: str, rows: int, phones: int, seed: int):
+    rng = random.Random(seed)
+    today = date.today()
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL, content TEXT NOT NULL, deadline TEXT,
+            status TEXT DEFAULT 'new', phone_number TEXT
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO opportunities (title, content, deadline, phone_number) VALUES (?, ?, ?, ?)',
+        [(f"Opportunity {i}", "benchmark", (today + timedelta(days=rng.randint(5, 120))).isoformat(),
+          f"whatsapp:+1555{rng.randrange(phones):07d}") for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def send_burst(scheduler, due: int, timeout: float) -> float:
+    """Make the first `due` reminders due now and wait until the scheduler has sent them"""
+    conn = sqlite3.connect(scheduler.store.db_path)
+    with conn:
+        conn.execute("UPDATE reminders SET fire_at = ? WHERE id IN (SELECT id FROM reminders ORDER BY id LIMIT ?)",
+                     (time.time(), due))
+    conn.close()
+    start = time.perf_counter()
+    scheduler.start()
+    while scheduler.sent < due and time.perf_counter() - start < timeout:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await scheduler.stop()
+    await scheduler.outbound.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deadline reminder scheduler")
+    parser.add_argument("--rows", type=int, default=100000, help="opportunities with a deadline")
+    parser.add_argument("--phones", type=int, default=5000, help="distinct phone numbers")
+    parser.add_argument("--due", type=int, default=2000, help="reminders made due at once")
+    parser.add_argument("--sends-per-second", type=float, default=200.0)
+    parser.add_argument("--latency", default="constant:0.01", help="stub Twilio latency distribution")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/reminders-<ts>.json)")
+    args = parser.parse_args()
+
+    use_dummy_twilio_credentials()
+    stub = StubTwilioServer(latency=args.latency).start()
+    os.environ["TWILIO_API_BASE"] = stub.url
+    from whatsapp_bot.outbound import OutboundMessenger
+    from whatsapp_bot.reminders import ReminderScheduler
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="reminders-") as workdir:
+        path = os.path.join(workdir, "whatsapp_opportunities.db")
+        build_table(path, args.rows, args.phones, args.seed)
+        outbound = OutboundMessenger(sends_per_second=args.sends_per_second,
+                                     dead_letter_path=os.path.join(workdir, "dead_letters.log"))
+        scheduler = ReminderScheduler(path, outbound)
+        scheduler.store.init_table()
+
+        start = time.perf_counter()
+        created = scheduler.store.sync(scheduler.lead_days, scheduler.hour)
+        results["sync"] = {"reminders": created, "seconds": round(time.perf_counter() - start, 3)}
+        print(f"  sync            {results['sync']['seconds']:>8}s  {created} reminders")
+
+        start = time.perf_counter()
+        scheduler.store.sync(scheduler.lead_days, scheduler.hour)
+        results["resync_noop"] = {"seconds": round(time.perf_counter() - start, 4)}
+        print(f"  re-sync (none)  {results['resync_noop']['seconds']:>8}s")
+
+        # Memory for the whole table in the heap, i.e. an unbounded horizon
+        tracemalloc.start()
+        start = time.perf_counter()
+        scheduler._push(scheduler.store.due_before(float("inf")))
+        results["heap_all"] = {"entries": len(scheduler.heap), "seconds": round(time.perf_counter() - start, 3),
+                               "kb": round(tracemalloc.get_traced_memory()[0] / 1024, 1)}
+        tracemalloc.stop()
+        print(f"  heap (all)      {results['heap_all']['seconds']:>8}s  {len(scheduler.heap)} entries, "
+              f"{results['heap_all']['kb']} KiB")
+        scheduler.heap.clear()
+        scheduler.queued.clear()
+
+        elapsed = asyncio.run(send_burst(scheduler, args.due, timeout=max(30.0, args.due / args.sends_per_second * 4)))
+        results["burst"] = {"due": args.due, "sent": scheduler.sent, "messages": len(stub.messages),
+                            "connections": stub.connections, "seconds": round(elapsed, 3)}
+        print(f"  burst           {results['burst']['seconds']:>8}s  {scheduler.sent} reminders in "
+              f"{len(stub.messages)} messages over {stub.connections} connection(s)")
+
+    stub.stop()
+    meta = {"rows": args.rows, "phones": args.phones, "due": args.due,
+            "sends_per_second": args.sends_per_second, "latency": args.latency, "seed": args.seed}
+    output = write_results("reminders", results, meta, args.output)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Priority re-scoring benchmark
+
+Fills a throwaway SQLite table with opportunities whose deadlines are spread
+over the next year (and some past), backfills it once, then runs the daily
+incremental pass for a number of simulated days and compares it with a naive
+full re-score of every row.
+
+    python -m benchmarks.rescoring --rows 1000000 --days 7
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.harness import write_results
+from ai_engine.rescoring import PriorityRescorer, deadline_bucket, rescored
+
+
+def build_table(path: str, rows: int, seed: int, today: date):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL, content TEXT NOT NULL, deadline TEXT,
+            priority_score REAL DEFAULT 5.0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    batch = []
+    for i in range(rows):
+        # A quarter without deadline, the rest from 60 days ago to a year out
+        deadline = None if rng.random() < 0.25 else (today + timedelta(days=rng.randint(-60, 365))).isoformat()
+        batch.append((f"Opportunity {i}", "benchmark", deadline, round(rng.uniform(4, 9), 1), today.isoformat()))
+        if len(batch) == 50000:
+            conn.executemany('INSERT INTO opportunities (title, content, deadline, priority_score, created_at) '
+                             'VALUES (?, ?, ?, ?, ?)', batch)
+            batch = []
+    if batch:
+        conn.executemany('INSERT INTO opportunities (title, content, deadline, priority_score, created_at) '
+                         'VALUES (?, ?, ?, ?, ?)', batch)
+    conn.commit()
+    conn.close()
+
+
+def full_rescore(path: str, today: date) -> int:
+    """What a naive nightly job does: recompute every row with a deadline"""
+    conn = sqlite3.connect(path)
+    rows = [(rescored(base, deadline_bucket(deadline, today)), deadline_bucket(deadline, today), row_id)
+            for row_id, deadline, base in conn.execute(
+                'SELECT id, deadline, priority_base FROM opportunities WHERE deadline IS NOT NULL')]
+    with conn:
+        conn.executemany('UPDATE opportunities SET priority_score = ?, deadline_bucket = ? WHERE id = ?', rows)
+    conn.close()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental priority re-scoring")
+    parser.add_argument("--rows", type=int, default=1000000, help="opportunities in the table")
+    parser.add_argument("--days", type=int, default=7, help="simulated daily runs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/rescoring-<ts>.json)")
+    args = parser.parse_args()
+
+    today = date.today()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="rescoring-") as workdir:
+        path = os.path.join(workdir, "opportunities.db")
+        start = time.perf_counter()
+        build_table(path, args.rows, args.seed, today)
+        print(f"📝 {args.rows} rows built in {time.perf_counter() - start:.1f}s")
+
+        rescorer = PriorityRescorer(path)
+        start = time.perf_counter()
+        stats = rescorer.run(today)
+        results["backfill"] = {**stats, "seconds": round(time.perf_counter() - start, 3)}
+        print(f"  backfill        {results['backfill']['seconds']:>8}s  {stats['updated']} rows")
+
+        conn = sqlite3.connect(path)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM opportunities WHERE deadline >= '2026-01-01' "
+                            "AND deadline < '2026-01-02' AND id <= 10").fetchall()
+        conn.close()
+        print(f"  range scan plan: {plan[-1][-1]}")
+
+        for day in range(1, args.days + 1):
+            start = time.perf_counter()
+            stats = rescorer.run(today + timedelta(days=day))
+            results[f"day_{day}"] = {**stats, "seconds": round(time.perf_counter() - start, 3)}
+            print(f"  day {day:<11} {results[f'day_{day}']['seconds']:>8}s  {stats['updated']} re-scored, "
+                  f"{stats['crossed']} scanned")
+
+        start = time.perf_counter()
+        rows = full_rescore(path, today + timedelta(days=args.days + 1))
+        results["full_rescore"] = {"updated": rows, "seconds": round(time.perf_counter() - start, 3)}
+        print(f"  full re-score   {results['full_rescore']['seconds']:>8}s  {rows} rows")
+
+    output = write_results("rescoring", results, {"rows": args.rows, "days": args.days, "seed": args.seed}, args.output)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+List-response serialization benchmark
+
+Encodes a GET /opportunities response of --rows records the way FastAPI does
+by default (jsonable_encoder + JSONResponse; response_model validation for
+the backend's ORM objects) and from cached per-row fragments, cold and warm.
+
+    python -m benchmarks.serialization --rows 5000
+    python -m benchmarks.serialization --compare benchmarks/results/serialization-<old>.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from benchmarks.harness import compare, write_results
+from ai_engine.serialization import FragmentCache, dumps, json_array, orjson
+
+
+def timed_ms(fn: Callable, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) / repeat * 1000, 3)
+
+
+def build_sqlite(path: str, rows: int, rng: random.Random):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT NOT NULL,
+            category TEXT, deadline TEXT, requirements TEXT, contact_info TEXT, priority_score REAL,
+            compensation TEXT, location TEXT, summary TEXT, status TEXT DEFAULT 'new',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO opportunities (title, content, category, deadline, requirements, contact_info, priority_score, '
+        'compensation, location, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(f"Backend Engineer #{i} – Lagos", "We're hiring. " * rng.randint(5, 40), "job", "2026-12-01",
+          "Python|SQL|Docker|3+ years", "{'email': ['jobs@example.com']}", round(rng.uniform(3, 9), 1),
+          "₦500,000 - ₦800,000", "Lagos", "Backend role at a fintech") for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def row_to_opportunity(row) -> dict:
+    return {
+        "id": row[0], "title": row[1], "content": row[2], "category": row[3], "deadline": row[4],
+        "requirements": row[5].split('|') if row[5] else [], "contact_info": row[6], "priority_score": row[7],
+        "compensation": row[8], "location": row[9], "summary": row[10], "status": row[11], "created_at": row[12]
+    }
+
+
+def bench_read_model(rows: int, repeat: int, rng: random.Random) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from ai_engine.read_model import OpportunityReadModel
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="serialization-") as workdir:
+        path = os.path.join(workdir, "opportunities.db")
+        build_sqlite(path, rows, rng)
+        model = OpportunityReadModel(path, row_to_opportunity, poll_interval=0)
+        model.reload()
+        records = model.list()
+
+        results["sqlite.fastapi_default"] = timed_ms(lambda: JSONResponse(jsonable_encoder(records)).body, repeat)
+        results["sqlite.fragments_join"] = timed_ms(lambda: json_array(model.view[3]), repeat)
+        results["sqlite.read_model_json"] = timed_ms(model.json, repeat)
+
+        def one_row_changed():
+            record = dict(records[rng.randrange(len(records))], status="applied")
+            model.apply({record["id"]: record})
+            return model.json()
+        results["sqlite.one_row_changed"] = timed_ms(one_row_changed, repeat)
+        same = JSONResponse(jsonable_encoder(model.list())).body == model.json()
+    results["sqlite.identical_output"] = same
+    return results
+
+
+def bench_backend(rows: int, repeat: int, rng: random.Random) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from backend.models.opportunity import Opportunity
+    from backend.schemas.opportunity import OpportunityResponse
+
+    now = datetime(2026, 1, 1)
+    objects = [Opportunity(id=i, title=f"Backend Engineer #{i}", content="We're hiring. " * rng.randint(5, 40),
+                           category="job", deadline=now + timedelta(days=30), requirements=["Python", "SQL"],
+                           contact_info={"email": ["jobs@example.com"]}, priority_score=7.0, status="new",
+                           source="whatsapp", created_at=now, updated_at=now) for i in range(1, rows + 1)]
+    field = create_response_field(name="Response_get_opportunities", type_=list[OpportunityResponse])
+
+    def response_model():
+        content = asyncio.run(serialize_response(field=field, response_content=objects))
+        return JSONResponse(content).body
+
+    encode = lambda o: OpportunityResponse.model_validate(o).model_dump(mode="json")
+    cache = FragmentCache()
+    cached = lambda: json_array(cache.fragment(o.id, o.updated_at, lambda: encode(o)) for o in objects)
+
+    # Cold: every row encoded (first request, or after every row changed)
+    cold = lambda: json_array(cache.put(o.id, o.updated_at, dumps(encode(o))) for o in objects)
+
+    results = {"backend.response_model": timed_ms(response_model, repeat)}
+    results["backend.fragments_cold"] = timed_ms(cold, max(1, repeat // 5))
+    results["backend.fragments_warm"] = timed_ms(cached, repeat)
+    results["backend.identical_output"] = response_model() == cached()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pre-serialized list responses")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/serialization-<ts>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff ms against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name, value in {**bench_read_model(args.rows, args.repeat, rng), **bench_backend(args.rows, args.repeat, rng)}.items():
+        results[name] = {"ms": value} if not isinstance(value, bool) else {"identical": value}
+        print(f"  {name:<28} {value if isinstance(value, bool) else f'{value:>9} ms'}")
+
+    meta = {"rows": args.rows, "repeat": args.repeat, "seed": args.seed, "orjson": orjson is not None}
+    output = write_results("serialization", results, meta, args.output)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, results, metric="ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Local stand-ins for the outside world during load tests:
+
+  StubMediaServer  - serves a small image for MediaUrl0, with latency
+  StubTwilioServer - accepts Messages.json sends and records them (TWILIO_API_BASE),
+                     answering 429 above a per-sender rate like Twilio
+  StubLLMProvider  - drop-in ProviderPool provider with a latency distribution
+  fake_analysis    - schema-conformant analysis derived from the input text
+"""
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from urllib.parse import parse_qs
+
+from ai_engine.provider_pool import LLMProvider
+
+# 1x1 transparent PNG, used when Pillow isn't installed
+_TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+
+def parse_latency(spec: str, seed: int = 7) -> Callable[[], float]:
+    """Build a latency sampler (seconds) from "constant:0.5", "uniform:0.2:1.5" or "lognormal:0.8:0.4" (median, sigma)"""
+    rng = random.Random(seed)
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "constant":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def fake_analysis(content: str) -> Dict:
+    """Deterministic, schema-conformant analysis derived from the post itself"""
+    lowered = content.lower()
+    first_line = content.strip().split("\n")[0] if content.strip() else "Untitled Opportunity"
+    category = "other"
+    for name, words in (("job", ("hiring", "job", "engineer", "developer")),
+                        ("freelance", ("freelance", "gig", "contract")),
+                        ("grant", ("grant", "scholarship", "fellowship", "funding")),
+                        ("competition", ("hackathon", "competition", "challenge", "contest"))):
+        if any(word in lowered for word in words):
+            category = name
+            break
+    deadline = re.search(r"\b(20\d{2})-(\d{2})-(\d{2})\b", content)
+    requirements = []
+    match = re.search(r"requirements?:\s*([^\n.]+)", content, re.IGNORECASE)
+    if match:
+        requirements = [item.strip() for item in match.group(1).split(",") if item.strip()][:5]
+    money = re.search(r"[$₦€£][\d,]+k?(?:\s*-\s*[$₦€£]?[\d,]+k?)?", content)
+    return {
+        "title": first_line[:80],
+        "category": category,
+        "deadline": deadline.group(0) if deadline else None,
+        "requirements": requirements,
+        "contact_info": {
+            "emails": re.findall(r"\b[\w.+-]+@[\w.-]+\.[a-z]{2,}\b", content, re.IGNORECASE),
+            "phones": re.findall(r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b", content),
+            "websites": re.findall(r"https?://\S+", content)
+        },
+        "priority_score": 8.0 if "urgent" in lowered else 6.0,
+        "compensation": money.group(0) if money else None,
+        "location": "Remote" if "remote" in lowered else None,
+        "summary": f"Stub analysis of a {category} post ({len(content)} chars)"
+    }
+
+
+class StubLLMProvider(LLMProvider):
+    """Pool provider that sleeps for a sampled latency and fails at a given rate"""
+
+    def __init__(self, name: str = "stub", latency: str = "lognormal:0.8:0.4", error_rate: float = 0.0,
+                 seed: int = 7, **kwargs):
+        super().__init__(rpm_limit=kwargs.pop("rpm_limit", 1_000_000), **kwargs)
+        self.name = name
+        self.sample_latency = parse_latency(latency, seed)
+        self.failure_rate = error_rate
+        self.rng = random.Random(seed + 1)
+        self.rng_lock = threading.Lock()
+
+    def request(self, content: str) -> dict:
+        with self.rng_lock:
+            delay = self.sample_latency()
+            fail = self.rng.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("stub LLM injected failure")
+        return fake_analysis(content)
+
+
+class StubMediaServer:
+    """Tiny HTTP server that answers every GET with an image after a sampled delay"""
+
+    def __init__(self, port: int = 0, latency: str = "constant:0.05"):
+        sample = parse_latency(latency)
+        image = _TINY_PNG
+        try:
+            from PIL import Image, ImageDraw
+            canvas = Image.new("RGB", (480, 120), "white")
+            ImageDraw.Draw(canvas).text((10, 40), "Hiring: Backend Engineer. Apply by 2025-03-01", fill="black")
+            buffer = io.BytesIO()
+            canvas.save(buffer, format="PNG")
+            image = buffer.getvalue()
+        except ImportError:
+            pass
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(sample())
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(image)))
+                self.end_headers()
+                self.wfile.write(image)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class StubTwilioServer:
+    """Answers POST /2010-04-01/Accounts/<sid>/Messages.json like Twilio and keeps what was sent"""
+
+    def __init__(self, port: int = 0, latency: str = "constant:0.0", fail_every: int = 0,
+                 sender_mps: float = 0.0, burst: float = 0.0):
+        sample = parse_latency(latency)
+        self.messages: List[Dict] = []
+        self.connections = 0
+        self.throttled = 0
+        # Per-From token buckets when sender_mps is set: (tokens, updated)
+        buckets: Dict[str, list] = {}
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so connection reuse by the client is visible in stub.connections
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't wait on delayed ACKs between them
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+                time.sleep(sample())
+                with lock:
+                    number = len(stub.messages) + 1
+                    failed = fail_every and number % fail_every == 0
+                    if sender_mps and not failed:
+                        now = time.monotonic()
+                        bucket = buckets.setdefault(form.get("From", [""])[0], [burst or sender_mps, now])
+                        bucket[0] = min(burst or sender_mps, bucket[0] + (now - bucket[1]) * sender_mps)
+                        bucket[1] = now
+                        failed = bucket[0] < 1
+                        if not failed:
+                            bucket[0] -= 1
+                    if failed:
+                        stub.throttled += 1
+                    else:
+                        stub.messages.append({key: values[0] for key, values in form.items()})
+                if failed:
+                    status, payload = 429, {"code": 20429, "message": "Too Many Requests", "status": 429}
+                else:
+                    status, payload = 201, {"sid": f"SM{number:032d}", "status": "queued",
+                                            "to": form.get("To", [""])[0], "from": form.get("From", [""])[0],
+                                            "body": form.get("Body", [""])[0]}
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
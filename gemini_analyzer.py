@@ -1,31 +1,40 @@
 """
 Gemini AI Analyzer - FREE and POWERFUL!
 """
-import google.generativeai as genai
 import json
-import os
-from datetime import datetime
 from dotenv import load_dotenv
+from ai_analyzer import FreeOpportunityAnalyzer
+from ai_engine.clients import gemini_configured, get_gemini_model
+from ai_engine.provider_pool import get_provider_pool, strip_code_fence, validate_analysis
+from monitoring.metrics import count
 
 load_dotenv()
 
 class GeminiOpportunityAnalyzer:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if api_key and api_key != "your-gemini-key-here":
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-            self.use_ai = True
-            print("✅ Gemini AI initialized!")
-        else:
-            self.use_ai = False
+    def __init__(self, use_pool: bool = True):
+        # The SDK is imported and the model built on first use, not here
+        self.use_ai = gemini_configured()
+        if not self.use_ai:
             print("⚠️ No Gemini key found, using basic analysis")
-            # Fallback to basic analyzer
-            from ai_analyzer import FreeOpportunityAnalyzer
-            self.fallback = FreeOpportunityAnalyzer()
+        # Basic analyzer used whenever no LLM answers
+        self.fallback = FreeOpportunityAnalyzer()
+        self.use_pool = use_pool
+
+    @property
+    def model(self):
+        model = get_gemini_model()
+        if model is None:
+            raise RuntimeError("Gemini is not available")
+        return model
 
     def analyze_opportunity(self, content: str) -> dict:
-        """Analyze opportunity using Gemini AI or fallback"""
+        """Analyze opportunity using the LLM provider pool, Gemini AI or fallback"""
+        
+        if self.use_pool:
+            result = get_provider_pool().analyze(content)
+            if result:
+                return result
+            return self.fallback.analyze_opportunity(content)
         
         if not self.use_ai:
             return self.fallback.analyze_opportunity(content)
@@ -36,10 +45,33 @@ class GeminiOpportunityAnalyzer:
             print(f"Gemini error: {e}, using fallback")
             return self.fallback.analyze_opportunity(content)
 
+    def request_analysis(self, content: str) -> dict:
+        """Call Gemini and return the raw parsed JSON, raising on any failure"""
+        response = self.model.generate_content(self._build_prompt(content))
+        return json.loads(strip_code_fence(response.text))
+
     def _analyze_with_gemini(self, content: str) -> dict:
         """Use Gemini AI for advanced analysis"""
         
-        prompt = f"""
+        response = self.model.generate_content(self._build_prompt(content))
+        
+        try:
+            result = json.loads(strip_code_fence(response.text))
+            
+            # Validate and clean the result
+            return self._validate_result(result)
+            
+        except json.JSONDecodeError as e:
+            count("llm_json_parse_failures_total", provider="gemini")
+            print(f"JSON parsing error: {e}")
+            print(f"Raw response: {response.text}")
+            # Fallback to basic analysis
+            return self.fallback.analyze_opportunity(content)
+
+    def _build_prompt(self, content: str) -> str:
+        """Build the extraction prompt for Gemini"""
+        
+        return f"""
 Analyze this opportunity text and extract information in JSON format:
 
 TEXT: "{content}"
@@ -73,60 +105,6 @@ Consider: urgency keywords, salary level, seniority, deadline proximity, require
 Return ONLY the JSON, no other text.
 """
 
-        response = self.model.generate_content(prompt)
-        
-        try:
-            # Clean the response and parse JSON
-            result_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith('```json'):
-                result_text = result_text[7:]
-            if result_text.startswith('```'):
-                result_text = result_text[3:]
-            if result_text.endswith('```'):
-                result_text = result_text[:-3]
-            
-            result = json.loads(result_text.strip())
-            
-            # Validate and clean the result
-            return self._validate_result(result)
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Raw response: {response.text}")
-            # Fallback to basic analysis
-            return self.fallback.analyze_opportunity(content)
-
     def _validate_result(self, result: dict) -> dict:
         """Validate and clean the AI result"""
-        
-        # Ensure required fields exist
-        validated = {
-            "title": result.get("title", "Untitled Opportunity"),
-            "category": result.get("category", "other"),
-            "deadline": result.get("deadline"),
-            "requirements": result.get("requirements", []),
-            "contact_info": result.get("contact_info", {}),
-            "priority_score": float(result.get("priority_score", 5.0)),
-            "compensation": result.get("compensation"),
-            "location": result.get("location"),
-            "summary": result.get("summary", "")
-        }
-        
-        # Validate category
-        valid_categories = ["job", "freelance", "business", "grant", "competition", "internship", "other"]
-        if validated["category"] not in valid_categories:
-            validated["category"] = "other"
-        
-        # Validate priority score
-        validated["priority_score"] = max(1.0, min(10.0, validated["priority_score"]))
-        
-        # Validate deadline format
-        if validated["deadline"]:
-            try:
-                datetime.strptime(validated["deadline"], "%Y-%m-%d")
-            except ValueError:
-                validated["deadline"] = None
-        
-        return validated
\ No newline at end of file
+        return validate_analysis(result)
@@ -0,0 +1 @@
+# Instrumentation shared by every OpportunityBot app
@@ -0,0 +1,191 @@
+"""
+Event-loop blocking detector for the async handlers
+
+A ticker task sleeps LOOP_LAG_INTERVAL_MS at a time and records how late it
+wakes up (opportunitybot_event_loop_lag_seconds). A watchdog thread notices
+when the ticker stops ticking for more than LOOP_STALL_MS, grabs the loop
+thread's stack while it is still blocked and attributes it to the request
+whose middleware frame is on that stack. When the loop comes back the stall
+is logged with route and stack and counted per handler
+(opportunitybot_event_loop_stall_seconds{handler}).
+
+Test mode - LOOP_BLOCK_BUDGET_MS=50 - raises LoopBlockedError at the end of
+any request that blocked the loop longer than the budget, so TestClient
+(raise_server_exceptions) fails the test.
+
+Off unless LOOP_LAG_MONITOR=true or a budget is set.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from monitoring.metrics import count, registry
+
+lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ticker woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+stall_seconds = registry.histogram(
+    "event_loop_stall_seconds", "Event loop stalls over LOOP_STALL_MS by handler", ("handler",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+
+class LoopBlockedError(RuntimeError):
+    """A request blocked the event loop for longer than the test budget"""
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.1, budget: Optional[float] = None):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.budget = budget
+        self.heartbeat = time.monotonic()
+        self.loop_thread: Optional[int] = None
+        self.requests: Dict[int, dict] = {}
+        self.stall: Optional[dict] = None
+        self.lock = threading.Lock()
+        self.ticker: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+
+    # Ticker / watchdog
+    async def start(self):
+        if self.ticker is None:
+            self.loop_thread = threading.get_ident()
+            self.heartbeat = time.monotonic()
+            self.ticker = asyncio.create_task(self._tick())
+        if self.watchdog is None:
+            self.watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+            self.watchdog.start()
+
+    async def stop(self):
+        if self.ticker:
+            self.ticker.cancel()
+            self.ticker = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self.lock:
+                self.heartbeat = now
+                stall, self.stall = self.stall, None
+            lag_seconds.observe(lag)
+            if stall:
+                self._report(stall, lag)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval / 2)
+            if self.ticker is None:
+                continue
+            with self.lock:
+                blocked = time.monotonic() - self.heartbeat - self.interval
+                if blocked < self.stall_threshold or self.stall is not None:
+                    continue
+                frame = sys._current_frames().get(self.loop_thread)
+                if frame is None:
+                    continue
+                # Stack of the code blocking the loop right now
+                stack = traceback.format_stack(frame)
+                request = self._find_request(frame)
+                self.stall = {"since": self.heartbeat + self.interval, "stack": stack, "request": request}
+                if request is not None:
+                    request["stalls"].append(self.stall)
+
+    def _find_request(self, frame) -> Optional[dict]:
+        while frame is not None:
+            request = self.requests.get(id(frame))
+            if request is not None and request["frame"] is frame:
+                return request
+            frame = frame.f_back
+        return None
+
+    def _report(self, stall: dict, lag: float):
+        stall["duration"] = lag
+        request = stall["request"]
+        route = f"{request['method']} {request['path']} ({request['handler']()})" if request else "outside any request"
+        handler = request["handler"]() if request else "none"
+        stall_seconds.observe(lag, handler)
+        count("event_loop_stalls_total", handler=handler)
+        print(f"🐌 Event loop blocked {lag * 1000:.0f}ms in {route}:\n{''.join(stall['stack'][-12:])}")
+
+    # Per-request tracking
+    def begin(self, frame, scope) -> dict:
+        request = {
+            "frame": frame,
+            "method": scope.get("method", ""),
+            "path": scope.get("path", ""),
+            # The endpoint is only known once routing ran
+            "handler": lambda: getattr(scope.get("endpoint"), "__name__", "unmatched"),
+            "stalls": []
+        }
+        with self.lock:
+            self.requests[id(frame)] = request
+        return request
+
+    def end(self, request: dict) -> List[float]:
+        """Drop the request; returns how long each of its stalls blocked the loop"""
+        now = time.monotonic()
+        with self.lock:
+            self.requests.pop(id(request["frame"]), None)
+        # A stall that just ended may not have been reported by the ticker yet
+        return [stall.get("duration", now - stall["since"]) for stall in request["stalls"]]
+
+
+class LoopLagMiddleware:
+    """Pure ASGI middleware registering each request so stalls can be attributed"""
+
+    def __init__(self, app, monitor: LoopLagMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = self.monitor.begin(sys._getframe(), scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            blocked = self.monitor.end(request)
+        if self.monitor.budget is not None and blocked and max(blocked) > self.monitor.budget:
+            raise LoopBlockedError(
+                f"{scope['method']} {scope['path']} ({request['handler']()}) blocked the event loop for "
+                f"{max(blocked) * 1000:.0f}ms (budget {self.monitor.budget * 1000:.0f}ms):\n"
+                f"{''.join(request['stalls'][0]['stack'][-12:])}"
+            )
+
+
+def install_loop_monitor(app, enabled: Optional[bool] = None, budget_ms: Optional[float] = None) -> Optional[LoopLagMonitor]:
+    """Start the ticker and watchdog with the app and attribute stalls to requests"""
+    if budget_ms is None and os.getenv("LOOP_BLOCK_BUDGET_MS"):
+        budget_ms = float(os.getenv("LOOP_BLOCK_BUDGET_MS"))
+    if enabled is None:
+        enabled = os.getenv("LOOP_LAG_MONITOR", "false").lower() in ("1", "true", "yes") or budget_ms is not None
+    if not enabled:
+        return None
+
+    stall_ms = float(os.getenv("LOOP_STALL_MS", "100"))
+    interval_ms = float(os.getenv("LOOP_LAG_INTERVAL_MS", "50"))
+    if budget_ms is not None:
+        # Lag undercounts a block by up to one interval, so tick finer than the budget,
+        # and catch anything over budget even if it's under the logging threshold
+        interval_ms = min(interval_ms, budget_ms / 5)
+        stall_ms = min(stall_ms, budget_ms)
+    monitor = LoopLagMonitor(
+        interval=interval_ms / 1000,
+        stall_threshold=stall_ms / 1000,
+        budget=budget_ms / 1000 if budget_ms is not None else None
+    )
+    app.add_event_handler("startup", monitor.start)
+    app.add_event_handler("shutdown", monitor.stop)
+    app.add_middleware(LoopLagMiddleware, monitor=monitor)
+    return monitor
@@ -0,0 +1,273 @@
+"""
+Lightweight per-stage metrics with a Prometheus text endpoint
+
+    from monitoring.metrics import timed, timer, count, install_metrics
+
+    @timed("extract_deadline")          # sync or async functions
+    def extract_deadline(content): ...
+
+    with timer("db_write"):
+        cursor.execute(...)
+
+    count("llm_fallbacks_total")
+    install_metrics(app)                # GET /metrics + per-handler request timing
+
+Stage timings land in one histogram, opportunitybot_stage_seconds{stage=...}.
+Everything is in-process and lock-protected; an observation costs a couple of
+microseconds. METRICS_ENABLED=false turns recording into no-ops.
+"""
+import asyncio
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+PREFIX = "opportunitybot_"
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+ENABLED = os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values: Dict[Tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labelvalues):
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labelvalues, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[Tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(labelvalues)
+            if series is None:
+                series = self.values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = [(labelvalues, list(series[0]), series[1], series[2])
+                        for labelvalues, series in sorted(self.values.items())]
+        for labelvalues, counts, total, observations in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _labels(self.labelnames + ("le",), labelvalues + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {observations}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.collectors: List[Callable[[], Dict[str, float]]] = []
+        self.lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "", labelnames: Tuple[str, ...] = ()) -> Counter:
+        name = PREFIX + name
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Counter(name, help_text or name, labelnames)
+            return self.metrics[name]
+
+    def histogram(self, name: str, help_text: str = "", labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        name = PREFIX + name
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Histogram(name, help_text or name, labelnames, buckets)
+            return self.metrics[name]
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]):
+        """collector() returns {metric_name: value} gauges read at scrape time; running totals belong in count()"""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                gauges = collector()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+                continue
+            for name, value in gauges.items():
+                if value is None:
+                    continue
+                lines.append(f"# TYPE {PREFIX}{name} gauge")
+                lines.append(f"{PREFIX}{name} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.histogram("stage_seconds", "Time spent per processing stage", ("stage",))
+request_seconds = registry.histogram("http_request_seconds", "HTTP request latency", ("method", "handler", "status"))
+stage_errors = registry.counter("stage_errors_total", "Stages that raised", ("stage",))
+
+# Counters the apps bump by name
+COUNTER_HELP = {
+    "llm_calls_total": "LLM requests by provider and outcome",
+    "llm_fallbacks_total": "Analyses that fell back to heuristics because no LLM answered",
+    "llm_json_parse_failures_total": "LLM answers that were not valid JSON",
+    "cache_hits_total": "Cache hits by cache",
+    "cache_misses_total": "Cache misses by cache",
+    "priority_rescored_total": "Opportunities whose priority moved with their deadline bucket",
+    "reminders_sent_total": "Deadline reminders delivered",
+    "reminders_failed_total": "Deadline reminders whose message was dead-lettered",
+    "reminders_dropped_total": "Deadline reminders given up on after repeated failures",
+    "outbound_sent_total": "Outbound WhatsApp messages accepted by Twilio",
+    "outbound_coalesced_total": "Notifications appended to a message already queued for the same phone",
+    "outbound_retried_total": "Outbound sends retried after a transient failure",
+    "outbound_throttled_total": "Outbound sends answered with HTTP 429",
+    "outbound_dead_letters_total": "Outbound messages given up on",
+    "facets_indexed_total": "Opportunities whose requirements and contacts were (re)indexed",
+    "compensation_parsed_total": "Opportunities whose compensation was parsed into comp_* columns",
+    "deadlines_parsed_total": "Opportunities whose deadline was parsed into deadline_at",
+    "locations_keyed_total": "Opportunities whose location was keyed into loc_* columns",
+    "load_accepted_total": "WhatsApp messages taken on for analysis, degraded ones included",
+    "load_rate_limited_total": "WhatsApp messages refused by the per-sender rate limit",
+    "load_degraded_total": "WhatsApp messages analyzed with heuristics only under load",
+    "load_deferred_total": "WhatsApp messages queued for later under load",
+    "load_deferred_processed_total": "Deferred WhatsApp messages processed",
+    "load_dropped_total": "WhatsApp messages dropped because the deferred queue was full"
+}
+
+
+def count(name: str, amount: float = 1.0, **labels):
+    """Increment a counter, e.g. count("cache_hits_total", cache="idempotency")"""
+    if not ENABLED:
+        return
+    names = tuple(sorted(labels))
+    registry.counter(name, COUNTER_HELP.get(name, ""), names).inc(amount, *(labels[n] for n in names))
+
+
+def observe(stage: str, seconds: float):
+    if ENABLED:
+        stage_seconds.observe(seconds, stage)
+
+
+@contextmanager
+def timer(stage: str):
+    """Time a block into opportunitybot_stage_seconds{stage=...}"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(1.0, stage)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage)
+
+
+def timed(stage: Optional[str] = None):
+    """Decorator form of timer(); works on sync and async functions"""
+
+    def decorate(fn):
+        name = stage or fn.__name__
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await fn(*args, **kwargs)
+                with timer(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead) timing each request by handler"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route handler name keeps the label set small (no raw paths/ids)
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            request_seconds.observe(time.perf_counter() - start, scope["method"], handler, str(status["code"]))
+
+
+def install_metrics(app, path: str = "/metrics"):
+    """Add GET /metrics (Prometheus text format) and request timing to a FastAPI app"""
+    from fastapi.responses import PlainTextResponse
+
+    @app.get(path, include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    app.add_middleware(MetricsMiddleware)
+    return app
@@ -0,0 +1,294 @@
+"""
+Slow-request sampling profiler
+
+While a request is in flight, a background thread samples Python stacks every
+PROFILE_INTERVAL_MS. Samples on the event loop thread are attributed to the
+request whose middleware frame is on the stack; worker threads running repo
+code (LLM calls, run_in_executor, sync endpoints) are attributed to every
+request in flight, under a "[thread <name>]" root; a request that is neither
+running nor has repo code running elsewhere counts as "(awaiting)".
+
+Requests slower than SLOW_REQUEST_MS are written to PROFILE_DIR as
+collapsed-stack files, keeping the newest PROFILE_KEEP:
+
+    GET /debug/profiles                              list
+    GET /debug/profiles/<name>                       collapsed stacks (flamegraph.pl, speedscope)
+    GET /debug/profiles/<name>?format=speedscope     speedscope JSON
+
+Off unless PROFILE_SLOW_REQUESTS=true.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MONITORING_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+FRAME_LABEL = re.compile(r"^(?P<name>.*) \((?P<file>.*):(?P<line>\d+)\)$")
+
+
+def _label(code) -> str:
+    path = code.co_filename
+    if path.startswith(REPO_ROOT):
+        path = os.path.relpath(path, REPO_ROOT)
+    else:
+        path = os.path.basename(path)
+    # ';' separates frames in the collapsed format
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _is_repo_frame(code) -> bool:
+    path = code.co_filename
+    return path.startswith(REPO_ROOT) and not path.startswith(MONITORING_DIR) and "site-packages" not in path
+
+
+class SamplingProfiler:
+    """One sampler thread shared by all in-flight requests"""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.active: Dict[int, dict] = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def begin(self, frame) -> int:
+        """Start collecting for the request running in frame (its middleware frame)"""
+        token = id(frame)
+        with self.lock:
+            self.active[token] = {"frame": frame, "thread": threading.get_ident(), "samples": Counter()}
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return token
+
+    def end(self, token: int) -> Counter:
+        with self.lock:
+            entry = self.active.pop(token, None)
+        return entry["samples"] if entry else Counter()
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            if not self.active:
+                self.wakeup.clear()
+                self.wakeup.wait()
+            time.sleep(self.interval)
+            with self.lock:
+                entries = list(self.active.values())
+            if entries:
+                self._sample(entries, me)
+
+    def _stack(self, frame, stop=None) -> Optional[List[str]]:
+        """Root-first labels from frame up to (excluding) stop; None if stop isn't on the stack"""
+        labels = []
+        while frame is not None:
+            if frame is stop:
+                break
+            labels.append(_label(frame.f_code))
+            frame = frame.f_back
+        else:
+            if stop is not None:
+                return None
+        labels.reverse()
+        return labels[-self.max_depth:]
+
+    def _sample(self, entries: List[dict], me: int):
+        frames = sys._current_frames()
+        request_threads = {entry["thread"] for entry in entries}
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        # Worker threads busy in our own code, on behalf of someone in flight
+        workers = []
+        for ident, frame in frames.items():
+            if ident == me or ident in request_threads:
+                continue
+            walk, busy = frame, False
+            while walk is not None:
+                if _is_repo_frame(walk.f_code):
+                    busy = True
+                    break
+                walk = walk.f_back
+            if busy:
+                root = f"[thread {names.get(ident, ident)}]"
+                workers.append(";".join([root] + self._stack(frame)))
+
+        for entry in entries:
+            stack = None
+            top = frames.get(entry["thread"])
+            if top is not None:
+                stack = self._stack(top, stop=entry["frame"])
+            if stack:
+                entry["samples"][";".join(stack)] += 1
+            elif workers:
+                for worker in workers:
+                    entry["samples"][worker] += 1
+            else:
+                entry["samples"]["(awaiting)"] += 1
+
+
+class ProfileStore:
+    """Bounded on-disk ring of collapsed-stack profiles"""
+
+    def __init__(self, directory: str, keep: int = 20):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, method: str, handler: str, duration_ms: float, samples: Counter) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+        handler = re.sub(r"[^\w-]", "_", handler)
+        name = f"{stamp}_{method}_{handler}_{int(duration_ms)}ms.collapsed"
+        with open(os.path.join(self.directory, name), "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self._trim()
+        return name
+
+    def _trim(self):
+        names = sorted(self._names())
+        for name in names[:-self.keep] if len(names) > self.keep else []:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _names(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if PROFILE_NAME.match(name)]
+
+    def list(self) -> List[dict]:
+        profiles = []
+        for name in sorted(self._names(), reverse=True):
+            stamp, method, rest = name[:-len(".collapsed")].split("_", 2)
+            handler, _, duration = rest.rpartition("_")
+            path = os.path.join(self.directory, name)
+            with open(path) as f:
+                samples = sum(int(line.rsplit(" ", 1)[1]) for line in f if line.strip())
+            profiles.append({
+                "name": name,
+                "method": method,
+                "handler": handler,
+                "duration_ms": int(duration.rstrip("ms")),
+                "samples": samples,
+                "created_at": datetime.strptime(stamp, "%Y%m%d-%H%M%S-%f").isoformat(),
+                "bytes": os.path.getsize(path)
+            })
+        return profiles
+
+    def path(self, name: str) -> Optional[str]:
+        if not PROFILE_NAME.match(name) or name not in self._names():
+            return None
+        return os.path.join(self.directory, name)
+
+
+def to_speedscope(name: str, collapsed: str, interval: float) -> dict:
+    """Convert collapsed stacks into a speedscope "sampled" profile"""
+    frames, index, samples, weights = [], {}, [], []
+    for line in collapsed.splitlines():
+        if not line.strip():
+            continue
+        stack, count = line.rsplit(" ", 1)
+        ids = []
+        for label in stack.split(";"):
+            if label not in index:
+                match = FRAME_LABEL.match(label)
+                frame = {"name": match.group("name"), "file": match.group("file"), "line": int(match.group("line"))} \
+                    if match else {"name": label}
+                index[label] = len(frames)
+                frames.append(frame)
+            ids.append(index[label])
+        samples.append(ids)
+        weights.append(int(count) * interval * 1000)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights
+        }],
+        "name": name,
+        "exporter": "opportunitybot"
+    }
+
+
+class SlowRequestMiddleware:
+    """Pure ASGI middleware: profile every request, keep the slow ones"""
+
+    def __init__(self, app, profiler: SamplingProfiler, store: ProfileStore, threshold_ms: float):
+        self.app = app
+        self.profiler = profiler
+        self.store = store
+        self.threshold_ms = threshold_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/debug/profiles"):
+            await self.app(scope, receive, send)
+            return
+
+        token = self.profiler.begin(sys._getframe())
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = self.profiler.end(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms and samples:
+                endpoint = scope.get("endpoint")
+                handler = getattr(endpoint, "__name__", scope["path"].strip("/") or "root")
+                name = self.store.save(scope["method"], handler, duration_ms, samples)
+                print(f"🐢 {scope['method']} {scope['path']} took {duration_ms:.0f}ms - profile {name}")
+
+
+def install_profiler(app, threshold_ms: Optional[float] = None, directory: Optional[str] = None,
+                     keep: Optional[int] = None, interval_ms: Optional[float] = None, enabled: Optional[bool] = None):
+    """Add the slow-request profiler and /debug/profiles to a FastAPI app"""
+    if enabled is None:
+        enabled = os.getenv("PROFILE_SLOW_REQUESTS", "false").lower() in ("1", "true", "yes")
+    if not enabled:
+        return app
+
+    from fastapi import HTTPException
+    from fastapi.responses import FileResponse, JSONResponse
+
+    interval = (interval_ms or float(os.getenv("PROFILE_INTERVAL_MS", "5"))) / 1000
+    store = ProfileStore(directory or os.getenv("PROFILE_DIR", "profiles"),
+                         keep or int(os.getenv("PROFILE_KEEP", "20")))
+    profiler = SamplingProfiler(interval)
+
+    @app.get("/debug/profiles", include_in_schema=False)
+    async def list_profiles():
+        return store.list()
+
+    @app.get("/debug/profiles/{name}", include_in_schema=False)
+    async def download_profile(name: str, format: str = "collapsed"):
+        path = store.path(name)
+        if not path:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        if format == "speedscope":
+            with open(path) as f:
+                profile = to_speedscope(name, f.read(), interval)
+            filename = name.replace(".collapsed", ".speedscope.json")
+            return JSONResponse(profile, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+        return FileResponse(path, media_type="text/plain", filename=name)
+
+    app.add_middleware(
+        SlowRequestMiddleware,
+        profiler=profiler,
+        store=store,
+        threshold_ms=threshold_ms or float(os.getenv("SLOW_REQUEST_MS", "1000"))
+    )
+    return app
@@ -0,0 +1,146 @@
+"""
+Startup warm-up and readiness gating
+
+Liveness ("is the process up") and readiness ("should it get traffic") are
+different questions. After startup the app kicks off its warm-up steps in
+the background - a synthetic analysis to compile the extractor regexes,
+LLM client construction, SQLite page-cache / connection-pool priming,
+dashboard HTML reads - and GET /ready answers 503 until every step has run:
+
+    readiness = install_readiness(app)          # next to install_metrics()
+
+    @app.on_event("startup")
+    async def startup():
+        init_db()
+        readiness.start({
+            "analysis": warm_up,                # ai_engine.pipeline
+            "database": lambda: warm_sqlite("final_opportunities.db"),
+        })
+
+Steps are best effort: one that fails is reported on /ready but doesn't
+keep the worker out of rotation - every code path it warms has a cold
+fallback. WARMUP_ENABLED=false skips the steps and reports ready at once.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, Optional
+
+from monitoring.metrics import observe, registry
+
+
+class Readiness:
+    """Warm-up progress for one app"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, dict] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, steps: Dict[str, Callable], enabled: Optional[bool] = None):
+        """Run the warm-up steps in the background; call from a startup handler"""
+        if enabled is None:
+            enabled = os.getenv("WARMUP_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.started_at = time.time()
+        if not enabled or not steps:
+            self._finish()
+            return
+        for name in steps:
+            self.steps[name] = {"status": "pending"}
+        self.task = asyncio.create_task(self._run(steps))
+
+    async def _run(self, steps: Dict[str, Callable]):
+        for name, step in steps.items():
+            self.steps[name]["status"] = "running"
+            start = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(step):
+                    await step()
+                else:
+                    # Sync steps touch disk or the network; keep the loop free for /health and /ready
+                    await asyncio.to_thread(step)
+                self.steps[name]["status"] = "ok"
+            except Exception as e:
+                self.steps[name].update(status="failed", error=str(e))
+                print(f"⚠️ Warm-up step {name} failed: {e}")
+            elapsed = time.perf_counter() - start
+            self.steps[name]["ms"] = round(elapsed * 1000, 1)
+            observe(f"warmup_{name}", elapsed)
+        self._finish()
+
+    def _finish(self):
+        self.finished_at = time.time()
+        self.ready = True
+        took = (self.finished_at - self.started_at) * 1000
+        print(f"✅ Ready to serve traffic (warm-up {took:.0f}ms)")
+
+    async def stop(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmup_ms": round((self.finished_at - self.started_at) * 1000, 1) if self.finished_at else None,
+            "steps": self.steps
+        }
+
+
+def install_readiness(app, path: str = "/ready", live_path: str = "/health") -> Readiness:
+    """Add GET /ready (503 until warmed up) and GET /health (liveness) to a FastAPI app"""
+    from fastapi.responses import JSONResponse
+
+    readiness = Readiness()
+
+    @app.get(path, include_in_schema=False)
+    async def ready():
+        return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+    @app.get(live_path, include_in_schema=False)
+    async def health():
+        return {"status": "alive"}
+
+    app.add_event_handler("shutdown", readiness.stop)
+    registry.add_collector(lambda: {"ready": 1 if readiness.ready else 0})
+    return readiness
+
+
+# Generic warm-up steps
+def warm_sqlite(db_path: str, table: str = "opportunities", rows: int = 200):
+    """Read the hot end of a table so its pages are in the OS cache before the first listing"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(f"SELECT * FROM {table} ORDER BY id DESC LIMIT ?", (rows,)).fetchall()
+        conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+    finally:
+        conn.close()
+
+
+def warm_sqlalchemy(engine, table: str = "opportunities", rows: int = 200):
+    """Open the pool's connections up front and read the hot end of a table"""
+    from sqlalchemy import inspect, text
+
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(max(1, size))]
+    try:
+        for conn in connections:
+            conn.execute(text("SELECT 1"))
+        # Tables are created by setup.py, not at startup
+        if inspect(connections[0]).has_table(table):
+            connections[0].execute(text(f"SELECT * FROM {table} ORDER BY id DESC LIMIT {int(rows)}")).fetchall()
+    finally:
+        # Back to the pool, still open
+        for conn in connections:
+            conn.close()
+
+
+def warm_files(*paths: str):
+    """Read static files once so the first FileResponse doesn't wait on the disk"""
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                while f.read(1 << 20):
+                    pass
@@ -1,13 +1,24 @@
 """
 Quick Start - Minimal OpportunityBot with Dark Dashboard
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import sqlite3
 import json
 from datetime import datetime
+from ai_engine.compensation import CompensationIndex
+from ai_engine.deadlines import MAX_UPCOMING_DAYS, DeadlineIndex
+from ai_engine.facets import FacetIndex
+from ai_engine.locations import LocationIndex
+from ai_engine.queries import OpportunitySearch, opportunity_filters
+from ai_engine.read_model import install_read_model
+from ai_engine.serialization import json_response
+from monitoring.metrics import install_metrics, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_files, warm_sqlite
 
 app = FastAPI(title="OpportunityBot")
 
@@ -19,6 +30,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
 
 def init_db():
     conn = sqlite3.connect('opportunities.db')
@@ -57,9 +72,49 @@ def init_db():
     conn.commit()
     conn.close()
 
+def row_to_opportunity(row) -> dict:
+    """API record for a SELECT * row"""
+    return {
+        "id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "category": row[3],
+        "deadline": row[4],
+        "requirements": json.loads(row[5]) if row[5] else [],
+        "contact_info": row[6],
+        "priority_score": row[7],
+        "status": row[8],
+        "compensation": row[9],
+        "location": row[10],
+        "created_at": row[11]
+    }
+
+# GET /opportunities is served from memory; writes below refresh it
+read_model = install_read_model(app, 'opportunities.db', row_to_opportunity)
+# Skill and contact lookups (ai_engine/facets.py)
+facets = FacetIndex('opportunities.db')
+# Parsed salary columns for salary filters and sorting (ai_engine/compensation.py)
+salaries = CompensationIndex('opportunities.db')
+# Parsed deadlines for GET /opportunities/upcoming (ai_engine/deadlines.py)
+deadlines = DeadlineIndex('opportunities.db', read_model)
+# Place keys for the location filter (ai_engine/locations.py)
+places = LocationIndex('opportunities.db')
+# Filtered and sorted listings (ai_engine/queries.py)
+search = OpportunitySearch('opportunities.db', read_model)
+
 @app.on_event("startup")
 async def startup():
     init_db()
+    facets.backfill()
+    salaries.backfill()
+    deadlines.backfill()
+    places.backfill()
+    search.init_schema()
+    read_model.start()
+    readiness.start({
+        "database": lambda: warm_sqlite('opportunities.db'),
+        "dashboard": lambda: warm_files("dark_table_dashboard.html")
+    })
     print("✅ OpportunityBot started!")
     print("🌐 Dashboard: http://localhost:8000")
     print("📡 API Docs: http://localhost:8000/docs")
@@ -69,31 +124,15 @@ async def dashboard():
     return FileResponse("dark_table_dashboard.html")
 
 @app.get("/opportunities")
-async def get_opportunities():
-    conn = sqlite3.connect('opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM opportunities ORDER BY priority_score DESC, created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    opportunities = []
-    for row in rows:
-        opportunities.append({
-            "id": row[0],
-            "title": row[1],
-            "content": row[2],
-            "category": row[3],
-            "deadline": row[4],
-            "requirements": json.loads(row[5]) if row[5] else [],
-            "contact_info": row[6],
-            "priority_score": row[7],
-            "status": row[8],
-            "compensation": row[9],
-            "location": row[10],
-            "created_at": row[11]
-        })
-    
-    return opportunities
+async def get_opportunities(params: dict = Depends(opportunity_filters)):
+    if params:
+        return await search.respond(params)
+    return json_response(read_model.json())
+
+@app.get("/opportunities/upcoming")
+async def get_upcoming_opportunities(days: int = Query(7, ge=0, le=MAX_UPCOMING_DAYS)):
+    """Opportunities due from today through the next N days, soonest first"""
+    return await deadlines.respond(days)
 
 @app.post("/opportunities")
 async def create_opportunity(data: dict):
@@ -115,17 +154,19 @@ async def create_opportunity(data: dict):
     elif any(word in content.lower() for word in ["freelance", "contract"]):
         category = "freelance"
     
-    conn = sqlite3.connect('opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        '''INSERT INTO opportunities 
-           (title, content, category, priority_score) 
-           VALUES (?, ?, ?, ?)''',
-        (title, content, category, priority_score)
-    )
-    conn.commit()
-    opportunity_id = cursor.lastrowid
-    conn.close()
+    with timer("db_write"):
+        conn = sqlite3.connect('opportunities.db')
+        cursor = conn.cursor()
+        cursor.execute(
+            '''INSERT INTO opportunities 
+               (title, content, category, priority_score) 
+               VALUES (?, ?, ?, ?)''',
+            (title, content, category, priority_score)
+        )
+        conn.commit()
+        opportunity_id = cursor.lastrowid
+        conn.close()
+        read_model.refresh([opportunity_id])
     
     return {
         "id": opportunity_id,
@@ -1,10 +1,17 @@
 """
 Simple starter script to test the basic system
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import sqlite3
 from datetime import datetime
+from ai_engine.queries import OpportunitySearch, opportunity_filters
+from ai_engine.read_model import by_newest, install_read_model
+from ai_engine.serialization import json_response
+from monitoring.metrics import install_metrics, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_sqlite
 
 app = FastAPI(title="OpportunityBot - Simple Version")
 
@@ -16,6 +23,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
 
 # Create simple database
 def init_db():
@@ -34,9 +45,30 @@ def init_db():
     conn.commit()
     conn.close()
 
+def row_to_opportunity(row) -> dict:
+    """API record for a SELECT * row"""
+    return {
+        "id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "category": row[3],
+        "status": row[4],
+        "created_at": row[5]
+    }
+
+# GET /opportunities is served from memory; writes below refresh it
+read_model = install_read_model(app, 'opportunities.db', row_to_opportunity, by_newest)
+# Filtered and sorted listings (ai_engine/queries.py)
+search = OpportunitySearch('opportunities.db', read_model, default_sort='newest')
+
 @app.on_event("startup")
 async def startup():
     init_db()
+    search.init_schema()
+    read_model.start()
+    readiness.start({
+        "database": lambda: warm_sqlite('opportunities.db')
+    })
     print("✅ Database initialized!")
 
 @app.get("/")
@@ -44,25 +76,10 @@ async def root():
     return {"message": "OpportunityBot is running! 🚀"}
 
 @app.get("/opportunities")
-async def get_opportunities():
-    conn = sqlite3.connect('opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM opportunities ORDER BY created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    opportunities = []
-    for row in rows:
-        opportunities.append({
-            "id": row[0],
-            "title": row[1],
-            "content": row[2],
-            "category": row[3],
-            "status": row[4],
-            "created_at": row[5]
-        })
-    
-    return opportunities
+async def get_opportunities(params: dict = Depends(opportunity_filters)):
+    if params:
+        return await search.respond(params)
+    return json_response(read_model.json())
 
 @app.post("/opportunities")
 async def create_opportunity(data: dict):
@@ -70,15 +87,17 @@ async def create_opportunity(data: dict):
     content = data.get("content", "")
     category = data.get("category", "general")
     
-    conn = sqlite3.connect('opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        'INSERT INTO opportunities (title, content, category) VALUES (?, ?, ?)',
-        (title, content, category)
-    )
-    conn.commit()
-    opportunity_id = cursor.lastrowid
-    conn.close()
+    with timer("db_write"):
+        conn = sqlite3.connect('opportunities.db')
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO opportunities (title, content, category) VALUES (?, ?, ?)',
+            (title, content, category)
+        )
+        conn.commit()
+        opportunity_id = cursor.lastrowid
+        conn.close()
+        read_model.refresh([opportunity_id])
     
     return {
         "id": opportunity_id,
@@ -2,11 +2,24 @@
 Smart OpportunityBot with AI Analysis
 No API keys needed - uses free text processing!
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 import sqlite3
 from datetime import datetime
 from ai_analyzer import FreeOpportunityAnalyzer
+from ai_engine.compensation import CompensationIndex
+from ai_engine.deadlines import MAX_UPCOMING_DAYS, DeadlineIndex
+from ai_engine.facets import FacetIndex
+from ai_engine.locations import LocationIndex
+from ai_engine.pipeline import warm_up
+from ai_engine.queries import OpportunitySearch, opportunity_filters
+from ai_engine.read_model import install_read_model
+from ai_engine.rescoring import install_rescoring
+from ai_engine.serialization import json_response
+from monitoring.metrics import install_metrics, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_sqlite
 
 app = FastAPI(title="OpportunityBot - Smart Version with AI")
 
@@ -18,6 +31,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
+rescorer = install_rescoring(app, 'smart_opportunities.db')
 
 # Initialize AI analyzer
 analyzer = FreeOpportunityAnalyzer()
@@ -45,9 +63,50 @@ def init_db():
     conn.commit()
     conn.close()
 
+def row_to_opportunity(row) -> dict:
+    """API record for a SELECT * row"""
+    return {
+        "id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "category": row[3],
+        "deadline": row[4],
+        "requirements": row[5].split('|') if row[5] else [],
+        "contact_info": row[6],
+        "priority_score": row[7],
+        "compensation": row[8],
+        "location": row[9],
+        "status": row[10],
+        "created_at": row[11]
+    }
+
+# GET /opportunities is served from memory; writes below refresh it
+read_model = install_read_model(app, 'smart_opportunities.db', row_to_opportunity)
+# Skill and contact lookups (ai_engine/facets.py)
+facets = FacetIndex('smart_opportunities.db')
+# Parsed salary columns for salary filters and sorting (ai_engine/compensation.py)
+salaries = CompensationIndex('smart_opportunities.db')
+# Parsed deadlines for GET /opportunities/upcoming (ai_engine/deadlines.py)
+deadlines = DeadlineIndex('smart_opportunities.db', read_model)
+# Place keys for the location filter (ai_engine/locations.py)
+places = LocationIndex('smart_opportunities.db')
+# Filtered and sorted listings (ai_engine/queries.py)
+search = OpportunitySearch('smart_opportunities.db', read_model)
+
 @app.on_event("startup")
 async def startup():
     init_db()
+    facets.backfill()
+    salaries.backfill()
+    deadlines.backfill()
+    places.backfill()
+    search.init_schema()
+    read_model.start()
+    rescorer.start()
+    readiness.start({
+        "analysis": warm_up,
+        "database": lambda: warm_sqlite('smart_opportunities.db')
+    })
     print("✅ Smart database initialized!")
 
 @app.get("/")
@@ -55,38 +114,23 @@ async def root():
     return {"message": "OpportunityBot Smart Version is running! 🤖🚀"}
 
 @app.get("/opportunities")
-async def get_opportunities():
-    conn = sqlite3.connect('smart_opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM opportunities ORDER BY priority_score DESC, created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    opportunities = []
-    for row in rows:
-        opportunities.append({
-            "id": row[0],
-            "title": row[1],
-            "content": row[2],
-            "category": row[3],
-            "deadline": row[4],
-            "requirements": row[5].split('|') if row[5] else [],
-            "contact_info": row[6],
-            "priority_score": row[7],
-            "compensation": row[8],
-            "location": row[9],
-            "status": row[10],
-            "created_at": row[11]
-        })
-    
-    return opportunities
+async def get_opportunities(params: dict = Depends(opportunity_filters)):
+    if params:
+        return await search.respond(params)
+    return json_response(read_model.json())
+
+@app.get("/opportunities/upcoming")
+async def get_upcoming_opportunities(days: int = Query(7, ge=0, le=MAX_UPCOMING_DAYS)):
+    """Opportunities due from today through the next N days, soonest first"""
+    return await deadlines.respond(days)
 
 @app.post("/opportunities")
 async def create_opportunity(data: dict):
     content = data.get("content", "")
     
     # 🤖 AI ANALYSIS - Extract everything automatically!
-    analysis = analyzer.analyze_opportunity(content)
+    with timer("analysis"):
+        analysis = analyzer.analyze_opportunity(content)
     
     title = analysis.get("title", "Untitled Opportunity")
     category = analysis.get("category", "general")
@@ -97,18 +141,24 @@ async def create_opportunity(data: dict):
     compensation = analysis.get("compensation")
     location = analysis.get("location")
     
-    conn = sqlite3.connect('smart_opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO opportunities 
-        (title, content, category, deadline, requirements, contact_info, 
-         priority_score, compensation, location) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (title, content, category, deadline, requirements, contact_info, 
-          priority_score, compensation, location))
-    conn.commit()
-    opportunity_id = cursor.lastrowid
-    conn.close()
+    with timer("db_write"):
+        conn = sqlite3.connect('smart_opportunities.db')
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO opportunities 
+            (title, content, category, deadline, requirements, contact_info, 
+             priority_score, compensation, location) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (title, content, category, deadline, requirements, contact_info, 
+              priority_score, compensation, location))
+        opportunity_id = cursor.lastrowid
+        facets.index(conn, opportunity_id, requirements, contact_info)
+        salaries.index(conn, opportunity_id, compensation)
+        deadlines.index(conn, opportunity_id, deadline)
+        places.index(conn, opportunity_id, location)
+        conn.commit()
+        conn.close()
+        read_model.refresh([opportunity_id])
     
     return {
         "id": opportunity_id,
@@ -142,6 +192,7 @@ async def update_status(opportunity_id: int, data: dict):
     cursor.execute('UPDATE opportunities SET status = ? WHERE id = ?', (status, opportunity_id))
     conn.commit()
     conn.close()
+    read_model.refresh([opportunity_id])
     
     return {"message": f"Status updated to: {status}"}
 
@@ -0,0 +1,34 @@
+"""Run the tests from anywhere: the app scripts and packages live at the repo root"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def twilio_stub(monkeypatch):
+    """Factory for a StubTwilioServer (same kwargs) that the real Twilio client sends to"""
+    pytest.importorskip("twilio")
+    from benchmarks.stubs import StubTwilioServer
+    from whatsapp_bot import twilio_client
+
+    stubs = []
+
+    def start(**kwargs):
+        stub = StubTwilioServer(**kwargs).start()
+        stubs.append(stub)
+        monkeypatch.setenv("TWILIO_API_BASE", stub.url)
+        # The client is built once per process, with the base URL set at the time
+        monkeypatch.setattr(twilio_client, "_client", None)
+        return stub
+
+    monkeypatch.setenv("TWILIO_ACCOUNT_SID", "ACtest")
+    monkeypatch.setenv("TWILIO_AUTH_TOKEN", "test")
+    monkeypatch.setenv("TWILIO_WHATSAPP_NUMBER", "whatsapp:+15550000000")
+    yield start
+    for stub in stubs:
+        stub.stop()
@@ -0,0 +1,104 @@
+"""
+Compensation extraction and parsing (ai_engine/pipeline.py, ai_engine/compensation.py)
+
+The extractor has to keep everything the parser understands - multipliers,
+currency words, every range separator - or the comp_* columns, salary
+filters and the high-pay bonus get the truncated amount.
+"""
+import pytest
+
+from ai_engine.compensation import annualize, is_high_pay, parse_compensation
+from ai_engine.pipeline import extract_compensation
+
+EXTRACTED = [
+    # text, extracted compensation, comp_min, comp_max, currency, comp_annual
+    ("Salary: $1.2 million per year", "Salary: $1.2 million per year", 1_200_000, 1_200_000, "USD", 1_200_000),
+    ("Seed round $1.5M", "$1.5M", 1_500_000, 1_500_000, "USD", 1_500_000),
+    ("Salary: 2.5m naira per year", "Salary: 2.5m naira per year", 2_500_000, 2_500_000, "NGN", 2_500_000),
+    ("Paying between $50,000 and $70,000", "$50,000 and $70,000", 50_000, 70_000, "USD", 70_000),
+    ("Salary: €60.000 – €75.000", "Salary: €60.000 – €75.000", 60_000, 75_000, "EUR", 75_000),
+    ("Salary: $140k-200k + equity", "Salary: $140k-200k + equity", 140_000, 200_000, "USD", 200_000),
+    ("NGN 500,000 per month for a backend role", "NGN 500,000 per month", 500_000, 500_000, "NGN", 6_000_000),
+    ("We pay 15 dollars an hour", "pay 15 dollars an hour", 15, 15, "USD", 31_200),
+    ("Salary: 400k/month", "Salary: 400k/month", 400_000, 400_000, None, 4_800_000),
+    ("Budget: $500 for the logo", "Budget: $500", 500, 500, "USD", None),
+]
+
+
+@pytest.mark.parametrize("text, extracted, comp_min, comp_max, currency, comp_annual", EXTRACTED)
+def test_extractor_keeps_what_the_parser_reads(text, extracted, comp_min, comp_max, currency, comp_annual):
+    compensation = extract_compensation(text)
+    assert compensation == extracted
+
+    pay = parse_compensation(compensation)
+    assert (pay["comp_min"], pay["comp_max"], pay["currency"], pay["comp_annual"]) == \
+        (comp_min, comp_max, currency, comp_annual)
+
+
+def test_no_compensation():
+    assert extract_compensation("Join our team, 3 years of Python experience required") is None
+
+
+PARSED = [
+    # text, comp_min, comp_max, currency, period, equity, comp_annual
+    ("$140k-200k + equity", 140_000, 200_000, "USD", None, True, 200_000),
+    ("₦350,000 monthly", 350_000, 350_000, "NGN", "month", False, 4_200_000),
+    ("KES 200k monthly", 200_000, 200_000, "KES", "month", False, 2_400_000),
+    ("$45/hour", 45, 45, "USD", "hour", False, 93_600),
+    ("$50 per day", 50, 50, "USD", "day", False, 13_000),
+    ("5k weekly", 5_000, 5_000, None, "week", False, 260_000),
+    ("€60.000 – €75.000 per year", 60_000, 75_000, "EUR", "year", False, 75_000),
+    ("1.5 million naira a year", 1_500_000, 1_500_000, "NGN", "year", False, 1_500_000),
+    ("INR 30,00,000", 3_000_000, 3_000_000, "INR", None, False, 3_000_000),
+    ("Budget: $500", 500, 500, "USD", "project", False, None),
+    ("120000 per year", 120_000, 120_000, None, "year", False, 120_000),
+    ("2 positions", None, None, None, None, False, None),
+    ("stock options", None, None, None, None, True, None),
+    ("", None, None, None, None, False, None),
+    (None, None, None, None, None, False, None),
+]
+
+
+@pytest.mark.parametrize("text, comp_min, comp_max, currency, period, equity, comp_annual", PARSED)
+def test_parse_compensation(text, comp_min, comp_max, currency, period, equity, comp_annual):
+    assert parse_compensation(text) == {"comp_min": comp_min, "comp_max": comp_max, "currency": currency,
+                                        "period": period, "equity": equity, "comp_annual": comp_annual}
+
+
+@pytest.mark.parametrize("amount, period, annual", [
+    (45, "hour", 93_600),
+    (300, "day", 78_000),
+    (1_000, "week", 52_000),
+    (5_000, "month", 60_000),
+    (90_000, "year", 90_000),
+    # An unstated period is a year, a project fee has none
+    (90_000, None, 90_000),
+    (500, "project", None),
+    (None, "month", None),
+])
+def test_annualize(amount, period, annual):
+    assert annualize(amount, period) == annual
+
+
+HIGH_PAY = [
+    # Each currency has its own bar
+    ("$100k", True),
+    ("$99,000 per year", False),
+    ("$50/hour", True),
+    ("CAD 120,000", False),
+    ("CAD 130,000", True),
+    ("£80,000", True),
+    ("€85,000", False),
+    ("₦2,500,000 monthly", True),
+    ("₦350,000 monthly", False),
+    ("INR 30,00,000", True),
+    # No bar for currencies without one, or an unknown currency, or a project fee
+    ("KES 20,000,000", False),
+    ("Salary: 400k/month", False),
+    ("Budget: $500,000", False),
+]
+
+
+@pytest.mark.parametrize("text, expected", HIGH_PAY)
+def test_is_high_pay(text, expected):
+    assert is_high_pay(parse_compensation(text)) is expected
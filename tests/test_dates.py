@@ -0,0 +1,64 @@
+"""
+Deadline date parsing (ai_engine/dates.py), against a fixed reference day
+"""
+from datetime import date, datetime
+
+import pytest
+
+from ai_engine.dates import parse_day, parse_iso
+
+# A Wednesday
+REFERENCE = date(2025, 1, 15)
+
+FORMS = [
+    ("Apply by 25th Jan", date(2025, 1, 25)),
+    ("25th Jan 2024", date(2024, 1, 25)),
+    # No year: the next one on or after the reference day
+    ("Jan 10", date(2026, 1, 10)),
+    ("15.02.2025", date(2025, 2, 15)),
+    ("in 2 weeks", date(2025, 1, 29)),
+    ("within a week", date(2025, 1, 22)),
+    ("tomorrow", date(2025, 1, 16)),
+    ("end of month", date(2025, 1, 31)),
+    ("EOW", date(2025, 1, 17)),
+    # The weekday is only a prefix; the date decides
+    ("Friday, March 6th", date(2025, 3, 6)),
+    ("Friday, March 6th, 2026", date(2026, 3, 6)),
+    ("2025-02-15T17:00:00Z", date(2025, 2, 15)),
+    ("2025-02-15T17:00:00+01:00", date(2025, 2, 15)),
+    ("Deadline: 2025/02/15", date(2025, 2, 15)),
+    ("friday", date(2025, 1, 17)),
+    ("next friday", date(2025, 1, 17)),
+    ("no date in here", None),
+]
+
+AMBIGUOUS = [
+    # Slashes and dashes are month first ...
+    ("02/03/2025", date(2025, 2, 3)),
+    ("2-15-25", date(2025, 2, 15)),
+    # ... unless the first number can't be a month
+    ("13/02/2025", date(2025, 2, 13)),
+    # Dots are day first
+    ("02.03.2025", date(2025, 3, 2)),
+]
+
+
+@pytest.mark.parametrize("text, expected", FORMS + AMBIGUOUS)
+def test_parse_day(text, expected):
+    assert parse_day(text, reference=REFERENCE) == expected
+
+
+def test_parse_iso_formats_the_day():
+    assert parse_iso("Apply by 25th Jan", reference=REFERENCE) == "2025-01-25"
+    assert parse_iso("whenever", reference=REFERENCE) is None
+
+
+def test_weekday_on_the_reference_day():
+    friday = date(2025, 1, 17)
+    # A bare weekday may be today, "next" is always after it
+    assert parse_day("friday", reference=friday) == friday
+    assert parse_day("next friday", reference=friday) == date(2025, 1, 24)
+
+
+def test_reference_may_be_a_datetime():
+    assert parse_day("in 3 days", reference=datetime(2025, 1, 15, 23, 30)) == date(2025, 1, 18)
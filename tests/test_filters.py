@@ -0,0 +1,45 @@
+"""
+GET /opportunities parameter validation (ai_engine/queries.py)
+
+Every bad parameter - unknown, malformed or out of range - is the same 400
+naming it, in every app.
+"""
+import pytest
+
+from tests.test_query_plans import APPS
+
+BAD = [
+    ({"bogus": "1"}, "bogus"),
+    ({"status": "new", "bogus": "1"}, "bogus"),
+    ({"min_priority": "high"}, "min_priority"),
+    ({"deadline_from": "next week"}, "deadline_from"),
+    ({"limit": "ten"}, "limit"),
+    ({"limit": "0"}, "limit"),
+    ({"sort": "random"}, "sort"),
+]
+
+
+@pytest.mark.parametrize("name", sorted(APPS))
+def test_bad_parameters_are_400(name, tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from benchmarks.harness import load_app_module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("WARMUP_ENABLED", "false")
+    monkeypatch.setenv("AGGREGATION_WINDOW_SECONDS", "0")
+    monkeypatch.setenv("PREFILTER_AUDIT_LOG", str(tmp_path / "prefilter_audit.log"))
+    monkeypatch.setenv("OUTBOUND_DRAIN_SECONDS", "0")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    app = load_app_module(name)
+    if app is None:
+        pytest.skip(f"{name} dependencies are not installed")
+
+    with TestClient(app.app) as client:
+        for params, parameter in BAD:
+            response = client.get("/opportunities", params=params)
+            assert response.status_code == 400, (params, response.text)
+            assert parameter in response.json()["detail"]
+        assert client.get("/opportunities", params={"sort": "newest", "limit": "5"}).status_code == 200
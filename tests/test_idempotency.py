@@ -0,0 +1,162 @@
+"""
+Webhook idempotency on Twilio's MessageSid (whatsapp_bot/idempotency.py)
+
+The store tests run against both the raw-sqlite and the SQLAlchemy claim
+table; the app test checks that a retried webhook replays the reply
+without a second analysis.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from whatsapp_bot.idempotency import EMPTY_TWIML, SQLAlchemyIdempotencyStore, SQLiteIdempotencyStore
+
+REPLY = '<?xml version="1.0" encoding="UTF-8"?><Response><Message>✅ Saved #1</Message></Response>'
+
+
+def _sqlite_store(db_path, **kwargs):
+    store = SQLiteIdempotencyStore(str(db_path), **kwargs)
+    store.init_table()
+    return store
+
+
+def _sqlalchemy_store(db_path, **kwargs):
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    return SQLAlchemyIdempotencyStore(sessionmaker(bind=engine), **kwargs)
+
+
+@pytest.fixture(params=["sqlite", "sqlalchemy"])
+def make_store(request, tmp_path):
+    """Factory for stores (workers) sharing one claim table"""
+    build = _sqlite_store if request.param == "sqlite" else _sqlalchemy_store
+    db_path = tmp_path / "idempotency.db"
+    return lambda **kwargs: build(db_path, **kwargs)
+
+
+def _abandon_claims(db_path):
+    """Age every claim past any timeout, as if its worker died long ago"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE processed_messages SET created_at = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+
+
+def test_retry_replays_the_first_reply(make_store):
+    async def scenario():
+        store = make_store()
+        assert await store.begin("SM1") is None
+        await store.complete("SM1", REPLY)
+        # Same worker (recent set) and another worker (claim table)
+        return await store.begin("SM1"), await make_store().begin("SM1")
+
+    assert asyncio.run(scenario()) == (REPLY, REPLY)
+
+
+def test_duplicate_waits_for_the_request_in_flight(make_store):
+    async def scenario():
+        store = make_store()
+        assert await store.begin("SM1") is None
+        duplicate = asyncio.create_task(store.begin("SM1"))
+        await asyncio.sleep(0.05)
+        assert not duplicate.done()
+        # Another worker can't wait on this one's event; it replays the in-progress claim as empty TwiML
+        elsewhere = await make_store().begin("SM1")
+        await store.complete("SM1", REPLY)
+        return await duplicate, elsewhere
+
+    assert asyncio.run(scenario()) == (REPLY, EMPTY_TWIML)
+
+
+def test_release_lets_the_retry_through(make_store):
+    async def scenario():
+        store = make_store()
+        assert await store.begin("SM1") is None
+        await store.release("SM1")
+        return await make_store().begin("SM1")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_recent_set_is_bounded(make_store):
+    async def scenario():
+        store = make_store(max_recent=3)
+        for i in range(5):
+            sid = f"SM{i}"
+            assert await store.begin(sid) is None
+            await store.complete(sid, f"reply {i}")
+        # The oldest fell out of memory but is still replayed from the table
+        return list(store.recent), await store.begin("SM0")
+
+    recent, replay = asyncio.run(scenario())
+    assert recent == ["SM2", "SM3", "SM4"]
+    assert replay == "reply 0"
+
+
+def test_abandoned_claim_is_taken_over(make_store, tmp_path):
+    async def scenario():
+        # The first worker claims the sid and dies before storing a reply
+        assert await make_store().begin("SM1") is None
+        # Built up front: a new SQLite store purges claims past the retention period
+        store, later = make_store(), make_store()
+        in_progress = await store.begin("SM1")
+        _abandon_claims(tmp_path / "idempotency.db")
+        taken = await store.begin("SM1")
+        await store.complete("SM1", REPLY)
+        return in_progress, taken, await later.begin("SM1")
+
+    assert asyncio.run(scenario()) == (EMPTY_TWIML, None, REPLY)
+
+
+def test_completed_claim_never_expires(make_store, tmp_path):
+    async def scenario():
+        store, other = make_store(), make_store()
+        assert await store.begin("SM1") is None
+        await store.complete("SM1", REPLY)
+        _abandon_claims(tmp_path / "idempotency.db")
+        return await other.begin("SM1")
+
+    assert asyncio.run(scenario()) == REPLY
+
+
+def test_webhook_retry_does_not_analyze_again(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from benchmarks.harness import load_app_module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AGGREGATION_WINDOW_SECONDS", "0")
+    monkeypatch.setenv("PREFILTER_AUDIT_LOG", str(tmp_path / "prefilter_audit.log"))
+    monkeypatch.setenv("OUTBOUND_DRAIN_SECONDS", "0")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    app = load_app_module("whatsapp_bot")
+    if app is None:
+        pytest.skip("whatsapp_bot dependencies are not installed")
+    app.outbound.transport = lambda from_, to, body: "SM0"
+
+    analyzed = []
+    analyze = app.analyze_opportunity
+
+    def counted(content, *args, **kwargs):
+        analyzed.append(content)
+        return analyze(content, *args, **kwargs)
+
+    monkeypatch.setattr(app, "analyze_opportunity", counted)
+    form = {"MessageSid": "SM00000000000000000000000000000001", "From": "whatsapp:+15551234567",
+            "Body": "Hiring a Python developer in Lagos. Salary: $90k. Apply by 2026-12-15 at jobs@example.com"}
+    with TestClient(app.app) as client:
+        first = client.post("/whatsapp", data=form)
+        retry = client.post("/whatsapp", data=form)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.text == first.text
+    assert len(analyzed) == 1
+    conn = sqlite3.connect(tmp_path / "whatsapp_opportunities.db")
+    assert conn.execute("SELECT COUNT(*) FROM opportunities").fetchone()[0] == 1
+    conn.close()
@@ -0,0 +1,34 @@
+"""
+Load shedder metrics (whatsapp_bot/rate_limit.py)
+
+Running totals go out as Prometheus counters, current load as gauges.
+"""
+from monitoring.metrics import PREFIX, Registry, registry
+from whatsapp_bot.rate_limit import LoadShedder
+
+
+def _total(name: str) -> float:
+    counter = registry.metrics.get(PREFIX + name)
+    return counter.values.get((), 0.0) if counter else 0.0
+
+
+def test_totals_are_counters_and_load_is_a_gauge():
+    shedder = LoadShedder(degrade_watermark=1, defer_watermark=2)
+    collectors = Registry()
+    collectors.add_collector(lambda: {f"load_{k}": v for k, v in shedder.gauges().items()})
+    before = _total("load_degraded_total")
+
+    with shedder.track():
+        shedder.count("degraded")
+        shedder.count("accepted")
+        gauges = collectors.render()
+        level = shedder.metrics()["level"]
+
+    text = registry.render()
+    assert f"# TYPE {PREFIX}load_degraded_total counter" in text
+    assert f"# HELP {PREFIX}load_accepted_total WhatsApp messages taken on" in text
+    assert _total("load_degraded_total") == before + 1
+    assert f"# TYPE {PREFIX}load_in_flight gauge\n{PREFIX}load_in_flight 1" in gauges
+    assert "load_degraded" not in gauges
+    # /metrics/load still has the lot
+    assert level == "degrade" and shedder.metrics()["degraded"] == 1
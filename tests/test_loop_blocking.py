@@ -0,0 +1,122 @@
+"""
+Event-loop blocking budget (monitoring/loop_lag.py)
+
+With LOOP_BLOCK_BUDGET_MS set, a request that blocks the event loop longer
+than the budget raises LoopBlockedError and TestClient fails the test. The
+LLM pool is a stub that takes well over the budget, so an analysis that
+runs on the loop instead of a worker thread is caught here, not in
+production.
+"""
+import time
+
+import pytest
+
+from tests.test_query_plans import APPS
+
+# Well under the stub LLM latency, with headroom for a synchronous SQLite write that waits
+# on a startup job (re-scoring, backfills) holding the write lock
+BUDGET_MS = "100"
+LLM_LATENCY = "constant:0.3"
+POST = ("Hiring a Senior Python Developer in Lagos, Nigeria. Salary: $120k per year. "
+        "Requirements: Django, PostgreSQL. Apply by 2026-12-15 at jobs@example.com")
+
+
+@pytest.fixture
+def budget(tmp_path, monkeypatch):
+    """Budget on, stub LLM pool, no outside calls; the apps are loaded afterwards so they pick it all up"""
+    pytest.importorskip("fastapi")
+    from ai_engine import provider_pool
+    from benchmarks.stubs import StubLLMProvider
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LOOP_BLOCK_BUDGET_MS", BUDGET_MS)
+    monkeypatch.setenv("AGGREGATION_WINDOW_SECONDS", "0")
+    monkeypatch.setenv("PREFILTER_AUDIT_LOG", str(tmp_path / "prefilter_audit.log"))
+    monkeypatch.setenv("OUTBOUND_DRAIN_SECONDS", "0")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(provider_pool, "_pool", provider_pool.ProviderPool([StubLLMProvider(latency=LLM_LATENCY)]))
+
+
+def _load(name):
+    from benchmarks.harness import load_app_module
+
+    app = load_app_module(name)
+    if app is None:
+        pytest.skip(f"{name} dependencies are not installed")
+    return app
+
+
+def _wait_ready(client, timeout: float = 15.0):
+    """The warm-up thread competes for the GIL; measure the handlers once it's done"""
+    deadline = time.monotonic() + timeout
+    while client.get("/ready").status_code != 200:
+        assert time.monotonic() < deadline, "app never became ready"
+        time.sleep(0.05)
+
+
+def test_budget_catches_a_blocking_handler(budget):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from monitoring.loop_lag import LoopBlockedError, install_loop_monitor
+
+    app = FastAPI()
+    install_loop_monitor(app)
+
+    @app.get("/blocking")
+    async def blocking():
+        time.sleep(0.3)
+        return {}
+
+    with TestClient(app) as client:
+        with pytest.raises(LoopBlockedError):
+            client.get("/blocking")
+
+
+@pytest.mark.parametrize("name", sorted(APPS))
+def test_create_and_list_stay_under_budget(name, budget):
+    from fastapi.testclient import TestClient
+
+    app = _load(name)
+    with TestClient(app.app) as client:
+        _wait_ready(client)
+        created = client.post("/opportunities", json={"content": POST})
+        assert created.status_code == 200 and "error" not in created.json(), created.text
+        assert client.get("/opportunities").status_code == 200
+        assert client.get("/opportunities", params={"category": "job", "sort": "newest"}).status_code == 200
+
+
+def test_whatsapp_webhook_stays_under_budget(budget):
+    from fastapi.testclient import TestClient
+
+    app = _load("whatsapp_bot")
+    # Confirmations go to a stand-in instead of Twilio
+    app.outbound.transport = lambda from_, to, body: "SM0"
+    with TestClient(app.app) as client:
+        _wait_ready(client)
+        for i, body in enumerate((POST, "thanks!", POST.replace("Lagos", "Accra"))):
+            form = {"MessageSid": f"SM{i:032d}", "From": "whatsapp:+15551234567", "Body": body}
+            assert client.post("/whatsapp", data=form).status_code == 200
+
+
+def test_prefilter_audit_stays_under_budget(budget, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    app = _load("whatsapp_bot")
+    audited = []
+    audit = app.prefilter.audit
+
+    def slow_audit(*args):
+        # A slow disk or a contended audit lock
+        time.sleep(0.3)
+        audited.append(args)
+        return audit(*args)
+
+    monkeypatch.setattr(app.prefilter, "audit", slow_audit)
+    with TestClient(app.app) as client:
+        _wait_ready(client)
+        form = {"MessageSid": "SM" + "9" * 32, "From": "whatsapp:+15551234567",
+                "Body": "lol did anyone watch the match last night"}
+        assert client.post("/whatsapp", data=form).status_code == 200
+    assert len(audited) == 1
@@ -0,0 +1,117 @@
+"""
+OutboundMessenger (whatsapp_bot/outbound.py): retries and shutdown
+
+Every send() future has to resolve - with a SID, or None once the message is
+in the dead-letter log - including across a restart.
+"""
+import asyncio
+import json
+import time
+
+from whatsapp_bot.outbound import OutboundMessenger
+
+SENDER = "whatsapp:+15550000000"
+PHONE = "whatsapp:+15551234567"
+
+
+class TransientError(Exception):
+    """What a 503 from Twilio looks like to classify_error"""
+    status = 503
+
+
+def _dead_letters(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_stop_dead_letters_messages_waiting_to_retry(tmp_path):
+    dead_letters = tmp_path / "dead_letters.log"
+
+    def failing(from_, to, body):
+        raise TransientError("Service Unavailable")
+
+    async def scenario():
+        messenger = OutboundMessenger(send=failing, retry_delay=10, dead_letter_path=str(dead_letters))
+        future = messenger.send(PHONE, "✅ Opportunity #1 saved", from_=SENDER)
+        # Let the first attempt fail and go into its 10s backoff
+        while not messenger.retries:
+            await asyncio.sleep(0.01)
+        await messenger.stop(drain_timeout=0.5)
+        return future
+
+    future = asyncio.run(scenario())
+    assert future.done() and future.result() is None
+    [entry] = _dead_letters(dead_letters)
+    assert entry["reason"] == "shutdown"
+    assert entry["to"] == PHONE and entry["attempts"] == 1
+
+
+def test_stop_dead_letters_a_delivery_in_progress(tmp_path):
+    dead_letters = tmp_path / "dead_letters.log"
+    sending = asyncio.Event()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+
+        def slow(from_, to, body):
+            loop.call_soon_threadsafe(sending.set)
+            time.sleep(0.5)
+            return "SM1"
+
+        messenger = OutboundMessenger(send=slow, dead_letter_path=str(dead_letters))
+        future = messenger.send(PHONE, "✅ Opportunity #1 saved", from_=SENDER)
+        await sending.wait()
+        await messenger.stop(drain_timeout=0)
+        return future
+
+    future = asyncio.run(scenario())
+    assert future.done() and future.result() is None
+    assert [entry["reason"] for entry in _dead_letters(dead_letters)] == ["shutdown"]
+
+
+def test_transient_failure_is_retried(tmp_path):
+    attempts = []
+
+    def flaky(from_, to, body):
+        attempts.append(body)
+        if len(attempts) == 1:
+            raise TransientError("Service Unavailable")
+        return "SM2"
+
+    async def scenario():
+        messenger = OutboundMessenger(send=flaky, retry_delay=0.01, dead_letter_path=str(tmp_path / "dead.log"))
+        sid = await messenger.send(PHONE, "✅ Opportunity #2 saved", from_=SENDER)
+        await messenger.stop()
+        return sid
+
+    assert asyncio.run(scenario()) == "SM2"
+    assert len(attempts) == 2
+    assert not (tmp_path / "dead.log").exists()
+
+
+def test_delivers_through_twilio(tmp_path, twilio_stub):
+    stub = twilio_stub()
+
+    async def scenario():
+        messenger = OutboundMessenger(dead_letter_path=str(tmp_path / "dead.log"))
+        sid = await messenger.send(PHONE, "✅ Opportunity #3 saved")
+        await messenger.stop()
+        return sid
+
+    assert asyncio.run(scenario()).startswith("SM")
+    assert stub.messages == [{"From": SENDER, "To": PHONE, "Body": "✅ Opportunity #3 saved"}]
+
+
+def test_throttled_send_is_retried_after_a_backoff(tmp_path, twilio_stub):
+    # One message per second per sender: the second send gets a 429 and goes out after the backoff
+    stub = twilio_stub(sender_mps=1.0)
+
+    async def scenario():
+        messenger = OutboundMessenger(sends_per_second=100, retry_delay=0.5, dead_letter_path=str(tmp_path / "dead.log"))
+        sids = await asyncio.gather(messenger.send(PHONE, "first"), messenger.send("whatsapp:+15557654321", "second"))
+        await messenger.stop()
+        return sids
+
+    assert all(asyncio.run(scenario()))
+    assert stub.throttled >= 1
+    assert sorted(message["Body"] for message in stub.messages) == ["first", "second"]
+    assert not (tmp_path / "dead.log").exists()
@@ -0,0 +1,86 @@
+"""
+EXPLAIN QUERY PLAN checks for GET /opportunities filters (ai_engine/queries.py)
+
+Every filter an app supports, under every sort, must be served by an index;
+a table scan fails the test with the offending query plan.
+"""
+import sqlite3
+
+import pytest
+
+from ai_engine.queries import check_backend_plans, check_plans
+
+# app script -> its database, as each one's init_db() names it
+APPS = {
+    "final_bot": "final_opportunities.db",
+    "whatsapp_bot": "whatsapp_opportunities.db",
+    "working_gemini": "working_opportunities.db",
+    "gemini_start": "gemini_opportunities.db",
+    "smart_start": "smart_opportunities.db",
+    "quick_start": "opportunities.db",
+    "simple_start": "opportunities.db",
+}
+# Schema steps of the apps' startup handlers, in order, for whichever an app has
+SCHEMA_STEPS = ("facets", "salaries", "deadlines", "places")
+
+
+def _report(failures) -> str:
+    return "\n".join(f"{filters}: {plan}" for filters, plan in failures)
+
+
+@pytest.mark.parametrize("name", sorted(APPS))
+def test_app_filters_use_indexes(name, tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from benchmarks.harness import load_app_module
+
+    # The apps open their database relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    app = load_app_module(name)
+    if app is None:
+        pytest.skip(f"{name} dependencies are not installed")
+
+    app.init_db()
+    for step in SCHEMA_STEPS:
+        if hasattr(app, step):
+            getattr(app, step).backfill()
+    app.search.init_schema()
+
+    conn = sqlite3.connect(tmp_path / APPS[name])
+    try:
+        failures = check_plans(conn)
+    finally:
+        conn.close()
+    assert failures == [], _report(failures)
+
+
+def test_backend_filters_use_indexes():
+    pytest.importorskip("sqlalchemy")
+
+    failures = check_backend_plans()
+    assert failures == [], _report(failures)
+
+
+def test_backend_indexes_are_added_to_an_existing_table(tmp_path):
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+
+    from backend.database.connection import create_indexes
+    from backend.models.opportunity import Opportunity
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'opportunities.db'}")
+    assert create_indexes(Opportunity, bind=engine) is False
+    # A table from before the model had its filter indexes
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE opportunities (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, "
+                             "content TEXT NOT NULL, category VARCHAR(100), deadline DATETIME, requirements JSON, "
+                             "contact_info JSON, priority_score FLOAT, status VARCHAR(50), source VARCHAR(50), "
+                             "created_at DATETIME, updated_at DATETIME)")
+
+    # Twice: the second run finds them all there
+    assert create_indexes(Opportunity, bind=engine) is True
+    assert create_indexes(Opportunity, bind=engine) is True
+    with engine.connect() as conn:
+        names = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(opportunities)")}
+    assert {index.name for index in Opportunity.__table__.indexes} <= names
@@ -0,0 +1,152 @@
+"""
+Deadline reminders (whatsapp_bot/reminders.py)
+
+Sends go through the outbound messenger and the real Twilio client to the
+local StubTwilioServer.
+"""
+import asyncio
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from whatsapp_bot.outbound import OutboundMessenger
+from whatsapp_bot.reminders import ReminderScheduler
+
+PHONE = "whatsapp:+15551234567"
+OTHER_PHONE = "whatsapp:+15557654321"
+
+
+def _opportunities(db_path, rows):
+    """Minimal opportunities table: (title, days until the deadline, phone_number)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL, deadline TEXT, status TEXT DEFAULT 'new', phone_number TEXT
+        )
+    ''')
+    conn.executemany("INSERT INTO opportunities (title, deadline, phone_number) VALUES (?, ?, ?)",
+                     [(title, (date.today() + timedelta(days=days)).isoformat(), phone) for title, days, phone in rows])
+    conn.commit()
+    conn.close()
+
+
+def _execute(db_path, sql, *params):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def _scheduler(db_path, tmp_path):
+    scheduler = ReminderScheduler(db_path, OutboundMessenger(dead_letter_path=str(tmp_path / "dead.log")),
+                                  lead_days=[3, 1], hour=9)
+    scheduler.store.init_table()
+    return scheduler
+
+
+async def _run_until(scheduler, done, timeout: float = 5.0):
+    scheduler.start()
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    await scheduler.stop()
+    await scheduler.outbound.stop()
+
+
+def test_due_reminders_are_sent_one_message_per_phone(tmp_path, twilio_stub):
+    stub = twilio_stub()
+    db_path = str(tmp_path / "whatsapp_opportunities.db")
+    _opportunities(db_path, [("Backend role", 10, PHONE), ("Design grant", 20, PHONE), ("Hackathon", 10, OTHER_PHONE)])
+    scheduler = _scheduler(db_path, tmp_path)
+    assert scheduler.store.sync(scheduler.lead_days, scheduler.hour) == 6
+    # The 3-day reminders are due
+    _execute(db_path, "UPDATE reminders SET fire_at = ? WHERE lead_days = 3", time.time())
+
+    asyncio.run(_run_until(scheduler, lambda: scheduler.sent == 3))
+    assert scheduler.sent == 3
+    bodies = {message["To"]: message["Body"] for message in stub.messages}
+    assert len(stub.messages) == 2
+    assert "2 deadlines coming up" in bodies[PHONE]
+    assert "#1 Backend role" in bodies[PHONE] and "#2 Design grant" in bodies[PHONE]
+    assert "#3 Hackathon" in bodies[OTHER_PHONE]
+    assert _execute(db_path, "SELECT status, COUNT(*) FROM reminders GROUP BY status ORDER BY status") == \
+        [("pending", 3), ("sent", 3)]
+
+
+def test_deadline_edit_replaces_the_reminders(tmp_path):
+    db_path = str(tmp_path / "whatsapp_opportunities.db")
+    _opportunities(db_path, [("Backend role", 10, PHONE), ("Design grant", 20, PHONE)])
+    scheduler = _scheduler(db_path, tmp_path)
+    scheduler.store.sync(scheduler.lead_days, scheduler.hour)
+    before = _execute(db_path, "SELECT opportunity_id, lead_days, fire_at FROM reminders ORDER BY opportunity_id, lead_days")
+
+    # A moved deadline is re-synced; a status change isn't
+    _execute(db_path, "UPDATE opportunities SET deadline = ? WHERE id = 1",
+             (date.today() + timedelta(days=30)).isoformat())
+    _execute(db_path, "UPDATE opportunities SET status = 'reviewed' WHERE id = 2")
+    assert scheduler.store.sync(scheduler.lead_days, scheduler.hour) == 2
+    after = _execute(db_path, "SELECT opportunity_id, lead_days, fire_at FROM reminders ORDER BY opportunity_id, lead_days")
+    assert after[2:] == before[2:]
+    assert [(row[0], row[1]) for row in after[:2]] == [(1, 1), (1, 3)]
+    assert all(new[2] - old[2] == 20 * 86400 for new, old in zip(after[:2], before[:2]))
+
+    # So are a new phone and a removed deadline
+    _execute(db_path, "UPDATE opportunities SET phone_number = ? WHERE id = 2", OTHER_PHONE)
+    _execute(db_path, "UPDATE opportunities SET deadline = NULL WHERE id = 1")
+    scheduler.store.sync(scheduler.lead_days, scheduler.hour)
+    assert _execute(db_path, "SELECT DISTINCT opportunity_id, phone_number FROM reminders") == [(2, OTHER_PHONE)]
+    assert _execute(db_path, "SELECT COUNT(*) FROM reminder_resync") == [(0,)]
+
+
+def test_reminder_for_a_moved_deadline_is_not_sent(tmp_path, twilio_stub):
+    stub = twilio_stub()
+    db_path = str(tmp_path / "whatsapp_opportunities.db")
+    _opportunities(db_path, [("Backend role", 10, PHONE)])
+    scheduler = _scheduler(db_path, tmp_path)
+    scheduler.store.sync(scheduler.lead_days, scheduler.hour)
+    _execute(db_path, "UPDATE reminders SET fire_at = ? WHERE lead_days = 3", time.time() + 0.5)
+
+    async def scenario():
+        scheduler.start()
+        # The reminder is in the heap when the deadline moves, with no notify()
+        while not scheduler.heap:
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(_execute, db_path, "UPDATE opportunities SET deadline = ? WHERE id = 1",
+                                (date.today() + timedelta(days=30)).isoformat())
+        await asyncio.sleep(1.0)
+        await scheduler.stop()
+        await scheduler.outbound.stop()
+
+    asyncio.run(scenario())
+    assert stub.messages == []
+    fire_at = [row[0] for row in _execute(db_path, "SELECT fire_at FROM reminders WHERE status = 'pending'")]
+    assert len(fire_at) == 2 and min(fire_at) > time.time() + 20 * 86400
+
+
+def test_failing_refill_backs_off_instead_of_ending_the_task(tmp_path):
+    # No opportunities table yet: every sync fails with "no such table"
+    db_path = str(tmp_path / "empty.db")
+    syncs = []
+
+    async def scenario():
+        scheduler = ReminderScheduler(db_path, OutboundMessenger(send=lambda *args: "SM1"), retry_delay=60)
+        sync = scheduler.store.sync
+
+        def counted(*args):
+            syncs.append(args)
+            return sync(*args)
+
+        scheduler.store.sync = counted
+        scheduler.start()
+        task = scheduler.task
+        await asyncio.sleep(0.3)
+        alive = not task.done()
+        await scheduler.stop()
+        return alive, scheduler.loaded_until
+
+    alive, loaded_until = asyncio.run(scenario())
+    assert alive
+    assert len(syncs) == 1
+    assert loaded_until > 0
@@ -1,22 +1,38 @@
 """
 WhatsApp OpportunityBot - Complete Integration
 """
-from fastapi import FastAPI, Request, Form
+from fastapi import FastAPI, Depends, Query, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
 from twilio.twiml.messaging_response import MessagingResponse
-from twilio.rest import Client
 import sqlite3
+import asyncio
 from datetime import datetime
 import os
 import re
 from dotenv import load_dotenv
-
-# Try Gemini import
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from ai_engine.compensation import CompensationIndex
+from ai_engine.deadlines import MAX_UPCOMING_DAYS, DeadlineIndex
+from ai_engine.facets import FacetIndex
+from ai_engine.locations import LocationIndex
+from ai_engine.pipeline import CONFIRMATION_FIELDS, WARMUP_SAMPLE, Analysis, analyze_content, warm_up
+from ai_engine.prefilter import get_prefilter
+from ai_engine.provider_pool import get_provider_pool
+from ai_engine.queries import OpportunitySearch, opportunity_filters
+from ai_engine.read_model import install_read_model
+from ai_engine.rescoring import install_rescoring
+from ai_engine.serialization import json_response
+from whatsapp_bot.aggregator import MessageAggregator
+from whatsapp_bot.idempotency import SQLiteIdempotencyStore
+from whatsapp_bot.outbound import get_outbound
+from whatsapp_bot.reminders import install_reminders
+from monitoring.metrics import install_metrics, registry, timed, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_sqlite
+from whatsapp_bot.rate_limit import (
+    DEFER, DEFERRED_MESSAGE, DEGRADE, DROPPED_MESSAGE, NORMAL, RATE_LIMITED_MESSAGE,
+    LoadShedder, SenderRateLimiter
+)
 
 load_dotenv()
 
@@ -29,24 +45,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
+rescorer = install_rescoring(app, 'whatsapp_opportunities.db')
+# Confirmations and reminders share one paced, retrying send queue
+outbound = get_outbound()
+reminders = install_reminders(app, 'whatsapp_opportunities.db', outbound)
 
-# Initialize Twilio
-twilio_client = Client(
-    os.getenv("TWILIO_ACCOUNT_SID"),
-    os.getenv("TWILIO_AUTH_TOKEN")
-)
+# Gemini / OpenAI behind one load-balanced pool
+llm_pool = get_provider_pool()
+if llm_pool.providers:
+    print(f"✅ LLM providers ready for WhatsApp: {', '.join(llm_pool.provider_names())}")
 
-# Initialize Gemini
-gemini_model = None
-if GEMINI_AVAILABLE:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key and api_key != "your-gemini-key-here":
-        try:
-            genai.configure(api_key=api_key)
-            gemini_model = genai.GenerativeModel('gemini-pro')
-            print("✅ Gemini AI ready for WhatsApp!")
-        except:
-            print("⚠️ Gemini setup failed")
+# Cheap triage so chatter never reaches the LLM or the database
+prefilter = get_prefilter()
 
 def init_db():
     conn = sqlite3.connect('whatsapp_opportunities.db')
@@ -73,128 +87,133 @@ def init_db():
     conn.commit()
     conn.close()
 
-def analyze_opportunity(content: str) -> dict:
-    """Analyze opportunity with Gemini or fallback"""
-    
-    if gemini_model:
-        try:
-            prompt = f"""
-Analyze this opportunity and return JSON:
-
-"{content}"
-
-{{
-  "title": "Clear title",
-  "category": "job/freelance/business/grant/other",
-  "deadline": "2025-01-25 or null",
-  "requirements": ["skill1", "skill2"],
-  "contact_info": {{"emails": ["email"], "phones": ["phone"]}},
-  "priority_score": 8.5,
-  "compensation": "$salary or null",
-  "location": "location or null",
-  "summary": "Brief summary"
-}}
-
-Return only JSON.
-"""
-            
-            response = gemini_model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            if '```json' in result_text:
-                result_text = result_text.split('```json')[1].split('```')[0]
-            elif '```' in result_text:
-                result_text = result_text.split('```')[1].split('```')[0]
-            
-            import json
-            return json.loads(result_text)
-            
-        except Exception as e:
-            print(f"Gemini error: {e}")
-    
-    # Fallback analysis
+def row_to_opportunity(row) -> dict:
+    """API record for a SELECT * row"""
     return {
-        "title": content[:50] + "..." if len(content) > 50 else content,
-        "category": "job" if any(word in content.lower() for word in ['job', 'position', 'role']) else "other",
-        "deadline": None,
-        "requirements": [],
-        "contact_info": {"emails": [], "phones": []},
-        "priority_score": 6.0 if 'urgent' in content.lower() else 5.0,
-        "compensation": None,
-        "location": None,
-        "summary": "Opportunity received via WhatsApp"
+        "id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "category": row[3],
+        "deadline": row[4],
+        "requirements": row[5].split('|') if row[5] else [],
+        "contact_info": row[6],
+        "priority_score": row[7],
+        "compensation": row[8],
+        "location": row[9],
+        "summary": row[10],
+        "status": row[11],
+        "source": row[12],
+        "phone_number": row[13],
+        "created_at": row[14]
     }
 
-@app.on_event("startup")
-async def startup():
-    init_db()
-    print("✅ WhatsApp OpportunityBot ready!")
-    print(f"📱 Twilio Account: {os.getenv('TWILIO_ACCOUNT_SID', 'Not configured')}")
+# GET /opportunities is served from memory; writes below refresh it
+read_model = install_read_model(app, 'whatsapp_opportunities.db', row_to_opportunity)
+# Skill and contact lookups (ai_engine/facets.py)
+facets = FacetIndex('whatsapp_opportunities.db')
+# Parsed salary columns for salary filters and sorting (ai_engine/compensation.py)
+salaries = CompensationIndex('whatsapp_opportunities.db')
+# Parsed deadlines for GET /opportunities/upcoming (ai_engine/deadlines.py)
+deadlines = DeadlineIndex('whatsapp_opportunities.db', read_model)
+# Place keys for the location filter (ai_engine/locations.py)
+places = LocationIndex('whatsapp_opportunities.db')
+# Filtered and sorted listings (ai_engine/queries.py)
+search = OpportunitySearch('whatsapp_opportunities.db', read_model)
 
-@app.get("/")
-async def root():
-    return {
-        "message": "📱 WhatsApp OpportunityBot is running!",
-        "status": "Ready to receive opportunities via WhatsApp",
-        "gemini_ai": "Enabled" if gemini_model else "Disabled"
-    }
+def analyze_opportunity(content: str, use_llm: bool = True) -> Analysis:
+    """Analyze with the LLM pool; the shared pipeline lazily fills whatever is missing
 
-@app.post("/whatsapp")
-async def whatsapp_webhook(request: Request):
-    """Handle incoming WhatsApp messages"""
+    Fields are only extracted when read, so callers time the reads
+    (the "analyze_opportunity" stage), not this call.
+    """
     
-    form_data = await request.form()
+    # Heuristics only when use_llm is off (degraded under load) or no LLM answered
+    llm_result = llm_pool.analyze(content) if use_llm else None
+    return analyze_content(content, known=llm_result)
+
+def save_whatsapp_opportunity(content: str, from_number: str, use_llm: bool = True) -> tuple:
+    """Analyze one WhatsApp post and insert what the confirmation shows; returns (analysis, id)
     
-    from_number = form_data.get("From", "")
-    message_body = form_data.get("Body", "")
-    media_url = form_data.get("MediaUrl0", "")
+    Requirements, contact info and summary are only computed and saved by
+    save_opportunity_details(), after the reply has gone out.
+    """
     
-    print(f"📱 WhatsApp message from {from_number}: {message_body[:50]}...")
+    # Analyze with AI; resolve what the confirmation shows now, not inside the INSERT's db_write
+    with timer("analyze_opportunity"):
+        analysis = analyze_opportunity(content, use_llm)
+        analysis.fields(CONFIRMATION_FIELDS)
     
-    response = MessagingResponse()
+    # Save to database
+    with timer("db_write"):
+        conn = sqlite3.connect('whatsapp_opportunities.db')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO opportunities 
+            (title, content, category, deadline, priority_score, compensation, location, phone_number) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            analysis["title"],
+            content,
+            analysis["category"],
+            analysis["deadline"],
+            analysis["priority_score"],
+            analysis["compensation"],
+            analysis["location"],
+            from_number
+        ))
+        
+        opportunity_id = cursor.lastrowid
+        salaries.index(conn, opportunity_id, analysis["compensation"])
+        deadlines.index(conn, opportunity_id, analysis["deadline"])
+        places.index(conn, opportunity_id, analysis["location"])
+        conn.commit()
+        conn.close()
     
-    try:
-        if message_body or media_url:
-            # Process media if present
-            if media_url:
-                content = f"Media received: {media_url}\n{message_body}"
-            else:
-                content = message_body
-            
-            # Analyze with AI
-            analysis = analyze_opportunity(content)
-            
-            # Save to database
-            conn = sqlite3.connect('whatsapp_opportunities.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO opportunities 
-                (title, content, category, deadline, requirements, contact_info, 
-                 priority_score, compensation, location, summary, phone_number) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                analysis["title"],
-                content,
-                analysis["category"],
-                analysis["deadline"],
+    read_model.refresh([opportunity_id])
+    
+    # Deadline reminders pick the new row up on their next sync
+    if analysis["deadline"]:
+        reminders.notify()
+    
+    return analysis, opportunity_id
+
+def save_opportunity_details(opportunity_id: int, analysis: Analysis):
+    """Second phase of a WhatsApp save: the fields the confirmation doesn't need"""
+    
+    with timer("analyze_opportunity_details"):
+        analysis.fields(("requirements", "contact_info", "summary"))
+    
+    with timer("db_write"):
+        conn = sqlite3.connect('whatsapp_opportunities.db')
+        conn.execute(
+            'UPDATE opportunities SET requirements = ?, contact_info = ?, summary = ? WHERE id = ?',
+            (
                 '|'.join(analysis["requirements"]) if analysis["requirements"] else "",
                 str(analysis["contact_info"]),
-                analysis["priority_score"],
-                analysis["compensation"],
-                analysis["location"],
                 analysis["summary"],
-                from_number
-            ))
-            
-            conn.commit()
-            opportunity_id = cursor.lastrowid
-            conn.close()
-            
-            # Send confirmation
-            ai_type = "🤖 Gemini AI" if gemini_model else "🔍 Smart Analysis"
-            
-            confirmation = f"""✅ *Opportunity Saved!*
+                opportunity_id
+            )
+        )
+        facets.index(conn, opportunity_id, analysis["requirements"], analysis["contact_info"])
+        conn.commit()
+        conn.close()
+    
+    read_model.refresh([opportunity_id])
+
+# Keep references so pending detail saves aren't garbage collected
+detail_tasks = set()
+
+def schedule_details(opportunity_id: int, analysis: Analysis):
+    task = asyncio.create_task(asyncio.to_thread(save_opportunity_details, opportunity_id, analysis))
+    detail_tasks.add(task)
+    task.add_done_callback(detail_tasks.discard)
+
+def build_confirmation(analysis: dict, opportunity_id: int) -> str:
+    """WhatsApp confirmation text for a saved opportunity"""
+    ai_type = f"🤖 {analysis['ai_provider'].title()} AI" if analysis.get("ai_provider") else "🔍 Smart Analysis"
+    
+    return f"""✅ *Opportunity Saved!*
 
 📋 *Title:* {analysis['title'][:60]}{'...' if len(analysis['title']) > 60 else ''}
 
@@ -213,12 +232,157 @@ async def whatsapp_webhook(request: Request):
 Analyzed by {ai_type}
 
 View all opportunities in your dashboard! 📊"""
-            
-            response.message(confirmation)
-            
+
+async def save_under_load(content: str, from_number: str) -> tuple:
+    """Save off the event loop, skipping the LLM when the queue is deep"""
+    level = shedder.level()
+    if level == DEGRADE:
+        shedder.count("degraded")
+    shedder.count("accepted")
+    with shedder.track():
+        return await asyncio.to_thread(save_whatsapp_opportunity, content, from_number, level == NORMAL)
+
+async def process_and_confirm(from_number: str, content: str, part_count: int = 1):
+    """Analyze a flushed or deferred post and confirm it out of band"""
+    analysis, opportunity_id = await save_under_load(content, from_number)
+    print(f"📦 Saved {part_count}-part post from {from_number} as #{opportunity_id}")
+    
+    # Queued, not awaited: the messenger retries it or dead-letters it on its own
+    outbound.send(from_number, build_confirmation(analysis, opportunity_id))
+    
+    # Already off the webhook path - finish the row while the reply goes out
+    await asyncio.to_thread(save_opportunity_details, opportunity_id, analysis)
+
+# Join multi-part posts from the same sender before analysis
+aggregator = MessageAggregator(process_and_confirm)
+
+# Per-sender token buckets + global queue-depth watermarks
+rate_limiter = SenderRateLimiter()
+shedder = LoadShedder()
+registry.add_collector(lambda: {f"load_{k}": v for k, v in shedder.gauges().items()})
+
+# MessageSid claims so Twilio retries replay instead of re-running analysis
+idempotency = SQLiteIdempotencyStore('whatsapp_opportunities.db')
+
+@app.on_event("startup")
+async def startup():
+    init_db()
+    facets.backfill()
+    salaries.backfill()
+    deadlines.backfill()
+    places.backfill()
+    search.init_schema()
+    read_model.start()
+    idempotency.init_table()
+    shedder.start(process_and_confirm)
+    rescorer.start()
+    reminders.start()
+    readiness.start({
+        "analysis": warm_up,
+        "prefilter": lambda: prefilter.classify(WARMUP_SAMPLE),
+        "llm": llm_pool.warm_up,
+        "database": lambda: warm_sqlite('whatsapp_opportunities.db')
+    })
+    print("✅ WhatsApp OpportunityBot ready!")
+    print(f"📱 Twilio Account: {os.getenv('TWILIO_ACCOUNT_SID', 'Not configured')}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Don't lose posts still sitting in the aggregation window
+    await aggregator.flush_all()
+    await shedder.stop(process_and_confirm)
+    if detail_tasks:
+        await asyncio.gather(*detail_tasks, return_exceptions=True)
+    # Last, so the confirmations queued above still go out
+    await outbound.stop()
+
+@app.get("/")
+async def root():
+    return {
+        "message": "📱 WhatsApp OpportunityBot is running!",
+        "status": "Ready to receive opportunities via WhatsApp",
+        "llm_providers": llm_pool.status()
+    }
+
+@app.post("/whatsapp")
+async def whatsapp_webhook(request: Request):
+    """Handle incoming WhatsApp messages"""
+    
+    form_data = await request.form()
+    message_sid = form_data.get("MessageSid", "")
+    
+    # Twilio retries slow requests - replay the original reply instead
+    replay = await idempotency.begin(message_sid)
+    if replay is not None:
+        print(f"🔁 Replaying reply for retried {message_sid}")
+        return replay
+    
+    try:
+        reply = await handle_whatsapp_message(form_data)
+    except Exception as e:
+        print(f"Error processing WhatsApp message: {e}")
+        # Let Twilio's retry have another go
+        await idempotency.release(message_sid)
+        response = MessagingResponse()
+        response.message("❌ Sorry, there was an error processing your message. Please try again or contact support.")
+        return str(response)
+    
+    await idempotency.complete(message_sid, reply)
+    return reply
+
+@timed()
+async def handle_whatsapp_message(form_data) -> str:
+    """Route one incoming message and return the TwiML reply"""
+    
+    from_number = form_data.get("From", "")
+    message_body = form_data.get("Body", "")
+    media_url = form_data.get("MediaUrl0", "")
+    
+    print(f"📱 WhatsApp message from {from_number}: {message_body[:50]}...")
+    
+    response = MessagingResponse()
+    
+    decision = prefilter.classify(message_body, has_media=bool(media_url))
+    if decision["route"] == "ignore" and decision["reason"] != "too short" and aggregator.has_pending(from_number):
+        # Short follow-ups ("send CV to ...") belong to the post being buffered
+        decision = {**decision, "route": "opportunity", "reason": "continuation"}
+    if decision["route"] == "ignore":
+        # A file append under the audit lock; keep it off the event loop
+        await asyncio.to_thread(prefilter.audit, decision, message_body, from_number)
+        return str(response)
+    
+    if not rate_limiter.allow(from_number):
+        shedder.count("rate_limited")
+        if rate_limiter.should_warn(from_number):
+            response.message(RATE_LIMITED_MESSAGE)
+        return str(response)
+    
+    if decision["route"] == "opportunity":
+        # Process media if present
+        if media_url:
+            content = f"Media received: {media_url}\n{message_body}"
         else:
-            # Welcome message
-            welcome = """🤖 *Welcome to OpportunityBot!*
+            content = message_body
+        
+        if shedder.level() == DEFER:
+            # Too much queued work: save later and confirm out of band
+            response.message(DEFERRED_MESSAGE if shedder.defer(from_number, content) else DROPPED_MESSAGE)
+            return str(response)
+        
+        if aggregator.enabled:
+            # Confirmation goes out once the post is complete
+            aggregator.add(from_number, content)
+            return str(response)
+        
+        analysis, opportunity_id = await save_under_load(content, from_number)
+        
+        # Send confirmation
+        response.message(build_confirmation(analysis, opportunity_id))
+        schedule_details(opportunity_id, analysis)
+        
+    else:
+        # Welcome message
+        welcome = """🤖 *Welcome to OpportunityBot!*
 
 Send me any opportunity details and I'll:
 ✅ Extract key information
@@ -233,52 +397,36 @@ Send me any opportunity details and I'll:
 • Grant applications
 
 Just paste the text or send screenshots! 📸"""
-            
-            response.message(welcome)
-            
-    except Exception as e:
-        print(f"Error processing WhatsApp message: {e}")
-        response.message("❌ Sorry, there was an error processing your message. Please try again or contact support.")
+        
+        response.message(welcome)
     
     return str(response)
 
+@app.get("/metrics/load")
+async def load_metrics():
+    """Rate limiting and load shedding counters"""
+    return shedder.metrics()
+
 @app.get("/opportunities")
-async def get_opportunities():
+async def get_opportunities(params: dict = Depends(opportunity_filters)):
     """Get all opportunities for dashboard"""
-    conn = sqlite3.connect('whatsapp_opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM opportunities ORDER BY priority_score DESC, created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    opportunities = []
-    for row in rows:
-        opportunities.append({
-            "id": row[0],
-            "title": row[1],
-            "content": row[2],
-            "category": row[3],
-            "deadline": row[4],
-            "requirements": row[5].split('|') if row[5] else [],
-            "contact_info": row[6],
-            "priority_score": row[7],
-            "compensation": row[8],
-            "location": row[9],
-            "summary": row[10],
-            "status": row[11],
-            "source": row[12],
-            "phone_number": row[13],
-            "created_at": row[14]
-        })
-    
-    return opportunities
+    if params:
+        return await search.respond(params)
+    return json_response(read_model.json())
+
+@app.get("/opportunities/upcoming")
+async def get_upcoming_opportunities(days: int = Query(7, ge=0, le=MAX_UPCOMING_DAYS)):
+    """Opportunities due from today through the next N days, soonest first"""
+    return await deadlines.respond(days)
 
 @app.post("/opportunities")
 async def create_opportunity_manual(data: dict):
     """Manual opportunity creation (for dashboard)"""
     try:
         content = data.get("content", "")
-        analysis = analyze_opportunity(content)
+        # The LLM pool blocks for up to its hedging timeout, keep it off the event loop
+        with timer("analyze_opportunity"):
+            analysis = await asyncio.to_thread(lambda: analyze_opportunity(content).complete())
         
         conn = sqlite3.connect('whatsapp_opportunities.db')
         cursor = conn.cursor()
@@ -302,9 +450,14 @@ async def create_opportunity_manual(data: dict):
             "manual"
         ))
         
-        conn.commit()
         opportunity_id = cursor.lastrowid
+        facets.index(conn, opportunity_id, analysis["requirements"], analysis["contact_info"])
+        salaries.index(conn, opportunity_id, analysis["compensation"])
+        deadlines.index(conn, opportunity_id, analysis["deadline"])
+        places.index(conn, opportunity_id, analysis["location"])
+        conn.commit()
         conn.close()
+        read_model.refresh([opportunity_id])
         
         return {
             "id": opportunity_id,
@@ -315,6 +468,22 @@ async def create_opportunity_manual(data: dict):
     except Exception as e:
         return {"error": f"Analysis failed: {str(e)}"}
 
+@app.put("/opportunities/{opportunity_id}/status")
+async def update_status(opportunity_id: int, data: dict):
+    """Update opportunity status; applied/rejected/archived cancel its deadline reminders"""
+    status = data.get("status", "new")
+    
+    conn = sqlite3.connect('whatsapp_opportunities.db')
+    cursor = conn.cursor()
+    cursor.execute('UPDATE opportunities SET status = ? WHERE id = ?', (status, opportunity_id))
+    conn.commit()
+    conn.close()
+    read_model.refresh([opportunity_id])
+    
+    await asyncio.to_thread(reminders.set_status, opportunity_id, status)
+    
+    return {"message": f"Status updated to: {status}"}
+
 @app.get("/stats")
 async def get_stats():
     """Get statistics for dashboard"""
@@ -0,0 +1,83 @@
+"""
+Per-sender message aggregation for multi-part WhatsApp posts
+
+Long posts often arrive as two or three consecutive messages from the same
+number. Parts are held for a short debounce window, joined, and handed to a
+single flush callback - one analysis and one insert per post.
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+# async on_flush(sender, content, part_count)
+FlushCallback = Callable[[str, str, int], Awaitable[None]]
+
+
+class MessageAggregator:
+    """Debounce buffer keyed on the sender's From number"""
+
+    def __init__(self, on_flush: FlushCallback, window: Optional[float] = None,
+                 max_parts: Optional[int] = None, max_chars: Optional[int] = None,
+                 max_senders: Optional[int] = None):
+        self.on_flush = on_flush
+        self.window = window if window is not None else float(os.getenv("AGGREGATION_WINDOW_SECONDS", "6"))
+        self.max_parts = max_parts or int(os.getenv("AGGREGATION_MAX_PARTS", "5"))
+        self.max_chars = max_chars or int(os.getenv("AGGREGATION_MAX_CHARS", "8000"))
+        self.max_senders = max_senders or int(os.getenv("AGGREGATION_MAX_SENDERS", "1000"))
+        self.buffers = OrderedDict()
+        self.tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def has_pending(self, sender: str) -> bool:
+        return sender in self.buffers
+
+    def add(self, sender: str, text: str):
+        """Buffer one part; flushes early once the sender hits a size bound"""
+        text = text[:self.max_chars]
+        buffer = self.buffers.pop(sender, None) or {"parts": [], "chars": 0, "timer": None}
+        self.buffers[sender] = buffer  # most recently active sender last
+
+        if buffer["timer"]:
+            buffer["timer"].cancel()
+        buffer["parts"].append(text)
+        buffer["chars"] += len(text)
+
+        if len(buffer["parts"]) >= self.max_parts or buffer["chars"] >= self.max_chars:
+            self.flush(sender)
+        else:
+            loop = asyncio.get_running_loop()
+            buffer["timer"] = loop.call_later(self.window, self.flush, sender)
+
+        # Bound total memory: flush the least recently active senders
+        while len(self.buffers) > self.max_senders:
+            self.flush(next(iter(self.buffers)))
+
+    def flush(self, sender: str):
+        """Join the sender's parts and schedule the flush callback"""
+        buffer = self.buffers.pop(sender, None)
+        if not buffer:
+            return
+        if buffer["timer"]:
+            buffer["timer"].cancel()
+
+        content = "\n".join(buffer["parts"])
+        task = asyncio.get_running_loop().create_task(self._run(sender, content, len(buffer["parts"])))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, sender: str, content: str, part_count: int):
+        try:
+            await self.on_flush(sender, content, part_count)
+        except Exception as e:
+            print(f"❌ Error processing aggregated message from {sender}: {e}")
+
+    async def flush_all(self):
+        """Flush every pending buffer and wait for the callbacks (shutdown)"""
+        for sender in list(self.buffers):
+            self.flush(sender)
+        if self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
@@ -0,0 +1,249 @@
+"""
+Idempotent webhook processing keyed on Twilio's MessageSid
+
+Twilio retries a webhook POST when our reply is slow. Each MessageSid is
+claimed in a unique-indexed processed_messages table (with a bounded
+in-memory recent set in front of it) and the TwiML we sent the first time
+is replayed for every retry - no second analysis, no duplicate row.
+The claim table is touched through asyncio.to_thread, so a slow commit
+doesn't stall the event loop.
+
+A claim is written before processing and its response after, so a retry
+that arrives in between gets empty TwiML (the original is still working on
+it). If that worker died mid-request the response never comes: a claim
+still without one after IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS (default 300) is
+taken over by the next retry and processed again.
+"""
+import asyncio
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from monitoring.metrics import count
+
+EMPTY_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response />'
+
+
+class IdempotencyStore(ABC):
+    """In-memory recent set + in-flight tracking over a persistent claim table"""
+
+    def __init__(self, max_recent: Optional[int] = None, wait_timeout: Optional[float] = None,
+                 claim_timeout: Optional[float] = None):
+        self.max_recent = max_recent or int(os.getenv("IDEMPOTENCY_MAX_RECENT", "10000"))
+        self.wait_timeout = wait_timeout or float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+        self.claim_timeout = claim_timeout or float(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", "300"))
+        self.recent = OrderedDict()
+        self.inflight = {}
+        self.replayed = 0
+
+    # Persistence hooks (blocking, run in a worker thread)
+    @abstractmethod
+    def _claim(self, message_sid: str) -> Optional[str]:
+        """Insert the sid; None if we now own it, else the stored response ('' while in progress)
+
+        A claim older than claim_timeout that still has no response is taken over (None).
+        """
+
+    @abstractmethod
+    def _save(self, message_sid: str, response: str):
+        """Store the response for a claimed sid"""
+
+    @abstractmethod
+    def _delete(self, message_sid: str):
+        """Drop the claim on a sid"""
+
+    async def begin(self, message_sid: str) -> Optional[str]:
+        """Return None if this request should be processed, else the TwiML to replay"""
+        if not message_sid:
+            return None
+
+        if message_sid in self.recent:
+            self.recent.move_to_end(message_sid)
+            self.replayed += 1
+            count("cache_hits_total", cache="idempotency_recent")
+            return self.recent[message_sid]
+
+        if message_sid in self.inflight:
+            # Retry arrived while the original is still being processed here
+            try:
+                await asyncio.wait_for(self.inflight[message_sid].wait(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.replayed += 1
+            count("cache_hits_total", cache="idempotency_inflight")
+            return self.recent.get(message_sid, EMPTY_TWIML)
+
+        # Marked in flight before the claim, so a retry arriving while it runs waits here
+        self.inflight[message_sid] = asyncio.Event()
+        try:
+            existing = await asyncio.to_thread(self._claim, message_sid)
+        except BaseException:
+            self._finish(message_sid)
+            raise
+        if existing is not None:
+            # Already handled (or being handled) by this or another worker
+            if existing:
+                self._remember(message_sid, existing)
+            self._finish(message_sid)
+            self.replayed += 1
+            count("cache_hits_total", cache="idempotency_db")
+            return existing or EMPTY_TWIML
+
+        count("cache_misses_total", cache="idempotency")
+        return None
+
+    async def complete(self, message_sid: str, response: str):
+        """Record the response so retries replay it"""
+        if not message_sid:
+            return
+        self._remember(message_sid, response)
+        try:
+            await asyncio.to_thread(self._save, message_sid, response)
+        finally:
+            self._finish(message_sid)
+
+    async def release(self, message_sid: str):
+        """Give up the claim after a failure so a retry is processed again"""
+        if not message_sid:
+            return
+        try:
+            await asyncio.to_thread(self._delete, message_sid)
+        finally:
+            self._finish(message_sid)
+
+    def _remember(self, message_sid: str, response: str):
+        self.recent[message_sid] = response
+        self.recent.move_to_end(message_sid)
+        while len(self.recent) > self.max_recent:
+            self.recent.popitem(last=False)
+
+    def _finish(self, message_sid: str):
+        event = self.inflight.pop(message_sid, None)
+        if event:
+            event.set()
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """Claim table in one of the raw-sqlite app databases"""
+
+    def __init__(self, db_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+
+    def init_table(self, retention_days: int = 7):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS processed_messages (
+                message_sid TEXT NOT NULL,
+                response TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_processed_messages_sid ON processed_messages(message_sid)')
+        # Twilio stops retrying within minutes, old claims are dead weight
+        cursor.execute("DELETE FROM processed_messages WHERE created_at < datetime('now', ?)", (f'-{retention_days} days',))
+        conn.commit()
+        conn.close()
+
+    def _claim(self, message_sid: str) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            try:
+                conn.execute('INSERT INTO processed_messages (message_sid) VALUES (?)', (message_sid,))
+                conn.commit()
+                return None
+            except sqlite3.IntegrityError:
+                # No response past the timeout: the worker that claimed it died mid-request
+                taken = conn.execute(
+                    "UPDATE processed_messages SET created_at = CURRENT_TIMESTAMP WHERE message_sid = ? "
+                    "AND response IS NULL AND created_at < datetime('now', ?)",
+                    (message_sid, f'-{int(self.claim_timeout)} seconds')
+                ).rowcount
+                conn.commit()
+                if taken:
+                    print(f"⚠️ Taking over abandoned claim on {message_sid}")
+                    return None
+                row = conn.execute('SELECT response FROM processed_messages WHERE message_sid = ?', (message_sid,)).fetchone()
+                return (row[0] or "") if row else ""
+        finally:
+            conn.close()
+
+    def _save(self, message_sid: str, response: str):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('UPDATE processed_messages SET response = ? WHERE message_sid = ?', (response, message_sid))
+        conn.commit()
+        conn.close()
+
+    def _delete(self, message_sid: str):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM processed_messages WHERE message_sid = ?', (message_sid,))
+        conn.commit()
+        conn.close()
+
+
+class SQLAlchemyIdempotencyStore(IdempotencyStore):
+    """Claim table for the SQLAlchemy backend (see backend.models.processed_message)"""
+
+    def __init__(self, session_factory, **kwargs):
+        super().__init__(**kwargs)
+        self.session_factory = session_factory
+        self._table_ready = False
+
+    def _session(self):
+        from backend.models.processed_message import ProcessedMessage
+        db = self.session_factory()
+        if not self._table_ready:
+            ProcessedMessage.__table__.create(bind=db.get_bind(), checkfirst=True)
+            self._table_ready = True
+        return db
+
+    def _claim(self, message_sid: str) -> Optional[str]:
+        from sqlalchemy.exc import IntegrityError
+        from backend.models.processed_message import ProcessedMessage
+
+        db = self._session()
+        try:
+            db.add(ProcessedMessage(message_sid=message_sid))
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+            # No response past the timeout: the worker that claimed it died mid-request
+            now = datetime.utcnow()
+            taken = db.query(ProcessedMessage).filter(
+                ProcessedMessage.message_sid == message_sid,
+                ProcessedMessage.response.is_(None),
+                ProcessedMessage.created_at < now - timedelta(seconds=self.claim_timeout)
+            ).update({"created_at": now}, synchronize_session=False)
+            db.commit()
+            if taken:
+                print(f"⚠️ Taking over abandoned claim on {message_sid}")
+                return None
+            row = db.query(ProcessedMessage).filter(ProcessedMessage.message_sid == message_sid).first()
+            return (row.response or "") if row else ""
+        finally:
+            db.close()
+
+    def _save(self, message_sid: str, response: str):
+        from backend.models.processed_message import ProcessedMessage
+
+        db = self._session()
+        try:
+            db.query(ProcessedMessage).filter(ProcessedMessage.message_sid == message_sid).update({"response": response})
+            db.commit()
+        finally:
+            db.close()
+
+    def _delete(self, message_sid: str):
+        from backend.models.processed_message import ProcessedMessage
+
+        db = self._session()
+        try:
+            db.query(ProcessedMessage).filter(ProcessedMessage.message_sid == message_sid).delete()
+            db.commit()
+        finally:
+            db.close()
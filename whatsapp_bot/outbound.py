@@ -0,0 +1,278 @@
+"""
+Outbound WhatsApp messages
+
+Confirmations and deadline reminders all go through one OutboundMessenger:
+
+  * every send uses the shared, connection-pooled Twilio client
+  * each sending number has a token bucket refilled at
+    OUTBOUND_SENDS_PER_SECOND; sends wait for a token instead of letting
+    Twilio queue them and start answering 429. A 429 that gets through
+    anyway empties the bucket for a growing backoff
+  * an asyncio queue is worked by OUTBOUND_CONCURRENCY workers. Transient
+    failures (429, 5xx, network) are retried with exponential backoff.
+    Permanent ones (invalid number, opted out) and exhausted retries go to
+    the dead-letter log (OUTBOUND_DEAD_LETTER_LOG, JSON lines)
+  * notifications for a phone whose earlier message is still waiting in the
+    queue are appended to that message instead of becoming another send
+
+send() returns a future resolved with the Twilio message SID, or None once
+the message was dead-lettered; callers that don't care can ignore it.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from monitoring.metrics import count, registry
+
+# Twilio rejects WhatsApp bodies over 1600 characters
+MAX_BODY_CHARS = 1600
+PART_SEPARATOR = "\n\n"
+
+
+def send_twilio(from_: str, to: str, body: str) -> str:
+    """Default transport: the shared Twilio client; returns the message SID"""
+    from whatsapp_bot.twilio_client import get_twilio_client
+    return get_twilio_client().messages.create(from_=from_, to=to, body=body).sid
+
+
+def classify_error(error: Exception) -> str:
+    """"throttled", "transient" or "permanent", from a TwilioRestException's HTTP status"""
+    status = getattr(error, "status", None)
+    if status == 429:
+        return "throttled"
+    if status is None or status >= 500:
+        # No status means the request never got an answer (timeout, connection reset)
+        return "transient"
+    return "permanent"
+
+
+class SendBucket:
+    """Token bucket for one sending number; hands out waits instead of refusals"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "backoff")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.backoff = 0.0
+
+    def reserve(self) -> float:
+        """Take a token, going into debt if needed; returns seconds to wait before sending"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def throttled(self, base: float, ceiling: float) -> float:
+        """Twilio said 429: nothing goes out from this number for a doubling backoff"""
+        self.backoff = min(ceiling, self.backoff * 2 if self.backoff else base)
+        self.tokens = min(self.tokens, 0.0) - self.backoff * self.rate
+        return self.backoff
+
+    def succeeded(self):
+        self.backoff = 0.0
+
+
+class OutboundMessage:
+    __slots__ = ("from_", "to", "parts", "futures", "attempts", "created")
+
+    def __init__(self, from_: str, to: str):
+        self.from_ = from_
+        self.to = to
+        self.parts: List[str] = []
+        self.futures: List[asyncio.Future] = []
+        self.attempts = 0
+        self.created = time.time()
+
+    @property
+    def body(self) -> str:
+        return PART_SEPARATOR.join(self.parts)
+
+    def fits(self, body: str) -> bool:
+        return len(self.body) + len(PART_SEPARATOR) + len(body) <= MAX_BODY_CHARS
+
+
+class OutboundMessenger:
+    """Rate-limited, retrying send queue in front of Twilio"""
+
+    def __init__(self, send: Callable[[str, str, str], str] = send_twilio,
+                 sends_per_second: Optional[float] = None, burst: Optional[float] = None,
+                 concurrency: Optional[int] = None, max_attempts: Optional[int] = None,
+                 retry_delay: float = 1.0, max_retry_delay: float = 60.0,
+                 dead_letter_path: Optional[str] = None):
+        self.transport = send
+        self.rate = sends_per_second or float(os.getenv("OUTBOUND_SENDS_PER_SECOND", "10"))
+        self.burst = burst or float(os.getenv("OUTBOUND_BURST", str(self.rate)))
+        self.concurrency = concurrency or int(os.getenv("OUTBOUND_CONCURRENCY", "4"))
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "5"))
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.dead_letter_path = dead_letter_path or os.getenv("OUTBOUND_DEAD_LETTER_LOG", "outbound_dead_letters.log")
+        self.buckets: Dict[str, SendBucket] = {}
+        # (from, to) -> message still waiting in the queue, open for coalescing
+        self.pending: Dict[tuple, OutboundMessage] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        # backoff task -> the message it will requeue
+        self.retries: Dict[asyncio.Task, OutboundMessage] = {}
+        self._lock = threading.Lock()
+        registry.add_collector(lambda: {"outbound_queue_depth": self.queue.qsize() if self.queue else 0})
+
+    def start(self):
+        """Start the workers; send() does this on first use"""
+        if not self.workers:
+            self.queue = asyncio.Queue()
+            self.workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_timeout: Optional[float] = None):
+        """Give queued messages drain_timeout seconds, then dead-letter what's left
+
+        That includes messages still backing off before a retry and any a
+        worker was in the middle of delivering, so every send() future resolves.
+        """
+        if not self.workers:
+            return
+        if drain_timeout is None:
+            drain_timeout = float(os.getenv("OUTBOUND_DRAIN_SECONDS", "5"))
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        waiting = dict(self.retries)
+        for task in self.workers + list(waiting):
+            task.cancel()
+        await asyncio.gather(*self.workers, *waiting, return_exceptions=True)
+        self.workers = []
+        self.retries.clear()
+        for task, message in waiting.items():
+            # A backoff that finished first already put its message back in the queue
+            if task.cancelled():
+                self._dead_letter(message, "shutdown")
+        while not self.queue.empty():
+            self._dead_letter(self.queue.get_nowait(), "shutdown")
+        self.pending.clear()
+
+    def send(self, to: str, body: str, from_: Optional[str] = None) -> asyncio.Future:
+        """Queue a message; must be called on the event loop"""
+        self.start()
+        from_ = from_ or os.getenv("TWILIO_WHATSAPP_NUMBER")
+        future = asyncio.get_running_loop().create_future()
+        message = self.pending.get((from_, to))
+        if message is not None and message.fits(body):
+            count("outbound_coalesced_total")
+        else:
+            message = OutboundMessage(from_, to)
+            self.pending[(from_, to)] = message
+            self.queue.put_nowait(message)
+        message.parts.append(body[:MAX_BODY_CHARS])
+        message.futures.append(future)
+        return future
+
+    def bucket(self, sender: str) -> SendBucket:
+        bucket = self.buckets.get(sender)
+        if bucket is None:
+            bucket = self.buckets[sender] = SendBucket(self.rate, self.burst)
+        return bucket
+
+    async def _work(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await self._deliver(message)
+            except asyncio.CancelledError:
+                self._dead_letter(message, "shutdown")
+                raise
+            except Exception as e:
+                self._dead_letter(message, f"internal error: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, message: OutboundMessage):
+        # From here on the body is fixed; later notifications start a new message
+        if self.pending.get((message.from_, message.to)) is message:
+            del self.pending[(message.from_, message.to)]
+
+        bucket = self.bucket(message.from_)
+        wait = bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        message.attempts += 1
+        try:
+            sid = await asyncio.to_thread(self.transport, message.from_, message.to, message.body)
+        except Exception as e:
+            kind = classify_error(e)
+            if kind == "permanent" or message.attempts >= self.max_attempts:
+                self._dead_letter(message, str(e))
+                return
+            if kind == "throttled":
+                count("outbound_throttled_total")
+                delay = bucket.throttled(self.retry_delay, self.max_retry_delay)
+            else:
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (message.attempts - 1))
+            count("outbound_retried_total")
+            self._retry_later(message, delay)
+            return
+
+        bucket.succeeded()
+        count("outbound_sent_total")
+        self._resolve(message, sid)
+
+    def _retry_later(self, message: OutboundMessage, delay: float):
+        async def requeue():
+            await asyncio.sleep(delay)
+            self.queue.put_nowait(message)
+
+        task = asyncio.create_task(requeue())
+        self.retries[task] = message
+        task.add_done_callback(lambda done: self.retries.pop(done, None))
+
+    def _resolve(self, message: OutboundMessage, sid: Optional[str]):
+        for future in message.futures:
+            if not future.done():
+                future.set_result(sid)
+
+    def _dead_letter(self, message: OutboundMessage, reason: str):
+        """Give up on a message: resolve its futures with None and append it to the log (JSON lines)"""
+        count("outbound_dead_letters_total")
+        print(f"⚠️ Could not send WhatsApp message to {message.to}: {reason}")
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "from": message.from_,
+            "to": message.to,
+            "attempts": message.attempts,
+            "reason": reason,
+            "body": message.body
+        }
+        try:
+            with self._lock:
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write outbound dead-letter log: {e}")
+        self._resolve(message, None)
+
+
+_messenger = None
+_messenger_lock = threading.Lock()
+
+
+def get_outbound() -> OutboundMessenger:
+    """Shared messenger for the process, so every sender number has a single bucket
+
+    The app awaits stop() at the end of its own shutdown handler, after the
+    handlers that may still queue confirmations have run.
+    """
+    global _messenger
+    if _messenger is None:
+        with _messenger_lock:
+            if _messenger is None:
+                _messenger = OutboundMessenger()
+    return _messenger
@@ -0,0 +1,165 @@
+"""
+Per-sender rate limiting and load shedding for the WhatsApp webhooks
+
+Every From number gets a token bucket so one phone can't burn the whole LLM
+quota. On top of that a global queue-depth watermark degrades new messages
+to heuristic-only analysis, then to deferred processing with a polite reply.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+from monitoring import metrics
+
+NORMAL = "normal"
+DEGRADE = "degrade"
+DEFER = "defer"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated", "warned")
+
+    def __init__(self, capacity: float):
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.warned = False
+
+
+class SenderRateLimiter:
+    """Token bucket per sender, with a bounded number of tracked senders"""
+
+    def __init__(self, capacity: Optional[float] = None, refill_per_minute: Optional[float] = None,
+                 max_senders: Optional[int] = None):
+        self.capacity = capacity or float(os.getenv("RATE_LIMIT_BURST", "5"))
+        self.refill_per_second = (refill_per_minute or float(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))) / 60.0
+        self.max_senders = max_senders or int(os.getenv("RATE_LIMIT_MAX_SENDERS", "10000"))
+        self.buckets = OrderedDict()
+
+    def allow(self, sender: str) -> bool:
+        """Take one token for the sender; False when they're over the limit"""
+        now = time.monotonic()
+        bucket = self.buckets.pop(sender, None) or TokenBucket(self.capacity)
+        self.buckets[sender] = bucket
+        while len(self.buckets) > self.max_senders:
+            # Least recently seen sender would be back at full capacity anyway
+            self.buckets.popitem(last=False)
+
+        bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.refill_per_second)
+        bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.warned = False
+            return True
+        return False
+
+    def should_warn(self, sender: str) -> bool:
+        """Only tell a limited sender once until they're allowed again"""
+        bucket = self.buckets.get(sender)
+        if not bucket or bucket.warned:
+            return False
+        bucket.warned = True
+        return True
+
+
+class LoadShedder:
+    """Tracks in-flight work and decides how much effort a new message gets"""
+
+    def __init__(self, degrade_watermark: Optional[int] = None, defer_watermark: Optional[int] = None,
+                 max_deferred: Optional[int] = None):
+        self.degrade_watermark = degrade_watermark or int(os.getenv("LOAD_DEGRADE_WATERMARK", "8"))
+        self.defer_watermark = defer_watermark or int(os.getenv("LOAD_DEFER_WATERMARK", "32"))
+        self.max_deferred = max_deferred or int(os.getenv("LOAD_MAX_DEFERRED", "1000"))
+        self.in_flight = 0
+        self.queue = None
+        self.worker = None
+        self.counters = {
+            "accepted": 0,
+            "rate_limited": 0,
+            "degraded": 0,
+            "deferred": 0,
+            "deferred_processed": 0,
+            "dropped": 0
+        }
+
+    def depth(self) -> int:
+        return self.in_flight + (self.queue.qsize() if self.queue else 0)
+
+    def level(self) -> str:
+        depth = self.depth()
+        if depth >= self.defer_watermark:
+            return DEFER
+        if depth >= self.degrade_watermark:
+            return DEGRADE
+        return NORMAL
+
+    @contextmanager
+    def track(self):
+        """Count one unit of analysis + insert work while it runs"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def count(self, name: str):
+        self.counters[name] += 1
+        metrics.count(f"load_{name}_total")
+
+    def defer(self, sender: str, content: str) -> bool:
+        """Queue a message for later; False when even the deferred queue is full"""
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.max_deferred)
+        try:
+            self.queue.put_nowait((sender, content))
+        except asyncio.QueueFull:
+            self.count("dropped")
+            return False
+        self.count("deferred")
+        return True
+
+    def start(self, handler: Callable[[str, str], Awaitable[None]]):
+        """Start the background worker that drains deferred messages"""
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.max_deferred)
+        self.worker = asyncio.get_running_loop().create_task(self._run(handler))
+
+    async def _run(self, handler):
+        while True:
+            sender, content = await self.queue.get()
+            # Wait for live traffic to calm down before catching up
+            while self.in_flight >= self.degrade_watermark:
+                await asyncio.sleep(0.5)
+            await self._process(handler, sender, content)
+
+    async def _process(self, handler, sender: str, content: str):
+        try:
+            await handler(sender, content)
+        except Exception as e:
+            print(f"❌ Deferred message from {sender} failed: {e}")
+        self.count("deferred_processed")
+
+    async def stop(self, handler: Callable[[str, str], Awaitable[None]]):
+        """Stop the worker and process whatever is still queued (shutdown)"""
+        if self.worker:
+            self.worker.cancel()
+        while self.queue and not self.queue.empty():
+            sender, content = self.queue.get_nowait()
+            await self._process(handler, sender, content)
+
+    def gauges(self) -> dict:
+        """Current load, for a metrics collector; the running totals are load_*_total counters"""
+        return {
+            "in_flight": self.in_flight,
+            "deferred_queue": self.queue.qsize() if self.queue else 0
+        }
+
+    def metrics(self) -> dict:
+        return {**self.counters, **self.gauges(), "level": self.level()}
+
+
+RATE_LIMITED_MESSAGE = "⏳ You're sending messages faster than I can process them. Please wait a minute and try again."
+DEFERRED_MESSAGE = "📥 We're very busy right now. Your opportunity is queued and you'll get a confirmation once it's saved."
+DROPPED_MESSAGE = "😓 We're overloaded right now and couldn't queue your message. Please resend it in a few minutes."
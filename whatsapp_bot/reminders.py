@@ -0,0 +1,423 @@
+"""
+Deadline reminders for opportunities posted over WhatsApp
+
+Every opportunity with a deadline and a phone_number gets one reminder per
+lead time (REMINDER_LEAD_DAYS, default "3,1") at REMINDER_HOUR local time.
+Reminders live in a reminders table, so they survive restarts; the table is
+filled incrementally from opportunities (by id, like the re-scoring job).
+A trigger queues every opportunity whose deadline or phone_number changes in
+reminder_resync; the next sync replaces its reminders with ones for the new
+values. A due batch is synced before it is claimed, so a reminder for a
+deadline that moved never goes out.
+
+In memory there is only a timer heap of the reminders due within the next
+REMINDER_HORIZON_HOURS. The scheduler sleeps until the earliest one or the
+end of the horizon, whichever comes first, so with 100k pending reminders
+the database is read once per horizon plus once per insert notification -
+never polled on a timer.
+
+Due reminders are grouped per phone_number into one message and handed to
+the outbound messenger (whatsapp_bot/outbound.py), which paces, retries and
+coalesces them with any confirmation still queued for the same phone.
+
+Several schedulers may share the table (uvicorn workers, or two apps on one
+database), so a due reminder is claimed before it is sent: pending -> sending
+under a token only this batch knows, and only the rows that claim updated are
+sent. Claims older than REMINDER_CLAIM_TIMEOUT_SECONDS (default 600), left
+by a worker that died mid-send, go back to pending at startup and on every
+refill.
+"""
+import asyncio
+import heapq
+import os
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from monitoring.metrics import count, registry
+from whatsapp_bot.outbound import OutboundMessenger, get_outbound
+
+CLOSED_STATUSES = ("applied", "rejected", "archived")
+
+
+def lead_days_from_env() -> List[int]:
+    return sorted({int(day) for day in os.getenv("REMINDER_LEAD_DAYS", "3,1").split(",") if day.strip()}, reverse=True)
+
+
+def fire_time(deadline: str, lead_days: int, hour: int) -> Optional[float]:
+    """Epoch seconds of the reminder lead_days before deadline, at hour local time"""
+    try:
+        due = datetime.strptime(str(deadline)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+    day = due - timedelta(days=lead_days)
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+def format_reminder(reminders: List[dict], today: Optional[date] = None) -> str:
+    today = today or date.today()
+    # After downtime several lead times of one opportunity can be due together
+    unique = {reminder["opportunity_id"]: reminder for reminder in reminders}.values()
+    lines = [f"⏰ *{len(unique)} deadline{'s' if len(unique) > 1 else ''} coming up*", ""]
+    for reminder in sorted(unique, key=lambda r: r["deadline"]):
+        days = (datetime.strptime(reminder["deadline"][:10], "%Y-%m-%d").date() - today).days
+        when = "today" if days <= 0 else "tomorrow" if days == 1 else f"in {days} days"
+        lines.append(f"• #{reminder['opportunity_id']} {reminder['title'][:60]} - due {reminder['deadline'][:10]} ({when})")
+    return "\n".join(lines)
+
+
+class ReminderStore:
+    """reminders table next to the opportunities it refers to"""
+
+    def __init__(self, db_path: str, claim_timeout: Optional[float] = None):
+        self.db_path = db_path
+        self.claim_timeout = claim_timeout or float(os.getenv("REMINDER_CLAIM_TIMEOUT_SECONDS", "600"))
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_table(self):
+        conn = self.connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                opportunity_id INTEGER NOT NULL,
+                phone_number TEXT NOT NULL,
+                lead_days INTEGER NOT NULL,
+                fire_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                sent_at TIMESTAMP,
+                claim_token TEXT,
+                claimed_at REAL,
+                UNIQUE (opportunity_id, lead_days)
+            )
+        ''')
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(reminders)")}
+        for name, kind in (("claim_token", "TEXT"), ("claimed_at", "REAL")):
+            if name not in columns:
+                conn.execute(f"ALTER TABLE reminders ADD COLUMN {name} {kind}")
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(status, fire_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminder_sync (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_opportunity_id INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminder_resync (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                opportunity_id INTEGER NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def init_trigger(self, conn: sqlite3.Connection):
+        """Queue opportunities whose deadline or phone changes; needs the opportunities table"""
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS reminder_resync_update AFTER UPDATE OF deadline, phone_number ON opportunities
+            WHEN OLD.deadline IS NOT NEW.deadline OR OLD.phone_number IS NOT NEW.phone_number
+            BEGIN
+                INSERT INTO reminder_resync (opportunity_id) VALUES (NEW.id);
+            END
+        ''')
+
+    def sync(self, lead_days: List[int], hour: int) -> int:
+        """Create reminders for opportunities inserted since the last sync and redo changed ones; returns how many"""
+        now = time.time()
+        conn = self.connect()
+        try:
+            self.init_trigger(conn)
+            row = conn.execute('SELECT last_opportunity_id FROM reminder_sync WHERE id = 1').fetchone()
+            last_id = row[0] if row else 0
+            max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM opportunities').fetchone()[0]
+            max_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM reminder_resync').fetchone()[0]
+            # Changed rows the new-id range doesn't already cover
+            changed = sorted({row[0] for row in conn.execute(
+                'SELECT opportunity_id FROM reminder_resync WHERE seq <= ? AND opportunity_id <= ?', (max_seq, last_id)
+            )})
+            rows = conn.execute(
+                'SELECT id, phone_number, deadline, status FROM opportunities '
+                'WHERE id > ? AND id <= ? AND deadline IS NOT NULL AND phone_number IS NOT NULL',
+                (last_id, max_id)
+            ).fetchall()
+            for offset in range(0, len(changed), 500):
+                batch = changed[offset:offset + 500]
+                rows += conn.execute(
+                    f'SELECT id, phone_number, deadline, status FROM opportunities WHERE id IN ({",".join("?" * len(batch))}) '
+                    'AND deadline IS NOT NULL AND phone_number IS NOT NULL', batch
+                ).fetchall()
+
+            reminders = []
+            for opportunity_id, phone, deadline, status in rows:
+                if status in CLOSED_STATUSES:
+                    continue
+                for lead in lead_days:
+                    fire_at = fire_time(deadline, lead, hour)
+                    # A lead time that already passed is covered by the shorter ones
+                    if fire_at is not None and fire_at > now:
+                        reminders.append((opportunity_id, phone, lead, fire_at))
+            with conn:
+                # Reminders for the old deadline or phone go, except a batch already being sent
+                conn.executemany("DELETE FROM reminders WHERE opportunity_id = ? AND status != 'sending'",
+                                 [(opportunity_id,) for opportunity_id in changed])
+                conn.executemany(
+                    'INSERT OR IGNORE INTO reminders (opportunity_id, phone_number, lead_days, fire_at) VALUES (?, ?, ?, ?)',
+                    reminders
+                )
+                conn.execute('INSERT OR REPLACE INTO reminder_sync (id, last_opportunity_id) VALUES (1, ?)', (max_id,))
+                conn.execute('DELETE FROM reminder_resync WHERE seq <= ?', (max_seq,))
+            return len(reminders)
+        finally:
+            conn.close()
+
+    def due_before(self, until: float, after_id: int = 0) -> List[tuple]:
+        """Pending (fire_at, id) up to until; uses the (status, fire_at) index"""
+        conn = self.connect()
+        try:
+            return conn.execute(
+                "SELECT fire_at, id FROM reminders WHERE status = 'pending' AND fire_at <= ? AND id > ?",
+                (until, after_id)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def claim(self, ids: List[int]) -> List[dict]:
+        """Move still-pending reminders to sending; only the ones this call claimed, with what the message needs"""
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        placeholders = ",".join("?" * len(ids))
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(f"UPDATE reminders SET status = 'sending', claim_token = ?, claimed_at = ? "
+                             f"WHERE id IN ({placeholders}) AND status = 'pending'", (token, time.time(), *ids))
+            rows = conn.execute('''
+                SELECT r.id, r.opportunity_id, r.phone_number, r.attempts, o.title, o.deadline, o.status
+                FROM reminders r JOIN opportunities o ON o.id = r.opportunity_id
+                WHERE r.claim_token = ? AND r.status = 'sending'
+            ''', (token,)).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"id": row[0], "opportunity_id": row[1], "phone_number": row[2], "attempts": row[3],
+             "title": row[4] or "Opportunity", "deadline": row[5] or "", "status": row[6]}
+            for row in rows
+        ]
+
+    def mark(self, ids: List[int], status: str):
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                "UPDATE reminders SET status = ?, sent_at = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP END WHERE id = ?",
+                [(status, status, reminder_id) for reminder_id in ids]
+            )
+        conn.close()
+
+    def release(self, ids: List[int]):
+        """Claimed reminders back to pending, untouched"""
+        conn = self.connect()
+        with conn:
+            conn.executemany("UPDATE reminders SET status = 'pending', claim_token = NULL "
+                             "WHERE id = ? AND status = 'sending'", [(reminder_id,) for reminder_id in ids])
+        conn.close()
+
+    def release_stale(self) -> int:
+        """Claims older than claim_timeout (their worker died mid-send) back to pending; returns how many"""
+        conn = self.connect()
+        with conn:
+            released = conn.execute("UPDATE reminders SET status = 'pending', claim_token = NULL "
+                                    "WHERE status = 'sending' AND claimed_at < ?",
+                                    (time.time() - self.claim_timeout,)).rowcount
+        conn.close()
+        return released
+
+    def retry_later(self, ids: List[int], delay: float, max_attempts: int) -> List[int]:
+        """Push failed reminders back to pending; returns the ones given up on"""
+        conn = self.connect()
+        with conn:
+            conn.executemany("UPDATE reminders SET status = 'pending', claim_token = NULL, attempts = attempts + 1, "
+                             "fire_at = ? WHERE id = ?",
+                             [(time.time() + delay, reminder_id) for reminder_id in ids])
+            placeholders = ",".join("?" * len(ids))
+            failed = [row[0] for row in conn.execute(
+                f"SELECT id FROM reminders WHERE id IN ({placeholders}) AND attempts >= ?", (*ids, max_attempts))]
+            if failed:
+                conn.executemany("UPDATE reminders SET status = 'failed' WHERE id = ?", [(i,) for i in failed])
+        conn.close()
+        return failed
+
+    def set_opportunity_status(self, opportunity_id: int, status: str):
+        """Cancel a closed opportunity's reminders, bring back cancelled ones when it reopens"""
+        conn = self.connect()
+        with conn:
+            if status in CLOSED_STATUSES:
+                conn.execute("UPDATE reminders SET status = 'cancelled' WHERE opportunity_id = ? AND status = 'pending'",
+                             (opportunity_id,))
+            else:
+                conn.execute("UPDATE reminders SET status = 'pending' WHERE opportunity_id = ? AND status = 'cancelled' "
+                             "AND fire_at > ?", (opportunity_id, time.time()))
+        conn.close()
+
+    def pending_count(self) -> int:
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM reminders WHERE status = 'pending'").fetchone()[0]
+        finally:
+            conn.close()
+
+
+class ReminderScheduler:
+    """Timer heap over the reminders due within the horizon"""
+
+    def __init__(self, db_path: str, outbound: Optional[OutboundMessenger] = None,
+                 lead_days: Optional[List[int]] = None, hour: Optional[int] = None,
+                 horizon: Optional[float] = None, max_attempts: int = 3, retry_delay: float = 300.0):
+        self.store = ReminderStore(db_path)
+        self.outbound = outbound or get_outbound()
+        self.lead_days = lead_days or lead_days_from_env()
+        self.hour = hour if hour is not None else int(os.getenv("REMINDER_HOUR", "9"))
+        self.horizon = horizon or float(os.getenv("REMINDER_HORIZON_HOURS", "6")) * 3600
+        # Attempts here are whole outbound deliveries, each already retried by the messenger
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # (fire_at, reminder id); entries are re-checked against the table when they fire
+        self.heap: List[tuple] = []
+        self.queued = set()
+        self.loaded_until = 0.0
+        self.wakeup: Optional[asyncio.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        self.running = False
+        self.sent = 0
+        registry.add_collector(lambda: {"reminders_in_heap": len(self.heap)})
+
+    # Lifecycle
+    def start(self):
+        """Load the horizon and start the timer loop; call from a startup handler, after init_db()"""
+        if self.task is None:
+            self.store.init_table()
+            self.loop = asyncio.get_running_loop()
+            self.wakeup = asyncio.Event()
+            self.running = True
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # wait_for() can swallow a cancel that races a wakeup, so the loop also checks the flag
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def notify(self):
+        """An opportunity was inserted or changed status; safe to call from any thread"""
+        if self.loop is not None and self.wakeup is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def set_status(self, opportunity_id: int, status: str):
+        """Status change hook (blocking; call off the event loop)"""
+        self.store.set_opportunity_status(opportunity_id, status)
+        self.notify()
+
+    # Heap
+    def _push(self, rows: List[tuple]):
+        for fire_at, reminder_id in rows:
+            if reminder_id not in self.queued:
+                self.queued.add(reminder_id)
+                heapq.heappush(self.heap, (fire_at, reminder_id))
+
+    async def _refill(self):
+        """Pick up new opportunities and everything due before the end of the next horizon"""
+        released = await asyncio.to_thread(self.store.release_stale)
+        if released:
+            print(f"⚠️ Released {released} reminder(s) left mid-send")
+        await asyncio.to_thread(self.store.sync, self.lead_days, self.hour)
+        self.loaded_until = time.time() + self.horizon
+        self._push(await asyncio.to_thread(self.store.due_before, self.loaded_until))
+
+    async def _run(self):
+        # loaded_until starts at 0, so the first pass loads the horizon
+        while self.running:
+            now = time.time()
+            if now >= self.loaded_until or self.wakeup.is_set():
+                self.wakeup.clear()
+                try:
+                    await self._refill()
+                except Exception as e:
+                    # Locked or not yet created table: back off instead of spinning on the refill
+                    print(f"⚠️ Could not load reminders, retrying in {self.retry_delay:.0f}s: {e}")
+                    self.loaded_until = time.time() + self.retry_delay
+                continue
+
+            due = []
+            while self.heap and self.heap[0][0] <= now:
+                _, reminder_id = heapq.heappop(self.heap)
+                self.queued.discard(reminder_id)
+                due.append(reminder_id)
+            if due:
+                try:
+                    await self._fire(due)
+                except Exception as e:
+                    print(f"⚠️ Reminder batch failed: {e}")
+                continue
+
+            next_at = min(self.heap[0][0] if self.heap else self.loaded_until, self.loaded_until)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=max(0.0, next_at - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    # Sending
+    async def _fire(self, ids: List[int]):
+        # Apply deadline edits first: a reminder for a deadline that moved is deleted before the claim
+        if await asyncio.to_thread(self.store.sync, self.lead_days, self.hour):
+            # ... and the reminders that replaced it are loaded on the next pass
+            self.loaded_until = 0.0
+        # Another scheduler on this table may have fired some of them already; send only what we claimed
+        reminders = await asyncio.to_thread(self.store.claim, ids)
+        by_phone: Dict[str, List[dict]] = defaultdict(list)
+        skipped = []
+        for reminder in reminders:
+            if reminder["status"] in CLOSED_STATUSES:
+                skipped.append(reminder["id"])
+            else:
+                by_phone[reminder["phone_number"]].append(reminder)
+        if skipped:
+            await asyncio.to_thread(self.store.mark, skipped, "cancelled")
+
+        # One message per phone; the messenger paces them per sending number
+        phones = list(by_phone)
+        try:
+            sids = await asyncio.gather(*(self.outbound.send(phone, format_reminder(by_phone[phone]))
+                                          for phone in phones))
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(
+                self.store.release, [reminder["id"] for phone in phones for reminder in by_phone[phone]]))
+            raise
+        sent, failed = [], []
+        for phone, sid in zip(phones, sids):
+            (sent if sid else failed).extend(reminder["id"] for reminder in by_phone[phone])
+
+        if sent:
+            await asyncio.to_thread(self.store.mark, sent, "sent")
+            self.sent += len(sent)
+            count("reminders_sent_total", len(sent))
+        if failed:
+            dropped = await asyncio.to_thread(self.store.retry_later, failed, self.retry_delay, self.max_attempts)
+            count("reminders_failed_total", len(failed))
+            if dropped:
+                count("reminders_dropped_total", len(dropped))
+            # Retries come back through the next refill
+            self.loaded_until = min(self.loaded_until, time.time() + self.retry_delay)
+
+
+def install_reminders(app, db_path: str, outbound: Optional[OutboundMessenger] = None) -> ReminderScheduler:
+    """Reminder scheduler for an app's database; start() it from the startup handler, after init_db()"""
+    scheduler = ReminderScheduler(db_path, outbound)
+    app.add_event_handler("shutdown", scheduler.stop)
+    return scheduler
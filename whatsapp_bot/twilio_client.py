@@ -0,0 +1,49 @@
+"""
+Shared Twilio REST client, built on first use
+
+twilio.rest costs ~200ms to import and only out-of-band confirmations need
+it; webhook replies are plain TwiML. Importing and constructing the client
+lazily keeps both off the cold-start path.
+
+Every send shares one keep-alive session whose pool holds TWILIO_POOL_SIZE
+connections, enough for the outbound workers (whatsapp_bot/outbound.py) to
+never open a connection per message. Requests time out after
+TWILIO_TIMEOUT_SECONDS instead of holding a worker thread forever.
+
+TWILIO_API_BASE points the client somewhere other than api.twilio.com, e.g.
+benchmarks.stubs.StubTwilioServer in load tests.
+"""
+import os
+import threading
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_twilio_client():
+    """Process-wide twilio.rest.Client from TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from requests.adapters import HTTPAdapter
+                from twilio.http.http_client import TwilioHttpClient
+                from twilio.rest import Client
+                
+                http_client = TwilioHttpClient(
+                    pool_connections=True,
+                    timeout=float(os.getenv("TWILIO_TIMEOUT_SECONDS", "10"))
+                )
+                pool_size = int(os.getenv("TWILIO_POOL_SIZE", "10"))
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                http_client.session.mount("https://", adapter)
+                http_client.session.mount("http://", adapter)
+                client = Client(
+                    os.getenv("TWILIO_ACCOUNT_SID"),
+                    os.getenv("TWILIO_AUTH_TOKEN"),
+                    http_client=http_client
+                )
+                if os.getenv("TWILIO_API_BASE"):
+                    client.api.base_url = os.getenv("TWILIO_API_BASE").rstrip("/")
+                _client = client
+    return _client
@@ -1,50 +1,50 @@
+import asyncio
 from fastapi import APIRouter, Request, HTTPException
 from twilio.twiml.messaging_response import MessagingResponse
-from twilio.rest import Client
-import os
 from dotenv import load_dotenv
 from ai_engine.analyzer import OpportunityAnalyzer
-from backend.database.connection import get_db
+from ai_engine.prefilter import get_prefilter
+from backend.database.connection import SessionLocal, get_db
 from backend.models.opportunity import Opportunity
+from monitoring.metrics import registry, timed, timer
+from whatsapp_bot.idempotency import SQLAlchemyIdempotencyStore
+from whatsapp_bot.outbound import get_outbound
+from whatsapp_bot.rate_limit import (
+    DEFER, DEFERRED_MESSAGE, DEGRADE, DROPPED_MESSAGE, NORMAL, RATE_LIMITED_MESSAGE,
+    LoadShedder, SenderRateLimiter
+)
 
 load_dotenv()
 
 whatsapp_router = APIRouter()
 
-# Twilio client
-twilio_client = Client(
-    os.getenv("TWILIO_ACCOUNT_SID"),
-    os.getenv("TWILIO_AUTH_TOKEN")
-)
-
 analyzer = OpportunityAnalyzer()
+prefilter = get_prefilter()
 
-@whatsapp_router.post("/webhook")
-async def whatsapp_webhook(request: Request):
-    """Handle incoming WhatsApp messages"""
-    
-    form_data = await request.form()
-    
-    # Extract message data
-    from_number = form_data.get("From", "")
-    message_body = form_data.get("Body", "")
-    media_url = form_data.get("MediaUrl0", "")
-    
-    response = MessagingResponse()
+# MessageSid claims so Twilio retries replay instead of re-running analysis
+idempotency = SQLAlchemyIdempotencyStore(SessionLocal)
+
+# Per-sender token buckets + global queue-depth watermarks
+rate_limiter = SenderRateLimiter()
+shedder = LoadShedder()
+registry.add_collector(lambda: {f"load_{k}": v for k, v in shedder.gauges().items()})
+
+async def save_opportunity(content: str) -> dict:
+    """Analyze and insert one post, skipping the LLM when the queue is deep"""
+    level = shedder.level()
+    if level == DEGRADE:
+        shedder.count("degraded")
+    shedder.count("accepted")
     
-    try:
-        # Process the message
-        if message_body or media_url:
-            # If there's media, download and process it
-            if media_url:
-                content = await process_media(media_url)
+    with shedder.track():
+        with timer("analysis"):
+            if level == NORMAL:
+                analysis = await analyzer.analyze_opportunity(content)
             else:
-                content = message_body
-            
-            # Analyze the opportunity
-            analysis = await analyzer.analyze_opportunity(content)
-            
-            # Save to database
+                analysis = analyzer._fallback_analysis(content)
+        
+        # Save to database
+        with timer("db_write"):
             db = next(get_db())
             opportunity = Opportunity(
                 title=analysis.get("title", "Untitled Opportunity"),
@@ -60,9 +60,11 @@ async def whatsapp_webhook(request: Request):
             
             db.add(opportunity)
             db.commit()
-            
-            # Send confirmation message
-            confirmation = f"""
+    
+    return analysis
+
+def build_confirmation(analysis: dict) -> str:
+    confirmation = f"""
 ✅ Opportunity saved successfully!
 
 📋 Title: {analysis.get('title', 'Untitled')}
@@ -71,17 +73,90 @@ async def whatsapp_webhook(request: Request):
 ⭐ Priority: {analysis.get('priority_score', 5)}/10
 
 You can view all opportunities in your dashboard.
-            """
+    """
+    return confirmation.strip()
+
+async def process_deferred(from_number: str, content: str):
+    """Save a message deferred under load and confirm it out of band"""
+    analysis = await save_opportunity(content)
+    # Paced and retried by the shared messenger; failures end up in its dead-letter log
+    get_outbound().send(from_number, build_confirmation(analysis))
+
+@whatsapp_router.on_event("startup")
+async def start_deferred_worker():
+    shedder.start(process_deferred)
+
+@whatsapp_router.on_event("shutdown")
+async def stop_deferred_worker():
+    await shedder.stop(process_deferred)
+    await get_outbound().stop()
+
+@whatsapp_router.post("/webhook")
+async def whatsapp_webhook(request: Request):
+    """Handle incoming WhatsApp messages"""
+    
+    form_data = await request.form()
+    message_sid = form_data.get("MessageSid", "")
+    
+    # Twilio retries slow requests - replay the original reply instead
+    replay = await idempotency.begin(message_sid)
+    if replay is not None:
+        return replay
+    
+    # Extract message data
+    from_number = form_data.get("From", "")
+    message_body = form_data.get("Body", "")
+    media_url = form_data.get("MediaUrl0", "")
+    
+    response = MessagingResponse()
+    
+    # Drop chatter before any analysis or DB work
+    decision = prefilter.classify(message_body, has_media=bool(media_url))
+    if decision["route"] == "ignore":
+        # A file append under the audit lock; keep it off the event loop
+        await asyncio.to_thread(prefilter.audit, decision, message_body, from_number)
+        await idempotency.complete(message_sid, str(response))
+        return str(response)
+    
+    if not rate_limiter.allow(from_number):
+        shedder.count("rate_limited")
+        if rate_limiter.should_warn(from_number):
+            response.message(RATE_LIMITED_MESSAGE)
+        await idempotency.complete(message_sid, str(response))
+        return str(response)
+    
+    failed = False
+    try:
+        # Process the message
+        if decision["route"] == "opportunity":
+            # If there's media, download and process it
+            if media_url:
+                content = await process_media(media_url)
+            else:
+                content = message_body
             
-            response.message(confirmation.strip())
+            if shedder.level() == DEFER:
+                # Too much queued work: save later and confirm out of band
+                response.message(DEFERRED_MESSAGE if shedder.defer(from_number, content) else DROPPED_MESSAGE)
+            else:
+                analysis = await save_opportunity(content)
+                response.message(build_confirmation(analysis))
         else:
             response.message("Hi! Send me any opportunity details and I'll analyze and save them for you. 📊")
             
     except Exception as e:
+        failed = True
         response.message("Sorry, there was an error processing your message. Please try again.")
     
-    return str(response)
+    reply = str(response)
+    if failed:
+        # Let Twilio's retry have another go
+        await idempotency.release(message_sid)
+    else:
+        await idempotency.complete(message_sid, reply)
+    return reply
 
+@timed()
 async def process_media(media_url: str) -> str:
     """Process media files (images, PDFs) and extract text"""
     try:
@@ -106,4 +181,9 @@ async def process_media(media_url: str) -> str:
 
 @whatsapp_router.get("/status")
 async def webhook_status():
-    return {"status": "WhatsApp webhook is running"}
\ No newline at end of file
+    return {"status": "WhatsApp webhook is running"}
+
+@whatsapp_router.get("/metrics/load")
+async def load_metrics():
+    """Rate limiting and load shedding counters"""
+    return shedder.metrics()
\ No newline at end of file
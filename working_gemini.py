@@ -1,19 +1,27 @@
 """
 Working Gemini AI OpportunityBot - Simplified and Robust
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import json
 import sqlite3
 from datetime import datetime
-import os
 from dotenv import load_dotenv
-
-# Try to import Gemini, fallback if not available
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from ai_engine.clients import gemini_available, gemini_configured, get_gemini_model, has_library
+from ai_engine.compensation import CompensationIndex
+from ai_engine.deadlines import MAX_UPCOMING_DAYS, DeadlineIndex
+from ai_engine.facets import FacetIndex
+from ai_engine.locations import LocationIndex
+from ai_engine.pipeline import analyze_content, warm_up
+from ai_engine.queries import OpportunitySearch, opportunity_filters
+from ai_engine.read_model import install_read_model
+from ai_engine.rescoring import install_rescoring
+from ai_engine.serialization import json_response
+from monitoring.metrics import count, install_metrics, timed, timer
+from monitoring.loop_lag import install_loop_monitor
+from monitoring.profiler import install_profiler
+from monitoring.readiness import install_readiness, warm_sqlite
 
 load_dotenv()
 
@@ -26,23 +34,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+install_metrics(app)
+install_profiler(app)
+install_loop_monitor(app)
+readiness = install_readiness(app)
+rescorer = install_rescoring(app, 'working_opportunities.db')
 
-# Initialize Gemini if available
-gemini_model = None
-if GEMINI_AVAILABLE:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key and api_key != "your-gemini-key-here":
-        try:
-            genai.configure(api_key=api_key)
-            gemini_model = genai.GenerativeModel('gemini-pro')
-            print("✅ Gemini AI initialized successfully!")
-        except Exception as e:
-            print(f"⚠️ Gemini initialization failed: {e}")
-            gemini_model = None
-    else:
-        print("⚠️ No valid Gemini API key found")
-else:
+# Gemini is imported and configured on first use (ai_engine/clients.py)
+if not has_library("google.generativeai"):
     print("⚠️ Gemini library not installed")
+elif not gemini_configured():
+    print("⚠️ No valid Gemini API key found")
 
 def init_db():
     conn = sqlite3.connect('working_opportunities.db')
@@ -67,8 +69,41 @@ def init_db():
     conn.commit()
     conn.close()
 
+def row_to_opportunity(row) -> dict:
+    """API record for a SELECT * row"""
+    return {
+        "id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "category": row[3],
+        "deadline": row[4],
+        "requirements": row[5].split('|') if row[5] else [],
+        "contact_info": row[6],
+        "priority_score": row[7],
+        "compensation": row[8],
+        "location": row[9],
+        "summary": row[10],
+        "status": row[11],
+        "created_at": row[12]
+    }
+
+# GET /opportunities is served from memory; writes below refresh it
+read_model = install_read_model(app, 'working_opportunities.db', row_to_opportunity)
+# Skill and contact lookups (ai_engine/facets.py)
+facets = FacetIndex('working_opportunities.db')
+# Parsed salary columns for salary filters and sorting (ai_engine/compensation.py)
+salaries = CompensationIndex('working_opportunities.db')
+# Parsed deadlines for GET /opportunities/upcoming (ai_engine/deadlines.py)
+deadlines = DeadlineIndex('working_opportunities.db', read_model)
+# Place keys for the location filter (ai_engine/locations.py)
+places = LocationIndex('working_opportunities.db')
+# Filtered and sorted listings (ai_engine/queries.py)
+search = OpportunitySearch('working_opportunities.db', read_model)
+
+@timed()
 def analyze_with_gemini(content: str) -> dict:
     """Analyze with Gemini AI"""
+    gemini_model = get_gemini_model()
     if not gemini_model:
         return analyze_basic(content)
     
@@ -107,7 +142,6 @@ Rules:
         elif result_text.startswith('```'):
             result_text = result_text[3:-3]
         
-        import json
         result = json.loads(result_text)
         
         # Validate result
@@ -125,86 +159,48 @@ Rules:
         
     except Exception as e:
         print(f"Gemini error: {e}")
+        if isinstance(e, json.JSONDecodeError):
+            count("llm_json_parse_failures_total", provider="gemini")
+        count("llm_fallbacks_total", reason="gemini_error")
         return analyze_basic(content)
 
+@timed()
 def analyze_basic(content: str) -> dict:
     """Basic fallback analysis"""
-    import re
-    
-    # Simple title extraction
-    title = content.split('\n')[0][:100] if content else "Untitled Opportunity"
-    
-    # Simple category detection
-    content_lower = content.lower()
-    if any(word in content_lower for word in ['job', 'position', 'role', 'hiring']):
-        category = 'job'
-    elif any(word in content_lower for word in ['freelance', 'contract', 'gig']):
-        category = 'freelance'
-    else:
-        category = 'other'
-    
-    # Extract email
-    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', content)
-    
-    # Extract phone
-    phones = re.findall(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', content)
-    
-    # Simple priority scoring
-    priority = 5.0
-    if any(word in content_lower for word in ['urgent', 'asap', 'immediate']):
-        priority += 2.0
-    if any(word in content_lower for word in ['senior', 'lead', 'manager']):
-        priority += 1.0
-    
-    return {
-        "title": title,
-        "category": category,
-        "deadline": None,
-        "requirements": [],
-        "contact_info": {"emails": emails, "phones": phones},
-        "priority_score": min(10.0, priority),
-        "compensation": None,
-        "location": None,
-        "summary": f"Basic analysis of {category} opportunity"
-    }
+    return analyze_content(content).complete()
 
 @app.on_event("startup")
 async def startup():
     init_db()
+    facets.backfill()
+    salaries.backfill()
+    deadlines.backfill()
+    places.backfill()
+    search.init_schema()
+    read_model.start()
+    rescorer.start()
+    readiness.start({
+        "analysis": warm_up,
+        "llm": get_gemini_model,
+        "database": lambda: warm_sqlite('working_opportunities.db')
+    })
     print("✅ Database initialized!")
 
 @app.get("/")
 async def root():
-    status = "with Gemini AI" if gemini_model else "with Basic Analysis"
+    status = "with Gemini AI" if gemini_available() else "with Basic Analysis"
     return {"message": f"OpportunityBot {status} is running! 🤖"}
 
 @app.get("/opportunities")
-async def get_opportunities():
-    conn = sqlite3.connect('working_opportunities.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM opportunities ORDER BY priority_score DESC, created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    opportunities = []
-    for row in rows:
-        opportunities.append({
-            "id": row[0],
-            "title": row[1],
-            "content": row[2],
-            "category": row[3],
-            "deadline": row[4],
-            "requirements": row[5].split('|') if row[5] else [],
-            "contact_info": row[6],
-            "priority_score": row[7],
-            "compensation": row[8],
-            "location": row[9],
-            "summary": row[10],
-            "status": row[11],
-            "created_at": row[12]
-        })
-    
-    return opportunities
+async def get_opportunities(params: dict = Depends(opportunity_filters)):
+    if params:
+        return await search.respond(params)
+    return json_response(read_model.json())
+
+@app.get("/opportunities/upcoming")
+async def get_upcoming_opportunities(days: int = Query(7, ge=0, le=MAX_UPCOMING_DAYS)):
+    """Opportunities due from today through the next N days, soonest first"""
+    return await deadlines.respond(days)
 
 @app.post("/opportunities")
 async def create_opportunity(data: dict):
@@ -212,38 +208,45 @@ async def create_opportunity(data: dict):
         content = data.get("content", "")
         
         # Analyze with Gemini or fallback
-        if gemini_model:
-            analysis = analyze_with_gemini(content)
+        if gemini_available():
+            # The Gemini call blocks, keep it off the event loop
+            analysis = await asyncio.to_thread(analyze_with_gemini, content)
             ai_type = "Gemini AI"
         else:
             analysis = analyze_basic(content)
             ai_type = "Basic Analysis"
         
         # Save to database
-        conn = sqlite3.connect('working_opportunities.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO opportunities 
-            (title, content, category, deadline, requirements, contact_info, 
-             priority_score, compensation, location, summary) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            analysis["title"],
-            content,
-            analysis["category"],
-            analysis["deadline"],
-            '|'.join(analysis["requirements"]) if analysis["requirements"] else "",
-            str(analysis["contact_info"]),
-            analysis["priority_score"],
-            analysis["compensation"],
-            analysis["location"],
-            analysis["summary"]
-        ))
-        
-        conn.commit()
-        opportunity_id = cursor.lastrowid
-        conn.close()
+        with timer("db_write"):
+            conn = sqlite3.connect('working_opportunities.db')
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO opportunities 
+                (title, content, category, deadline, requirements, contact_info, 
+                 priority_score, compensation, location, summary) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                analysis["title"],
+                content,
+                analysis["category"],
+                analysis["deadline"],
+                '|'.join(analysis["requirements"]) if analysis["requirements"] else "",
+                str(analysis["contact_info"]),
+                analysis["priority_score"],
+                analysis["compensation"],
+                analysis["location"],
+                analysis["summary"]
+            ))
+            
+            opportunity_id = cursor.lastrowid
+            facets.index(conn, opportunity_id, analysis["requirements"], analysis["contact_info"])
+            salaries.index(conn, opportunity_id, analysis["compensation"])
+            deadlines.index(conn, opportunity_id, analysis["deadline"])
+            places.index(conn, opportunity_id, analysis["location"])
+            conn.commit()
+            conn.close()
+            read_model.refresh([opportunity_id])
         
         return {
             "id": opportunity_id,